@@ -0,0 +1,87 @@
+"""Per-block overhead of browser backends: chromedriver vs DevTools protocol websocket.
+
+Runs headless Chrome against a local page which mimics a translator page. Each block makes the
+same calls as translators do: input lookup, text injection and waiting for the translation.
+
+    python benchmarks/browser_backends.py [--blocks 50] [--delay 50]
+"""
+
+import argparse
+import pathlib
+import statistics
+import time
+from typing import Any
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.common.by import By
+
+from md_translate.translators import _scripts as scripts
+from md_translate.translators._cdp_driver import CdpDriver
+from md_translate.translators._driver_binary import resolve_chromedriver_path
+
+PAGE = (pathlib.Path(__file__).parent / 'assets' / 'translator_page.html').absolute().as_uri()
+
+PAGE_STATE_SCRIPT = scripts.make_page_state_script(
+    '''
+    const output = readValue(document.getElementById('target'));
+    return {
+        antispam: false,
+        translated: document.getElementById('container').classList.contains('ready'),
+        output: output,
+    };
+    '''
+)
+WAIT_SCRIPT = scripts.make_wait_for_translation_script(PAGE_STATE_SCRIPT)
+
+
+def translate_block(driver: Any, text: str, previous_output: str) -> tuple[float, str]:
+    started_at = time.perf_counter()
+    input_element = driver.find_element(By.ID, 'source')
+    driver.execute_script(scripts.SET_INPUT_VALUE, input_element, text)
+    state = driver.execute_async_script(WAIT_SCRIPT, 'en', 'ru', previous_output, 0, 10_000)
+    return time.perf_counter() - started_at, state['output']
+
+
+def measure(driver: Any, blocks: int, delay: int) -> list[float]:
+    driver.set_script_timeout(15)
+    driver.get(f'{PAGE}?delay={delay}')
+    timings = []
+    output = ''
+    for i in range(blocks):
+        elapsed, output = translate_block(driver, f'Block {i}', output)
+        timings.append(elapsed - delay / 1000)
+    return timings
+
+
+def run(blocks: int, delay: int) -> None:
+    options = Options()
+    options.add_argument('--headless=new')
+    drivers = {
+        'webdriver': lambda: webdriver.Chrome(
+            service=ChromeService(resolve_chromedriver_path()), options=options
+        ),
+        'cdp': lambda: CdpDriver.launch(options.arguments),
+    }
+    for name, make_driver in drivers.items():
+        started_at = time.perf_counter()
+        driver = make_driver()
+        startup = time.perf_counter() - started_at
+        try:
+            timings = measure(driver, blocks, delay)
+        finally:
+            driver.quit()
+        print(
+            f'{name:>10}: startup {startup * 1000:.0f} ms, '
+            f'overhead median {statistics.median(timings) * 1000:.1f} ms, '
+            f'max {max(timings) * 1000:.1f} ms per block (page delay {delay} ms)'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--blocks', type=int, default=50)
+    parser.add_argument('--delay', type=int, default=50)
+    arguments = parser.parse_args()
+    run(arguments.blocks, arguments.delay)
@@ -0,0 +1,101 @@
+"""Per-block overhead of page probes: element lookups with implicit wait vs one page state script.
+
+Runs headless Chrome against a local page which mimics a translator page. Without chromedriver,
+the DevTools protocol backend drives Chrome directly.
+
+    python benchmarks/page_probes.py [--blocks 20] [--backend cdp] [--chrome-binary PATH]
+"""
+
+import argparse
+import pathlib
+import statistics
+import time
+from typing import Any, Callable, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.wait import WebDriverWait
+
+from md_translate.translators import _scripts as scripts
+from md_translate.translators._cdp_driver import CdpDriver
+from md_translate.translators._driver_binary import resolve_chromedriver_path
+
+PAGE = (pathlib.Path(__file__).parent / 'assets' / 'translator_page.html').absolute().as_uri()
+IMPLICIT_WAIT = 3
+
+PAGE_STATE_SCRIPT = scripts.make_page_state_script(
+    '''
+    const output = readValue(document.getElementById('target'));
+    return {
+        antispam: isVisible(document.getElementById('t_enter_captcha')),
+        translated: document.getElementById('container').classList.contains('ready'),
+        output: output,
+    };
+    '''
+)
+
+
+def legacy_probe(driver: Any) -> bool:
+    # Antispam check, as it was done by providers: the element is expected to be missing
+    try:
+        driver.find_element(By.ID, 't_enter_captcha').is_displayed()
+    except NoSuchElementException:
+        pass
+    container = driver.find_element(By.ID, 'container')
+    ready = 'ready' in container.get_attribute('class')
+    driver.find_element(By.ID, 'target').get_attribute('value')
+    return ready
+
+
+def page_state_probe(driver: Any) -> bool:
+    state = driver.execute_script(PAGE_STATE_SCRIPT, 'en', 'ru')
+    return state['translated'] and not state['antispam']
+
+
+def translate_block(driver: Any, text: str, probe: Callable[[Any], bool]) -> float:
+    started_at = time.perf_counter()
+    driver.execute_script(scripts.SET_INPUT_VALUE, driver.find_element(By.ID, 'source'), text)
+    WebDriverWait(driver, 30, poll_frequency=0.05).until(probe)
+    return time.perf_counter() - started_at
+
+
+def make_driver(backend: str, chrome_binary: Optional[str], chrome_args: list[str]) -> Any:
+    options = Options()
+    options.add_argument('--headless=new')
+    for argument in chrome_args:
+        options.add_argument(argument)
+    if backend == 'cdp':
+        return CdpDriver.launch(options.arguments, binary=chrome_binary)
+    if chrome_binary:
+        options.binary_location = chrome_binary
+    return webdriver.Chrome(service=ChromeService(resolve_chromedriver_path()), options=options)
+
+
+def run(blocks: int, driver: Any) -> None:
+    driver.implicitly_wait(IMPLICIT_WAIT)
+    try:
+        driver.get(f'{PAGE}?delay=100')
+        for name, probe in [('legacy', legacy_probe), ('page state', page_state_probe)]:
+            timings = [translate_block(driver, f'Block {i} {name}', probe) for i in range(blocks)]
+            print(
+                f'{name:>10}: median {statistics.median(timings) * 1000:.0f} ms, '
+                f'max {max(timings) * 1000:.0f} ms per block (page delay 100 ms)'
+            )
+    finally:
+        driver.quit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--blocks', type=int, default=20)
+    parser.add_argument('--backend', choices=['webdriver', 'cdp'], default='webdriver')
+    parser.add_argument('--chrome-binary')
+    parser.add_argument('--chrome-arg', action='append', default=[], help='e.g. --no-sandbox')
+    arguments = parser.parse_args()
+    run(
+        arguments.blocks,
+        make_driver(arguments.backend, arguments.chrome_binary, arguments.chrome_arg),
+    )
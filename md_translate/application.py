@@ -1,12 +1,17 @@
+import contextlib
+import functools
 import logging
 import multiprocessing
+import queue
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import click
 
 from md_translate.document import MarkdownDocument
-from md_translate.exceptions import NoMdFilesFound, NoTargetFileFound
+from md_translate.exceptions import NoMdFilesFound, NoTargetFileFound, ProviderBlocked
+from md_translate.file_queue import FileQueue
+from md_translate.translators import LatencyModel
 
 if TYPE_CHECKING:
     from md_translate.settings import Settings
@@ -21,23 +26,98 @@ class Application:
         self._set_logging_level()
         if self._settings.processes == 1:
             self.run_single_process()
-            return 0
         else:
             self.run_multiple_processes()
-            return 0
+        self.print_summary()
+        return 0
+
+    def print_summary(self) -> None:
+        if not self._settings.adaptive_timeouts:
+            return
+        for provider in self._settings.service_providers:
+            latency_model = LatencyModel.from_settings(self._settings, provider)
+            if latency_model is None:
+                continue  # pragma: no cover
+            with latency_model:
+                for kind in (LatencyModel.PAGE_LOAD, LatencyModel.TRANSLATION):
+                    fit = latency_model.get_fit(kind)
+                    click.echo(
+                        '{} {} latency: {}'.format(
+                            latency_model.service, kind, fit or 'not enough timings'
+                        )
+                    )
 
     def run_single_process(self) -> None:
-        files_to_process = self._get_files_to_process()
-        for file_to_process in files_to_process:
-            self.process_file(file_to_process)
+        files_queue = FileQueue(self._get_files_to_process())
+        while files_queue:
+            file_to_process, attempt = files_queue.pop()
+            retry_after = self.process_file(file_to_process, resume=attempt > 0)
+            self._requeue_if_blocked(files_queue, file_to_process, attempt, retry_after)
 
     def run_multiple_processes(self) -> None:
-        files_to_process = self._get_files_to_process()
-        with multiprocessing.Pool(self._settings.processes) as pool:
-            pool.starmap(
-                self.process_file,
-                [(file_to_process,) for file_to_process in files_to_process],
+        files_queue = FileQueue(self._get_files_to_process())
+        results: queue.Queue[tuple[Path, int, Optional[float]]] = queue.Queue()
+        in_progress = 0
+        with multiprocessing.Pool(
+            self._settings.processes, maxtasksperchild=self._settings.max_tasks_per_child
+        ) as pool:
+            while files_queue or in_progress:
+                while (entry := files_queue.pop_ready()) is not None:
+                    file_to_process, attempt = entry
+                    pool.apply_async(
+                        self.process_file,
+                        (file_to_process, attempt > 0),
+                        callback=functools.partial(self._put_result, results, entry),
+                        error_callback=functools.partial(self._put_error, results, entry),
+                    )
+                    in_progress += 1
+                try:
+                    file_to_process, attempt, retry_after = results.get(
+                        timeout=files_queue.time_to_next_ready()
+                    )
+                except queue.Empty:
+                    continue
+                in_progress -= 1
+                self._requeue_if_blocked(files_queue, file_to_process, attempt, retry_after)
+            # Let workers exit gracefully, so they can shut down their browsers
+            pool.close()
+            pool.join()
+
+    def _put_result(
+        self,
+        results: 'queue.Queue[tuple[Path, int, Optional[float]]]',
+        entry: tuple[Path, int],
+        retry_after: Optional[float],
+    ) -> None:
+        results.put((*entry, retry_after))
+
+    def _put_error(
+        self,
+        results: 'queue.Queue[tuple[Path, int, Optional[float]]]',
+        entry: tuple[Path, int],
+        error: BaseException,
+    ) -> None:
+        self._logger.error('Error processing file: %s: %s', entry[0], error)
+        results.put((*entry, None))
+
+    def _requeue_if_blocked(
+        self,
+        files_queue: FileQueue,
+        file_to_process: Path,
+        attempt: int,
+        retry_after: Optional[float],
+    ) -> None:
+        if retry_after is None:
+            return
+        if attempt >= self._settings.antispam_max_retries:
+            self._logger.error(
+                'Giving up on file after %s retries: %s. Progress is kept in cache',
+                attempt,
+                file_to_process,
             )
+            return
+        self._logger.warning('Requeued file: %s. Retry in %.0f s', file_to_process, retry_after)
+        files_queue.push(file_to_process, attempt=attempt + 1, delay=retry_after)
 
     def _set_logging_level(self) -> None:
         level_int_to_name = {
@@ -99,27 +179,47 @@ class Application:
                     files_to_process.append(found_file)
         return files_to_process
 
-    def process_file(self, file_to_process: Path) -> None:
-        translation_provider = self._settings.service_provider(self._settings)
+    def process_file(self, file_to_process: Path, resume: bool = False) -> Optional[float]:
+        """Translates the file.
+
+        Returns seconds to wait before the file is retried, if the provider is blocked.
+        """
         self._logger.info('Processing file: %s', file_to_process)
         try:
-            document = MarkdownDocument.from_file(
-                file_to_process,
-                settings=self._settings,
-            )
+            document = self._load_document(file_to_process, resume)
         except Exception as e:
             self._logger.error('Error processing file: %s', file_to_process)
             self._logger.exception(e)
-            return
+            return None
         if not document.should_be_translated():
             self._logger.info('Skipping file: %s. Already translated', file_to_process.name)
-            return
-        with translation_provider as provider:
-            try:
+            return None
+        try:
+            self._translate_document(document, file_to_process)
+        except ProviderBlocked as e:
+            self._logger.warning('%s. Postponing file: %s', e, file_to_process.name)
+            document.cache()
+            return e.retry_after
+        return None
+
+    def _translate_document(self, document: MarkdownDocument, file_to_process: Path) -> None:
+        translation_provider = self._settings.service_provider(self._settings)
+        # Errors are handled outside of the provider, so it discards a driver which failed
+        try:
+            with translation_provider as provider:
                 document.translate(provider)
-            except Exception as e:
-                self._logger.error('Error while translating file: %s', file_to_process.name)
-                self._logger.exception(e)
-                return
+        except ProviderBlocked:
+            raise
+        except Exception as e:
+            self._logger.error('Error while translating file: %s', file_to_process.name)
+            self._logger.exception(e)
+            return
         document.write()
         click.echo('Processed file: {}'.format(file_to_process.name))
+
+    def _load_document(self, file_to_process: Path, resume: bool) -> MarkdownDocument:
+        # Progress of a requeued file is restored from cache, even if cache is ignored on start
+        if resume:
+            with contextlib.suppress(FileNotFoundError):
+                return MarkdownDocument.restore(source=file_to_process, settings=self._settings)
+        return MarkdownDocument.from_file(file_to_process, settings=self._settings)
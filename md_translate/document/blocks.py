@@ -1,13 +1,11 @@
-from typing import TYPE_CHECKING, Any, ClassVar, Generic, Optional, Type, TypeVar, cast
+from typing import Any, ClassVar, Generic, Optional, Type, TypeVar, cast
 
 import pydantic
 
-if TYPE_CHECKING:
-    from translators import BaseTranslatorProtocol
-
 
 class BaseBlock(pydantic.BaseModel):
     translated_data: Optional[str] = None
+    translated_by: Optional[str] = None
 
     TRANSLATABLE: ClassVar[bool] = True
 
@@ -18,12 +16,6 @@ class BaseBlock(pydantic.BaseModel):
     def __str__(self) -> str:
         raise NotImplementedError(self.__class__.__name__)
 
-    def translate(self, translator: 'BaseTranslatorProtocol') -> None:
-        if not self.should_be_translated:
-            return
-        translated_data = translator.translate(text=str(self))
-        self.translated_data = translated_data
-
     def dump(self) -> dict:
         data = self.dict(exclude_unset=True)
         data['block_type'] = self.__class__.__name__
@@ -1,14 +1,22 @@
+import contextlib
+import functools
 import json
 import logging
+import os
 import re
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union
 
 import mistune
 
 from md_translate.document.blocks import BaseBlock, NewlineBlock
+from md_translate.document.engine import AsyncTranslationEngine, BatchCallback
+from md_translate.document.journal import CacheJournal
+from md_translate.document.packing import BlockPacker
 from md_translate.document.parser import TypedParser
-from md_translate.translators import BaseTranslatorProtocol
+from md_translate.document.splitting import TextSplitter
+from md_translate.translation_memory import TranslationMemory
+from md_translate.translators import AsyncTranslatorProtocol, BaseTranslatorProtocol
 
 if TYPE_CHECKING:
     from md_translate.settings import Settings
@@ -34,6 +42,7 @@ class MarkdownDocument:
         self._settings = settings
         self.source = source
         self.blocks = blocks or []
+        self._journal: Optional[CacheJournal] = None
 
     def write(
         self,
@@ -47,6 +56,7 @@ class MarkdownDocument:
         if not self._settings.save_temp_on_complete:
             temp_file = self.__get_dump_file_path(self.source)
             temp_file.unlink(missing_ok=True)
+            self.__get_journal_file_path(self.source).unlink(missing_ok=True)
 
     def render(self) -> str:
         prerendered = '\n\n'.join(map(str, self.blocks)) + '\n'
@@ -68,10 +78,172 @@ class MarkdownDocument:
         return self.__clear_rendered(prerendered)
 
     def translate(self, translator: BaseTranslatorProtocol) -> None:
-        for block in self.blocks:
-            block.translate(translator)
+        self.cache()
+        pending_blocks = self._group_pending_blocks()
+        with self._open_journal(), self._open_memory() as memory:
+            texts = self._translate_from_memory(pending_blocks, memory)
+            on_translated = functools.partial(
+                self._on_translated, translator, pending_blocks, memory
+            )
+            if translator.max_text_chars:
+                splitter = TextSplitter(translator.max_text_chars)
+                texts = self._translate_split(translator, splitter, texts, on_translated)
+            packer = self._get_packer(translator)
+            if packer is not None:
+                texts = self._translate_packed(translator, packer, texts, on_translated)
+            self._translate_texts(translator, texts, on_translated)
+        saved_calls = sum(len(indexes) - 1 for indexes in pending_blocks.values())
+        if saved_calls:
+            logger.info('Identical blocks found, provider calls saved: %s', saved_calls)
+        self.cache()
+
+    def _translate_texts(
+        self, translator: BaseTranslatorProtocol, texts: list[str], on_translated: BatchCallback
+    ) -> None:
+        batches = list(self._split_to_batches(texts, translator.batch_size))
+        if isinstance(translator, AsyncTranslatorProtocol):
+            AsyncTranslationEngine(translator).run(batches, on_translated)
+        else:
+            for batch in batches:
+                on_translated(batch, translator.translate_batch(batch))
+
+    def _translate_split(
+        self,
+        translator: BaseTranslatorProtocol,
+        splitter: TextSplitter,
+        texts: list[str],
+        on_translated: Callable[..., None],
+    ) -> list[str]:
+        """Translates texts longer than the limit by pieces, returns texts which fit into it.
+
+        Pieces of all long texts are translated in batches, so they are sent concurrently if the
+        translator allows it. A text is joined back once all of its pieces are translated.
+        """
+        splits = {text: splitter.split(text) for text in texts if len(text) > splitter.max_chars}
+        if not splits:
+            return texts
+        pieces = list(dict.fromkeys(piece for split in splits.values() for piece in split.pieces))
+        piece_translations: dict[str, str] = {}
+
+        def on_pieces(batch: list[str], translations: list[str]) -> None:
+            piece_translations.update(zip(batch, translations))
+            for text, split in list(splits.items()):
+                if all(piece in piece_translations for piece in split.pieces):
+                    del splits[text]
+                    translation = split.join([piece_translations[piece] for piece in split.pieces])
+                    translated_by = translator.translated_by(split.pieces[0])
+                    on_translated([text], [translation], translated_by=translated_by)
+
+        logger.debug('Split %s blocks into %s pieces', len(splits), len(pieces))
+        long_texts = set(splits)
+        self._translate_texts(translator, pieces, on_pieces)
+        return [text for text in texts if text not in long_texts]
+
+    def _get_packer(self, translator: BaseTranslatorProtocol) -> Optional[BlockPacker]:
+        if not self._settings.pack_blocks or not translator.max_chars:
+            return None
+        return BlockPacker(translator.max_chars)
+
+    def _translate_packed(
+        self,
+        translator: BaseTranslatorProtocol,
+        packer: BlockPacker,
+        texts: list[str],
+        on_translated: Callable[..., None],
+    ) -> list[str]:
+        """Translates texts packed into payloads, returns texts which are left to translate."""
+        groups = packer.pack(texts)
+        payloads = {packer.join(group): group for group in groups if len(group) > 1}
+        not_packed = [group[0] for group in groups if len(group) == 1]
+        not_split: list[str] = []
+
+        def on_packed(batch: list[str], translations: list[str]) -> None:
+            for payload, translation in zip(batch, translations):
+                group = payloads[payload]
+                parts = packer.split(translation, len(group))
+                if parts is None:
+                    not_split.extend(group)
+                    continue
+                on_translated(group, parts, translated_by=translator.translated_by(payload))
+
+        logger.debug(
+            'Packed %s blocks into %s payloads', len(texts) - len(not_packed), len(payloads)
+        )
+        self._translate_texts(translator, list(payloads), on_packed)
+        if not_split:
+            logger.info(
+                'Packed blocks are not split back, translating %s of them one by one',
+                len(not_split),
+            )
+        return not_packed + not_split
+
+    def _on_translated(
+        self,
+        translator: BaseTranslatorProtocol,
+        pending_blocks: dict[str, list[int]],
+        memory: Optional[TranslationMemory],
+        batch: list[str],
+        translations: list[str],
+        translated_by: Optional[str] = None,
+    ) -> None:
+        for text, translated_data in zip(batch, translations):
+            service = translated_by or translator.translated_by(text)
+            if memory:
+                memory.set(text, translated_data, service)
+            self._apply_translation(pending_blocks[text], translated_data, service)
+
+    def _group_pending_blocks(self) -> dict[str, list[int]]:
+        pending_blocks: dict[str, list[int]] = {}
+        for index, block in enumerate(self.blocks):
+            if block.should_be_translated:
+                pending_blocks.setdefault(str(block), []).append(index)
+        return pending_blocks
+
+    def _translate_from_memory(
+        self, pending_blocks: dict[str, list[int]], memory: Optional[TranslationMemory]
+    ) -> list[str]:
+        # Entries are still replaced with new translations, so bad ones can be fixed
+        if memory is None or self._settings.refresh_memory:
+            return list(pending_blocks)
+        texts_to_translate = []
+        for text, indexes in pending_blocks.items():
+            translated_data = memory.get(text)
+            if translated_data is None:
+                texts_to_translate.append(text)
+            else:
+                self._apply_translation(indexes, translated_data, sync=False)
+        return texts_to_translate
+
+    def _apply_translation(
+        self,
+        indexes: list[int],
+        translated_data: str,
+        translated_by: Optional[str] = None,
+        sync: bool = True,
+    ) -> None:
+        # Identical blocks are synced together, memory hits are not worth syncing at all
+        for index in indexes:
+            self.blocks[index].translated_data = translated_data
+            if translated_by is not None:
+                self.blocks[index].translated_by = translated_by
+            self.checkpoint(index, sync=sync and index == indexes[-1])
+            logger.info('Processed block: %s', self.blocks[index])
+
+    @staticmethod
+    def _split_to_batches(texts: list[str], batch_size: int) -> Iterator[list[str]]:
+        batch_size = max(batch_size, 1)
+        for start in range(0, len(texts), batch_size):
+            end = start + batch_size
+            yield texts[start:end]
+
+    def checkpoint(self, index: int, sync: bool = True) -> None:
+        if self._journal is None:
+            self.cache()
+            return
+        self._journal.append(index, self.blocks[index].dump(), sync=sync)
+        if self._journal.records >= self._settings.cache_compact_every:
+            logger.debug('Compacting cache journal')
             self.cache()
-            logger.info('Processed block: %s', block)
 
     def should_be_translated(self) -> bool:
         if not self.source:
@@ -106,14 +278,50 @@ class MarkdownDocument:
         if not self.source:
             return  # pragma: no cover
         dump_file = self.__get_dump_file_path(self.source)
-        dump_file.write_text(self._dump_data())
+        partial_dump_file = dump_file.with_name(dump_file.name + '.partial')
+        partial_dump_file.write_text(self._dump_data())
+        os.replace(partial_dump_file, dump_file)
+        if self._journal is not None:
+            self._journal.reset()
+        else:
+            self.__get_journal_file_path(self.source).unlink(missing_ok=True)
 
     @classmethod
     def restore(cls, source: Path, settings: 'Settings') -> 'MarkdownDocument':
         dump_file = cls.__get_dump_file_path(source)
         if not dump_file.exists():
             raise FileNotFoundError('Temp file not found: %s', str(dump_file))
-        return cls(blocks=cls._load_data(dump_file.read_text()), source=source, settings=settings)
+        blocks = cls._load_data(dump_file.read_text())
+        for index, block_data in CacheJournal.replay(cls.__get_journal_file_path(source)):
+            if 0 <= index < len(blocks):
+                blocks[index] = BaseBlock.restore(block_data)
+        return cls(blocks=blocks, source=source, settings=settings)
+
+    @contextlib.contextmanager
+    def _open_journal(self) -> Iterator[Optional[CacheJournal]]:
+        if not self.source:
+            yield None  # pragma: no cover
+            return
+        journal = CacheJournal(
+            self.__get_journal_file_path(self.source),
+            flush_every=self._settings.cache_flush_every,
+            flush_interval=self._settings.cache_flush_interval,
+        )
+        with journal:
+            self._journal = journal
+            try:
+                yield journal
+            finally:
+                self._journal = None
+
+    @contextlib.contextmanager
+    def _open_memory(self) -> Iterator[Optional[TranslationMemory]]:
+        memory = TranslationMemory.from_settings(self._settings)
+        if memory is None:
+            yield None
+            return
+        with memory:
+            yield memory
 
     def _dump_data(self) -> str:
         blocks_dump = [block.dump() for block in self.blocks]
@@ -152,3 +360,7 @@ class MarkdownDocument:
     @staticmethod
     def __get_dump_file_path(source: Path) -> Path:
         return Path(source.parent / (source.name + '.tmp'))
+
+    @staticmethod
+    def __get_journal_file_path(source: Path) -> Path:
+        return Path(source.parent / (source.name + '.tmp.journal'))
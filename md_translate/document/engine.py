@@ -0,0 +1,47 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from md_translate.translators import AsyncTranslatorProtocol
+
+logger = logging.getLogger(__name__)
+
+BatchCallback = Callable[[list[str], list[str]], None]
+
+
+class AsyncTranslationEngine:
+    """Translates batches concurrently, keeping at most `concurrency` requests in flight.
+
+    Batches finish in any order, `on_translated` is called from the event loop thread as each one
+    completes, so callbacks never run concurrently. Translators backed by blocking clients run
+    requests in threads of the engine executor, which has a thread per concurrent request.
+    """
+
+    def __init__(self, translator: AsyncTranslatorProtocol) -> None:
+        self.translator = translator
+        self.concurrency = max(translator.concurrency, 1)
+
+    def run(self, batches: list[list[str]], on_translated: BatchCallback) -> None:
+        asyncio.run(self._run(batches, on_translated))
+
+    async def _run(self, batches: list[list[str]], on_translated: BatchCallback) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Default executor has at most min(32, CPUs + 4) threads, fewer than the limit may allow
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(self.concurrency, thread_name_prefix='md_translate')
+        )
+
+        async def translate_batch(batch: list[str]) -> tuple[list[str], list[str]]:
+            async with semaphore:
+                return batch, await self.translator.translate_batch_async(batch)
+
+        logger.debug('Translating %s batches, concurrency: %s', len(batches), self.concurrency)
+        tasks = [asyncio.create_task(translate_batch(batch)) for batch in batches]
+        try:
+            for task in asyncio.as_completed(tasks):
+                batch, translations = await task
+                on_translated(batch, translations)
+        finally:
+            for task in tasks:
+                task.cancel()
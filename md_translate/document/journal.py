@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheJournal:
+    """Append-only JSONL log of translated blocks.
+
+    Each record holds the index of a block and its dump. The journal is replayed on top of the
+    document snapshot, so only the block that changed has to be written on each checkpoint.
+    Records which are cheap to recreate are written without syncing, they reach the disk with the
+    next synced one.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        flush_every: int = 20,
+        flush_interval: float = 5,
+    ) -> None:
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._not_flushed = 0
+        self._last_flush = time.monotonic()
+        self._file: Optional[IO[str]] = None
+
+    def __enter__(self) -> 'CacheJournal':
+        self._file = self.path.open('a', encoding='utf-8')
+        return self
+
+    def __exit__(self, *args: Any, **kwargs: Any) -> None:
+        self.close()
+
+    def append(self, index: int, block_data: dict, sync: bool = True) -> None:
+        if self._file is None:
+            raise ValueError('Journal is not opened')  # pragma: no cover
+        self._file.write(json.dumps({'index': index, 'block': block_data}) + '\n')
+        self.records += 1
+        if not sync:
+            return
+        self._not_flushed += 1
+        if self._should_flush():
+            self.flush()
+
+    def flush(self) -> None:
+        if self._file is None or self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._not_flushed = 0
+        self._last_flush = time.monotonic()
+
+    def reset(self) -> None:
+        if self._file is None:
+            self.path.unlink(missing_ok=True)
+            return
+        self._file.seek(0)
+        self._file.truncate()
+        self.flush()
+        self.records = 0
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def _should_flush(self) -> bool:
+        if self.flush_every and self._not_flushed >= self.flush_every:
+            return True
+        if self.flush_interval and time.monotonic() - self._last_flush >= self.flush_interval:
+            return True
+        return False
+
+    @staticmethod
+    def replay(path: Path) -> Iterator[tuple[int, dict]]:
+        if not path.exists():
+            return
+        with path.open(encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last record may be torn if the process was killed mid-write
+                    logger.warning('Skipping broken journal record in %s', path)
+                    continue
+                yield record['index'], record['block']
@@ -0,0 +1,49 @@
+import logging
+import re
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BlockPacker:
+    """Joins consecutive short texts into payloads, so each of them doesn't cost a request.
+
+    Texts are joined with a separator line which translators keep as is. A translated payload is
+    split back by it, `None` is returned if the number of parts doesn't match.
+    """
+
+    SEPARATOR = '|||'
+
+    _SEPARATOR_PATTERN = re.compile(r'\s*' + re.escape(SEPARATOR) + r'\s*')
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+
+    def pack(self, texts: list[str]) -> list[list[str]]:
+        """Groups texts in order, each group fits into `max_chars` when joined."""
+        groups: list[list[str]] = []
+        group: list[str] = []
+        for text in texts:
+            if group and (
+                self.SEPARATOR in text or len(self.join([*group, text])) > self.max_chars
+            ):
+                groups.append(group)
+                group = []
+            group.append(text)
+            # Text with the separator can't be split back, so it is translated alone
+            if self.SEPARATOR in text:
+                groups.append(group)
+                group = []
+        if group:
+            groups.append(group)
+        return groups
+
+    def join(self, group: list[str]) -> str:
+        return f'\n\n{self.SEPARATOR}\n\n'.join(group)
+
+    def split(self, translation: str, count: int) -> Optional[list[str]]:
+        parts = [part.strip() for part in self._SEPARATOR_PATTERN.split(translation.strip())]
+        if len(parts) != count or not all(parts):
+            logger.debug('Packed translation has %s parts instead of %s', len(parts), count)
+            return None
+        return parts
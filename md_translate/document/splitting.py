@@ -0,0 +1,84 @@
+import re
+from typing import NamedTuple
+
+
+class SplitText(NamedTuple):
+    pieces: list[str]
+    # Separator which follows each piece in the original text
+    separators: list[str]
+    # Whitespace before the first piece
+    prefix: str = ''
+
+    def join(self, translations: list[str]) -> str:
+        return self.prefix + ''.join(
+            translation + separator
+            for translation, separator in zip(translations, self.separators)
+        )
+
+
+class TextSplitter:
+    """Splits text which is longer than the limit of service into pieces.
+
+    Text is split at line ends first, so list items and lines stay whole, then lines are split
+    at sentence ends and sentences at spaces. Pieces are merged back while they fit into the
+    limit, so a text is split into as few requests as possible.
+    """
+
+    # Separators are captured, so pieces are joined back with the original whitespace
+    _LEVELS = [
+        re.compile(r'(\n\s*)'),
+        re.compile(r'(?<=[.!?…。！？])(\s+)'),
+        re.compile(r'(\s+)'),
+    ]
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+
+    def split(self, text: str) -> SplitText:
+        prefix, pieces = self._split(text, 0)
+        return SplitText(
+            [piece for piece, _ in pieces], [separator for _, separator in pieces], prefix
+        )
+
+    def _split(self, text: str, level: int) -> tuple[str, list[tuple[str, str]]]:
+        """Returns whitespace before the first piece, and pieces with following separators."""
+        if not text.strip():
+            return text, []
+        if len(text) <= self.max_chars:
+            return '', [(text, '')]
+        if level == len(self._LEVELS):
+            return '', self._cut(text)
+        parts = self._LEVELS[level].split(text)
+        prefix = ''
+        pieces: list[tuple[str, str]] = []
+        for unit, separator in zip(parts[::2], [*parts[1::2], '']):
+            unit_prefix, unit_pieces = self._split(unit, level + 1)
+            prefix = self._add_whitespace(prefix, pieces, unit_prefix)
+            for piece in unit_pieces:
+                self._append(pieces, piece)
+            prefix = self._add_whitespace(prefix, pieces, separator)
+        return prefix, pieces
+
+    @staticmethod
+    def _add_whitespace(prefix: str, pieces: list[tuple[str, str]], whitespace: str) -> str:
+        """Adds whitespace to the separator of the last piece, or to the prefix if there is none."""
+        if not pieces:
+            return prefix + whitespace
+        pieces[-1] = (pieces[-1][0], pieces[-1][1] + whitespace)
+        return prefix
+
+    def _cut(self, text: str) -> list[tuple[str, str]]:
+        # A word longer than the limit, a link for example
+        limit = self.max_chars
+        pieces = []
+        for start in range(0, len(text), limit):
+            end = start + limit
+            pieces.append((text[start:end], ''))
+        return pieces
+
+    def _append(self, pieces: list[tuple[str, str]], piece: tuple[str, str]) -> None:
+        """Appends the piece, merged into the previous one if they fit into the limit together."""
+        if pieces and len(''.join(pieces[-1])) + len(piece[0]) <= self.max_chars:
+            previous, previous_separator = pieces.pop()
+            piece = (previous + previous_separator + piece[0], piece[1])
+        pieces.append(piece)
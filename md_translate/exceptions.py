@@ -1,5 +1,3 @@
-from typing import Any, Callable, Type
-
 import click
 
 
@@ -28,17 +26,8 @@ class NoCacheFileFound(
     pass
 
 
-DecoratedFunction = Callable[..., Any]
-
-
-def safe_run(exception_to_catch: Type[Exception], default_return_value: Any = None) -> Callable:
-    def decorator(func: DecoratedFunction) -> DecoratedFunction:
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            try:
-                return func(*args, **kwargs)
-            except exception_to_catch:
-                return default_return_value
-
-        return wrapper
-
-    return decorator
+class ProviderBlocked(Exception):
+    def __init__(self, provider: str, retry_after: float) -> None:
+        super().__init__(f'{provider} is blocked, retry in {retry_after:.0f} s')
+        self.provider = provider
+        self.retry_after = retry_after
@@ -0,0 +1,44 @@
+import heapq
+import itertools
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class FileQueue:
+    """Files waiting to be processed, in order.
+
+    A requeued file becomes ready after its delay, other files are processed meanwhile.
+    """
+
+    def __init__(self, files: list[Path]) -> None:
+        self._order = itertools.count()
+        self._entries: list[tuple[float, int, int, Path]] = []
+        for file in files:
+            self.push(file)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def push(self, file: Path, *, attempt: int = 0, delay: float = 0) -> None:
+        heapq.heappush(self._entries, (time.monotonic() + delay, next(self._order), attempt, file))
+
+    def pop_ready(self) -> Optional[tuple[Path, int]]:
+        if not self._entries or self._entries[0][0] > time.monotonic():
+            return None
+        _, _, attempt, file = heapq.heappop(self._entries)
+        return file, attempt
+
+    def pop(self) -> tuple[Path, int]:
+        """Returns the next file and its attempt number, waiting until it is ready."""
+        time.sleep(self.time_to_next_ready() or 0)
+        entry = self.pop_ready()
+        while entry is None:  # pragma: no cover
+            time.sleep(0.01)
+            entry = self.pop_ready()
+        return entry
+
+    def time_to_next_ready(self) -> Optional[float]:
+        if not self._entries:
+            return None
+        return max(self._entries[0][0] - time.monotonic(), 0)
@@ -1,20 +1,54 @@
+import logging
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import click
 
 from md_translate.application import Application
 from md_translate.settings import Settings, wrap_command_with_options
+from md_translate.translators import (
+    BrowserDaemon,
+    BrowserProfile,
+    SeleniumBaseTranslator,
+    Translator,
+)
+
+
+class DefaultCommandGroup(click.Group):
+    """Group which runs `translate` command if no other command is given.
+
+    Keeps `md-translate PATH [OPTIONS]` working next to the other commands.
+    """
+
+    DEFAULT_COMMAND = 'translate'
 
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or args[0] not in self.commands:
+            args = [self.DEFAULT_COMMAND, *args]
+        return super().parse_args(ctx, args)
 
-@click.command()
+
+@click.group(cls=DefaultCommandGroup)
+def main() -> None:
+    pass
+
+
+@main.command(
+    # `md-translate --help` shows help of this command, so the others are listed here
+    epilog=(
+        'Other commands:\n\n'
+        '\b\n'
+        '  browser-daemon  Keep warm browsers open, so translation runs can attach to them\n\n'
+        'Run `md-translate COMMAND --help` for their options.'
+    ),
+)
 @click.argument(
     'path',
     type=click.Path(exists=True, path_type=Path),
     required=True,
 )
 @wrap_command_with_options(Settings)
-def main(
+def translate(
     **cli_arguments: Any,
 ) -> None:
     dump_config = cli_arguments.pop('dump_config', False)
@@ -25,5 +59,57 @@ def main(
     exit(Application(settings).run())
 
 
+@main.command('browser-daemon')
+@click.option(
+    '-P',
+    '--service',
+    type=click.Choice(Translator.__members__),  # type: ignore
+    callback=lambda ctx, param, value: Translator[value],
+    required=True,
+    help='Browser based translating service to keep browsers for',
+)
+@click.option('--browsers', type=click.INT, default=1, help='Number of browsers to keep open')
+@click.option(
+    '--port', type=click.INT, default=9222, help='Remote debugging port of the first browser'
+)
+@click.option(
+    '--browser-profile',
+    type=click.Choice([profile.value for profile in BrowserProfile]),
+    help='Browser profile, see `translate --help`',
+)
+@click.option(
+    '--config',
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help='Path to config file',
+)
+@click.option('-v', '--verbose', count=True, help='Verbosity level')
+def browser_daemon(
+    service: Translator,
+    browsers: int,
+    port: int,
+    browser_profile: Optional[str],
+    config: Optional[Path],
+    verbose: int,
+) -> None:
+    """Keep warm browsers open, so translation runs can attach to them."""
+    # Languages and paths are not used by browsers, but are required by settings
+    settings = Settings.initiate(
+        click_params={
+            'path': [],
+            'from_lang': '',
+            'to_lang': '',
+            'service': service,
+            'browser_profile': browser_profile,
+        },
+        config_file_path=config,
+    )
+    # Fallback services of the config file are not used by the daemon
+    provider = settings.service_providers[0]
+    if not issubclass(provider, SeleniumBaseTranslator):
+        raise click.UsageError(f'{provider.__name__} does not use a browser')
+    logging.basicConfig(level=logging.INFO if verbose else logging.WARNING)
+    BrowserDaemon(provider(settings), browsers=browsers, port=port).run()
+
+
 if __name__ == "__main__":
     main()  # pragma: no cover
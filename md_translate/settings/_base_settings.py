@@ -3,10 +3,20 @@ from pathlib import Path
 from typing import Any, ClassVar, Optional, Type, Union, cast
 
 import click
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 
 from md_translate.settings._settings_to_cli import SettingsToCliField
-from md_translate.translators import BaseTranslator, Translator
+from md_translate.translation_memory import TranslationMemory
+from md_translate.translators import (
+    BaseTranslator,
+    BrowserBackend,
+    BrowserProfile,
+    CaptureMode,
+    InputMethod,
+    ProviderRouter,
+    RateLimit,
+    Translator,
+)
 
 
 class Settings(BaseModel):
@@ -30,6 +40,35 @@ class Settings(BaseModel):
         click_option_help='Translating service',
         click_option_required=True,
     )
+    fallback_services: list[str] = SettingsToCliField(
+        [],
+        click_option_name=['--fallback-service', 'fallback_services'],
+        click_option_type=click.Choice(Translator.__members__),  # type: ignore
+        click_option_callback=lambda ctx, param, value: list(value) or None,
+        click_option_help=(
+            'Service to route blocks to when it is faster than the main one, '
+            'or when the main one fails. Can be repeated'
+        ),
+        click_option_multiple=True,
+    )
+    hedge_percentile: float = SettingsToCliField(
+        0,
+        click_option_name=['--hedge-percentile'],
+        click_option_type=click.FloatRange(0, 100, max_open=True),
+        click_option_help=(
+            'Send a batch to a fallback service (or to a second session of the main one) as well, '
+            'once it takes longer than this percentile of recent latencies, e.g. 95. '
+            'The first translation wins. 0 disables hedging'
+        ),
+        click_option_default=0,
+    )
+    hedge_budget: float = SettingsToCliField(
+        0.1,
+        click_option_name=['--hedge-budget'],
+        click_option_type=click.FloatRange(0, 1),
+        click_option_help='Max number of hedged requests, as a share of all requests',
+        click_option_default=0.1,
+    )
     processes: int = SettingsToCliField(
         1,
         click_option_name=['-X', '--processes'],
@@ -37,6 +76,24 @@ class Settings(BaseModel):
         click_option_help='Number of processes to use. Will be applied to each file separately',
         click_option_default=1,
     )
+    max_tasks_per_child: Optional[int] = SettingsToCliField(
+        None,
+        click_option_name=['--max-tasks-per-child'],
+        click_option_type=click.INT,
+        click_option_help=(
+            'Number of files a worker process translates before it is replaced with a new one. '
+            'Not limited by default'
+        ),
+    )
+    concurrency: Optional[int] = SettingsToCliField(
+        None,
+        click_option_name=['--concurrency'],
+        click_option_type=click.INT,
+        click_option_help=(
+            'Max number of concurrent requests per file. '
+            'Applied to providers which support it, defaults to provider limit'
+        ),
+    )
     new_file: bool = SettingsToCliField(
         False,
         click_option_name=['-N', '--new-file'],
@@ -60,6 +117,91 @@ class Settings(BaseModel):
         click_option_is_flag=True,
         click_option_help='Save cache files upon completion. If not set, they will be deleted',
     )
+    cache_flush_every: int = SettingsToCliField(
+        20,
+        click_option_name=['--cache-flush-every'],
+        click_option_type=click.INT,
+        click_option_help=(
+            'Flush cache journal to disk every N translated blocks. '
+            'Blocks from translation memory are not counted. 0 disables it'
+        ),
+        click_option_default=20,
+    )
+    cache_flush_interval: float = SettingsToCliField(
+        5,
+        click_option_name=['--cache-flush-interval'],
+        click_option_type=click.FLOAT,
+        click_option_help='Flush cache journal to disk every N seconds. 0 disables it',
+        click_option_default=5,
+    )
+    cache_compact_every: int = SettingsToCliField(
+        500,
+        click_option_name=['--cache-compact-every'],
+        click_option_type=click.INT,
+        click_option_help='Compact cache journal into cache file every N journal records',
+        click_option_default=500,
+    )
+    translation_memory: bool = SettingsToCliField(
+        False,
+        click_option_name=['--translation-memory'],
+        click_option_is_flag=True,
+        click_option_help=(
+            'Reuse translations of repeated blocks across files and runs. '
+            'They are kept in a database at --translation-memory-path'
+        ),
+    )
+    translation_memory_path: Path = SettingsToCliField(
+        TranslationMemory.DEFAULT_PATH,
+        click_option_name=['--translation-memory-path'],
+        click_option_type=click.Path(dir_okay=False, path_type=Path),
+        click_option_help=(
+            'Path to translation memory database, shared between files and runs. '
+            'Default: ~/.cache/md_translate/translation_memory.sqlite3'
+        ),
+    )
+    translation_memory_size: int = SettingsToCliField(
+        100_000,
+        click_option_name=['--translation-memory-size'],
+        click_option_type=click.INT,
+        click_option_help='Max number of entries in translation memory',
+        click_option_default=100_000,
+    )
+    refresh_memory: bool = SettingsToCliField(
+        False,
+        click_option_name=['--refresh-memory'],
+        click_option_is_flag=True,
+        click_option_help=(
+            'Do not reuse translations from translation memory. '
+            'Blocks are translated again and their entries are replaced'
+        ),
+    )
+    pack_blocks: bool = SettingsToCliField(
+        False,
+        click_option_name=['--pack-blocks'],
+        click_option_is_flag=True,
+        click_option_help=(
+            'Translate consecutive short blocks in one request, up to the text limit of service. '
+            'Blocks are translated one by one if the translation cannot be split back'
+        ),
+    )
+    antispam_cooldown: float = SettingsToCliField(
+        0,
+        click_option_name=['--antispam-cooldown'],
+        click_option_type=click.FLOAT,
+        click_option_help=(
+            'Seconds to pause a provider after antispam, doubled on each antispam in a row. '
+            'The file is requeued and other files are processed meanwhile. '
+            '0 waits for antispam in browser'
+        ),
+        click_option_default=0,
+    )
+    antispam_max_retries: int = SettingsToCliField(
+        5,
+        click_option_name=['--antispam-max-retries'],
+        click_option_type=click.INT,
+        click_option_help='Max number of times a file is requeued because of antispam',
+        click_option_default=5,
+    )
     overwrite: bool = SettingsToCliField(
         False,
         click_option_name=['-O', '--overwrite'],
@@ -90,12 +232,118 @@ class Settings(BaseModel):
         click_option_type=click.Path(exists=True, dir_okay=False),
         click_option_help='Path to config file',
     )
+    tabs: int = SettingsToCliField(
+        1,
+        click_option_name=['--tabs'],
+        click_option_type=click.INT,
+        click_option_help=(
+            'Number of browser tabs used to translate blocks concurrently. '
+            'Applied to browser based providers'
+        ),
+        click_option_default=1,
+    )
+    browser_backend: BrowserBackend = SettingsToCliField(
+        BrowserBackend.WEBDRIVER,
+        click_option_name=['--browser-backend'],
+        click_option_type=click.Choice([backend.value for backend in BrowserBackend]),
+        click_option_help=(
+            'How browser is controlled. '
+            '"cdp" talks to Chrome over DevTools protocol directly, without chromedriver'
+        ),
+    )
+    browser_profile: BrowserProfile = SettingsToCliField(
+        BrowserProfile.FULL,
+        click_option_name=['--browser-profile'],
+        click_option_type=click.Choice([profile.value for profile in BrowserProfile]),
+        click_option_help=(
+            'Browser profile for browser based providers. '
+            '"lean" runs headless and blocks images, fonts, media and analytics'
+        ),
+    )
+    browser_user_data_dir: Optional[Path] = SettingsToCliField(
+        None,
+        click_option_name=['--browser-user-data-dir'],
+        click_option_type=click.Path(file_okay=False, path_type=Path),
+        click_option_help=(
+            'Directory to keep browser profiles (cookies consent, cache) between runs. '
+            'Each provider and concurrent browser gets its own profile'
+        ),
+    )
+    browser_max_translations: int = SettingsToCliField(
+        0,
+        click_option_name=['--browser-max-translations'],
+        click_option_type=click.INT,
+        click_option_help='Restart browser after N translations. 0 disables it',
+        click_option_default=0,
+    )
+    browser_max_memory: int = SettingsToCliField(
+        0,
+        click_option_name=['--browser-max-memory'],
+        click_option_type=click.INT,
+        click_option_help='Restart browser when its memory usage exceeds N MB. 0 disables it',
+        click_option_default=0,
+    )
+    reload_page: bool = SettingsToCliField(
+        False,
+        click_option_name=['--reload-page'],
+        click_option_is_flag=True,
+        click_option_help=(
+            'Reload translator page for every block. '
+            'Otherwise the page is loaded once and reloaded only on errors'
+        ),
+    )
+    input_method: Optional[InputMethod] = SettingsToCliField(
+        None,
+        click_option_name=['--input-method'],
+        click_option_type=click.Choice([method.value for method in InputMethod]),
+        click_option_help=(
+            'How text is entered into translator page. '
+            'Defaults to the fastest method supported by provider'
+        ),
+    )
+    capture_mode: CaptureMode = SettingsToCliField(
+        CaptureMode.DOM,
+        click_option_name=['--capture-mode'],
+        click_option_type=click.Choice([mode.value for mode in CaptureMode]),
+        click_option_help=(
+            'Where translation is read from. '
+            '"network" reads it from translation response of the page, if provider supports it'
+        ),
+    )
+    translation_quiet_period: Optional[float] = SettingsToCliField(
+        None,
+        click_option_name=['--translation-quiet-period'],
+        click_option_type=click.FLOAT,
+        click_option_help=(
+            'Seconds the output of translator page should stay unchanged '
+            'to consider translation complete. Defaults to provider value'
+        ),
+    )
+    adaptive_timeouts: bool = SettingsToCliField(
+        False,
+        click_option_name=['--adaptive-timeouts'],
+        click_option_is_flag=True,
+        click_option_help=(
+            'Learn page load, translation and API request timeouts from timings of the service, '
+            'scaled with text length. Timings are kept in translation memory database'
+        ),
+    )
+    chromedriver_path: Optional[Path] = SettingsToCliField(
+        None,
+        click_option_name=['--chromedriver-path'],
+        click_option_type=click.Path(exists=True, dir_okay=False, path_type=Path),
+        click_option_help='Path to pre-installed chromedriver. If set, it will not be downloaded',
+    )
     deepl_api_key: Optional[str] = SettingsToCliField(
         None,
         click_option_name=['--deepl-api-key'],
         click_option_type=click.STRING,
         click_option_help='DeepL API key',
     )
+    # Set in config file only, keyed by service name
+    rate_limits: dict[str, RateLimit] = Field(default_factory=dict)
+    service_weights: dict[str, float] = Field(default_factory=dict)
+    max_chars: dict[str, int] = Field(default_factory=dict)
 
     NOT_IN_SETTINGS_FIELDS: ClassVar[list[str]] = [
         'path',
@@ -121,10 +369,43 @@ class Settings(BaseModel):
             return [Path(value)]
         return value
 
+    @validator('rate_limits', 'service_weights', 'max_chars', 'fallback_services')
+    def known_services(cls, value: Union[list[str], dict[str, Any]]) -> Any:
+        for service in value:
+            if service not in Translator.__members__:
+                raise ValueError(f'Unknown service: {service}')
+        return value
+
+    @validator('service_weights')
+    def positive_weights(cls, value: dict[str, float]) -> dict[str, float]:
+        for service, weight in value.items():
+            if weight <= 0:
+                raise ValueError(f'Weight of {service} should be positive')
+        return value
+
+    @validator('max_chars')
+    def non_negative_limits(cls, value: dict[str, int]) -> dict[str, int]:
+        for service, limit in value.items():
+            if limit < 0:
+                raise ValueError(f'Character limit of {service} should not be negative')
+        return value
+
     @property
     def service_provider(self) -> Type[BaseTranslator]:
+        if self.fallback_services or self.hedge_percentile:
+            return ProviderRouter
         return cast(Type[BaseTranslator], self.service)
 
+    @property
+    def service_providers(self) -> list[Type[BaseTranslator]]:
+        """Main service and fallback services, in order of preference."""
+        providers = [cast(Type[BaseTranslator], self.service)]
+        for name in self.fallback_services:
+            provider = Translator[name].value
+            if provider not in providers:
+                providers.append(provider)
+        return providers
+
     @classmethod
     def initiate(
         cls,
@@ -17,6 +17,7 @@ class ClickFieldInfoExtra(TypedDict):
     click_option_is_flag: bool
     click_option_default: Any
     click_option_count: bool
+    click_option_multiple: bool
 
 
 def SettingsToCliField(  # noqa: N802
@@ -29,6 +30,7 @@ def SettingsToCliField(  # noqa: N802
     click_option_is_flag: bool = False,
     click_option_default: Any = None,
     click_option_count: bool = False,
+    click_option_multiple: bool = False,
     **kwargs: Any,
 ) -> Any:
     return Field(
@@ -42,6 +44,7 @@ def SettingsToCliField(  # noqa: N802
         click_option_is_flag=click_option_is_flag,
         click_option_default=click_option_default,
         click_option_count=click_option_count,
+        click_option_multiple=click_option_multiple,
     )
 
 
@@ -61,6 +64,7 @@ def build_cli_options_from_settings(settings: Type['Settings']) -> list[click.Op
                 is_flag=cast(bool, click_option_info['click_option_is_flag']),
                 default=click_option_info['click_option_default'],
                 count=cast(bool, click_option_info['click_option_count']),
+                multiple=cast(bool, click_option_info['click_option_multiple']),
             )
         )
     return options
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from md_translate.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationMemory:
+    """Persistent cache of translations shared between files, runs and worker processes.
+
+    Entries are keyed by service, languages and a hash of the normalized source text. Entries of
+    all configured services are looked up, so routed runs reuse translations of single service
+    runs. The database works in WAL mode, so readers are not blocked by writers from other
+    processes.
+    """
+
+    DEFAULT_PATH = Path('~/.cache/md_translate/translation_memory.sqlite3').expanduser()
+
+    BUSY_TIMEOUT = 30
+    EVICTION_CHECK_EVERY = 100
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        services: list[str],
+        from_lang: str,
+        to_lang: str,
+        max_entries: int,
+    ) -> None:
+        self.path = path
+        # In order of preference, the first one is the main service
+        self.services = services
+        self.from_lang = from_lang
+        self.to_lang = to_lang
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._inserts = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            str(self.path), timeout=self.BUSY_TIMEOUT, isolation_level=None
+        )
+        self._setup()
+
+    def __enter__(self) -> 'TranslationMemory':
+        return self
+
+    def __exit__(self, *args: Any, **kwargs: Any) -> None:
+        self.close()
+
+    @classmethod
+    def from_settings(cls, settings: 'Settings') -> Optional['TranslationMemory']:
+        from md_translate.translators import Translator
+
+        if not settings.translation_memory or not settings.translation_memory_size:
+            return None
+        return cls(
+            settings.translation_memory_path,
+            services=[Translator(provider).name for provider in settings.service_providers],
+            from_lang=settings.from_lang,
+            to_lang=settings.to_lang,
+            max_entries=settings.translation_memory_size,
+        )
+
+    def get(self, text: str) -> Optional[str]:
+        text_hash = self._hash(text)
+        placeholders = ', '.join('?' * len(self.services))
+        translations = dict(
+            self._connection.execute(
+                'SELECT service, translation FROM translations '
+                f'WHERE service IN ({placeholders}) '
+                'AND from_lang = ? AND to_lang = ? AND text_hash = ?',
+                (*self.services, self.from_lang, self.to_lang, text_hash),
+            ).fetchall()
+        )
+        service = next((service for service in self.services if service in translations), None)
+        if service is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._connection.execute(
+            'UPDATE translations SET last_used = ? '
+            'WHERE service = ? AND from_lang = ? AND to_lang = ? AND text_hash = ?',
+            (time.time(), *self._key(text, service)),
+        )
+        return translations[service]
+
+    def set(self, text: str, translation: str, service: Optional[str] = None) -> None:
+        """Stores translation made by the service, the main one by default."""
+        self._connection.execute(
+            'INSERT INTO translations '
+            '(service, from_lang, to_lang, text_hash, translation, last_used) '
+            'VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (service, from_lang, to_lang, text_hash) '
+            'DO UPDATE SET translation = excluded.translation, last_used = excluded.last_used',
+            (*self._key(text, service or self.services[0]), translation, time.time()),
+        )
+        self._inserts += 1
+        if self._inserts % self.EVICTION_CHECK_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        (entries_count,) = self._connection.execute('SELECT COUNT(*) FROM translations').fetchone()
+        excess = entries_count - self.max_entries
+        if excess <= 0:
+            return
+        logger.debug('Evicting %s entries from translation memory', excess)
+        self._connection.execute(
+            'DELETE FROM translations WHERE rowid IN '
+            '(SELECT rowid FROM translations ORDER BY last_used LIMIT ?)',
+            (excess,),
+        )
+
+    def close(self) -> None:
+        self.evict()
+        self._connection.close()
+        logger.info('Translation memory: %s hits, %s misses', self.hits, self.misses)
+
+    def _setup(self) -> None:
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS translations ('
+            'service TEXT NOT NULL, '
+            'from_lang TEXT NOT NULL, '
+            'to_lang TEXT NOT NULL, '
+            'text_hash TEXT NOT NULL, '
+            'translation TEXT NOT NULL, '
+            'last_used REAL NOT NULL, '
+            'PRIMARY KEY (service, from_lang, to_lang, text_hash))'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)'
+        )
+
+    def _key(self, text: str, service: str) -> tuple[str, str, str, str]:
+        return service, self.from_lang, self.to_lang, self._hash(text)
+
+    def _hash(self, text: str) -> str:
+        return hashlib.sha256(self.normalize(text).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        lines = unicodedata.normalize('NFC', text).strip().splitlines()
+        return '\n'.join(line.rstrip() for line in lines)
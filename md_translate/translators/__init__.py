@@ -1,6 +1,21 @@
 import enum
 
-from ._base_translator import BaseTranslator, BaseTranslatorProtocol  # noqa: F401
+from ._base_translator import (  # noqa: F401
+    AsyncTranslatorProtocol,
+    BaseTranslator,
+    BaseTranslatorProtocol,
+)
+from ._browser_daemon import BrowserDaemon  # noqa: F401
+from ._browser_profile import BrowserProfile  # noqa: F401
+from ._latency_model import LatencyFit, LatencyModel  # noqa: F401
+from ._rate_limiter import RateLimit, RateLimiter  # noqa: F401
+from ._router import ProviderRouter  # noqa: F401
+from ._selenium_base import (  # noqa: F401
+    BrowserBackend,
+    CaptureMode,
+    InputMethod,
+    SeleniumBaseTranslator,
+)
 from .bing import BingTranslateProvider
 from .deepl import DeeplTranslateProvider
 from .deepl_api import DeeplAPITranslateProvider
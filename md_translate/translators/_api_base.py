@@ -1,9 +1,16 @@
 import abc
-from typing import TYPE_CHECKING, Any
+import asyncio
+import contextlib
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any, ClassVar, ContextManager, Iterator
 
 import requests
 
 from md_translate.translators import BaseTranslator
+from md_translate.translators._latency_model import LatencyModel
+from md_translate.translators._rate_limiter import RateLimiter
 
 if TYPE_CHECKING:
     from md_translate.settings import Settings
@@ -14,6 +21,11 @@ class APIBaseTranslator(BaseTranslator):
 
     API_KEY_SETTINGS_PARAM: str
 
+    BATCH_SIZE: ClassVar[int] = 1
+    MAX_REQUEST_SIZE: ClassVar[int] = 0
+    MAX_CONCURRENCY: ClassVar[int] = 4
+    REQUEST_TIMEOUT: ClassVar[float] = 30
+
     def __init__(self, settings: 'Settings') -> None:
         self._settings = settings
         self.from_language = settings.from_lang
@@ -21,20 +33,99 @@ class APIBaseTranslator(BaseTranslator):
         self.api_key = getattr(settings, self.API_KEY_SETTINGS_PARAM)
         if not self.api_key:
             raise ValueError('API key is not set')
+        self.concurrency = settings.concurrency or self.MAX_CONCURRENCY
+        self.rate_limiter = RateLimiter.from_settings(settings, type(self))
+        self.latency_model = LatencyModel.from_settings(settings, type(self))
+        self._local = threading.local()
+        self._sessions: list[requests.Session] = []
 
     def __enter__(self) -> 'BaseTranslator':
-        self._session = requests.Session()
         return self
 
     def __exit__(self, *args: Any, **kwargs: Any) -> None:
-        self._session.close()
+        for session in self._sessions:
+            session.close()
+        self._sessions.clear()
+        if self.latency_model is not None:
+            self.latency_model.close()
+
+    @property
+    def max_chars(self) -> int:
+        return self.get_max_chars(self._settings)
+
+    @property
+    def max_text_chars(self) -> int:
+        return self.get_max_text_chars(self._settings)
+
+    @property
+    def _session(self) -> requests.Session:
+        # requests.Session is not thread-safe, so each worker thread gets its own one
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self.make_session()
+            self._sessions.append(session)
+        return session
+
+    def make_session(self) -> requests.Session:
+        return requests.Session()
 
     def translate(self, *, text: str) -> str:
-        response = self.make_request(text=text)
-        return self.get_translated_data(response)
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        translations = []
+        for request_texts in self.split_to_requests(texts):
+            chars = sum(len(text) for text in request_texts)
+            timeout = self.get_timeout(chars)
+            with self.pace(request_texts):
+                started_at = time.monotonic()
+                response = self.make_request(texts=request_texts, timeout=timeout)
+            self.observe_latency(chars, started_at)
+            translations.extend(self.get_translated_data(response))
+        if len(translations) != len(texts):
+            raise ValueError(f'Expected {len(texts)} translations, got {len(translations)}')
+        return translations
+
+    def pace(self, texts: list[str]) -> ContextManager[None]:
+        if self.rate_limiter is None:
+            return contextlib.nullcontext()
+        return self.rate_limiter.acquire(chars=sum(len(text) for text in texts))
+
+    def get_timeout(self, chars: int) -> float:
+        if self.latency_model is None:
+            return self.REQUEST_TIMEOUT
+        return self.latency_model.get_timeout(
+            LatencyModel.TRANSLATION, chars, self.REQUEST_TIMEOUT
+        )
+
+    def observe_latency(self, chars: int, started_at: float) -> None:
+        if self.latency_model is not None:
+            self.latency_model.observe(
+                LatencyModel.TRANSLATION, chars, time.monotonic() - started_at
+            )
+
+    async def translate_batch_async(self, texts: list[str]) -> list[str]:
+        # Requests are blocking, they run in the default executor of the engine loop
+        return await asyncio.to_thread(self.translate_batch, texts)
+
+    def split_to_requests(self, texts: list[str]) -> Iterator[list[str]]:
+        request_texts: list[str] = []
+        request_size = 0
+        for text in texts:
+            text_size = len(json.dumps(text).encode('utf-8'))
+            if request_texts and (
+                len(request_texts) >= self.BATCH_SIZE
+                or (self.MAX_REQUEST_SIZE and request_size + text_size > self.MAX_REQUEST_SIZE)
+            ):
+                yield request_texts
+                request_texts, request_size = [], 0
+            request_texts.append(text)
+            request_size += text_size
+        if request_texts:
+            yield request_texts
 
     @abc.abstractmethod
-    def make_request(self, *, text: str) -> requests.Response: ...
+    def make_request(self, *, texts: list[str], timeout: float) -> requests.Response: ...
 
     @abc.abstractmethod
-    def get_translated_data(self, response: requests.Response) -> str: ...
+    def get_translated_data(self, response: requests.Response) -> list[str]: ...
@@ -1,13 +1,45 @@
 import abc
-from typing import TYPE_CHECKING, Any, Protocol
+from typing import TYPE_CHECKING, Any, ClassVar, Optional, Protocol, runtime_checkable
 
 if TYPE_CHECKING:
     from md_translate.settings import Settings
 
 
 class BaseTranslatorProtocol(Protocol):  # pragma: no cover
+    BATCH_SIZE: ClassVar[int] = 1
+    # Longest text the service accepts at once, 0 if it is not limited
+    MAX_CHARS: ClassVar[int] = 0
+    # Longest block sent in one request, longer ones are split. `MAX_CHARS` if 0
+    MAX_TEXT_CHARS: ClassVar[int] = 0
+
+    @property
+    def batch_size(self) -> int:
+        return self.BATCH_SIZE
+
+    @property
+    def max_chars(self) -> int:
+        return self.MAX_CHARS
+
+    @property
+    def max_text_chars(self) -> int:
+        return self.MAX_TEXT_CHARS or self.max_chars
+
     def translate(self, *, text: str) -> str: ...
 
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        return [self.translate(text=text) for text in texts]
+
+    def translated_by(self, text: str) -> Optional[str]:
+        """Name of the service which translated the text, if the translator routes requests."""
+        return None
+
+
+@runtime_checkable
+class AsyncTranslatorProtocol(BaseTranslatorProtocol, Protocol):  # pragma: no cover
+    concurrency: int
+
+    async def translate_batch_async(self, texts: list[str]) -> list[str]: ...
+
 
 class BaseTranslator(BaseTranslatorProtocol, metaclass=abc.ABCMeta):  # pragma: no cover
     @abc.abstractmethod
@@ -21,3 +53,21 @@ class BaseTranslator(BaseTranslatorProtocol, metaclass=abc.ABCMeta):  # pragma:
 
     @abc.abstractmethod
     def translate(self, *, text: str) -> str: ...
+
+    @classmethod
+    def get_batch_size(cls, settings: 'Settings') -> int:
+        return cls.BATCH_SIZE
+
+    @classmethod
+    def get_max_chars(cls, settings: 'Settings') -> int:
+        """Limit of the service from config, or the default one."""
+        from md_translate.translators import Translator
+
+        return settings.max_chars.get(Translator(cls).name, cls.MAX_CHARS)
+
+    @classmethod
+    def get_max_text_chars(cls, settings: 'Settings') -> int:
+        """Split limit of the service from config, or the default one."""
+        from md_translate.translators import Translator
+
+        return settings.max_chars.get(Translator(cls).name, cls.MAX_TEXT_CHARS or cls.MAX_CHARS)
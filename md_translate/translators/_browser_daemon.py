@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import signal
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+import requests
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from md_translate.translators._file_lock import FileLock
+
+if TYPE_CHECKING:
+    from md_translate.translators._selenium_base import SeleniumBaseTranslator
+
+logger = logging.getLogger(__name__)
+
+DAEMON_DIR = Path('~/.cache/md_translate/browser_daemon').expanduser()
+
+REACHABILITY_TIMEOUT = 0.5
+
+
+def _endpoint_file(state_dir: Path, key: str, slot: int) -> Path:
+    return state_dir / key / f'endpoint-{slot}.json'
+
+
+def is_reachable(debugger_address: str) -> bool:
+    try:
+        response = requests.get(
+            f'http://{debugger_address}/json/version', timeout=REACHABILITY_TIMEOUT
+        )
+    except requests.RequestException:
+        return False
+    return response.ok
+
+
+def acquire_endpoint(key: str, state_dir: Path = DAEMON_DIR) -> Optional[tuple[str, FileLock]]:
+    """Finds a free daemon browser of the provider and locks it for the lifetime of a driver.
+
+    Returns `None` if no daemon is running or all of its browsers are busy.
+    """
+    endpoint_files = sorted((state_dir / key).glob('endpoint-*.json'))
+    for endpoint_file in endpoint_files:
+        lock = FileLock(endpoint_file.with_suffix('.lock'))
+        if not lock.acquire(blocking=False):
+            continue
+        try:
+            debugger_address = json.loads(endpoint_file.read_text())['debugger_address']
+        except (OSError, ValueError, KeyError):
+            lock.release()
+            continue
+        if is_reachable(debugger_address):
+            return debugger_address, lock
+        logger.debug('Browser daemon endpoint is not reachable: %s', debugger_address)
+        lock.release()
+    return None
+
+
+class BrowserDaemon:
+    """Keeps warm browsers of a provider open between CLI runs.
+
+    Each browser listens on its own remote debugging port, which is published in the state
+    directory. Translators attach to a free browser instead of starting a new one.
+    """
+
+    HEALTH_CHECK_INTERVAL = 5
+
+    def __init__(
+        self,
+        translator: 'SeleniumBaseTranslator',
+        *,
+        browsers: int = 1,
+        port: int = 9222,
+        state_dir: Path = DAEMON_DIR,
+    ) -> None:
+        self.translator = translator
+        self.browsers = browsers
+        self.port = port
+        self.state_dir = state_dir
+        self._drivers: dict[int, WebDriver] = {}
+        self._stopped = threading.Event()
+
+    @property
+    def key(self) -> str:
+        return self.translator.driver_pool_key
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        try:
+            for slot in range(self.browsers):
+                self.try_start_browser(slot)
+            logger.info('Browser daemon for %s is running, press Ctrl+C to stop', self.key)
+            while not self._stopped.wait(self.HEALTH_CHECK_INTERVAL):
+                self.check_browsers()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def stop(self, *args: Any) -> None:
+        self._stopped.set()
+
+    def start_browser(self, slot: int) -> None:
+        port = self.port + slot
+        self._drivers[slot] = self.translator.make_driver(remote_debugging_port=port)
+        endpoint_file = _endpoint_file(self.state_dir, self.key, slot)
+        endpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        endpoint_file.write_text(
+            json.dumps({'debugger_address': f'127.0.0.1:{port}', 'pid': os.getpid()})
+        )
+        logger.info('Started browser for %s on port %s', self.key, port)
+
+    def try_start_browser(self, slot: int) -> None:
+        # A browser which failed to start is retried on the next check, other ones keep working
+        try:
+            self.start_browser(slot)
+        except (WebDriverException, requests.RequestException, OSError) as error:
+            logger.error('Failed to start browser on port %s: %s', self.port + slot, error)
+
+    def stop_browser(self, slot: int) -> None:
+        _endpoint_file(self.state_dir, self.key, slot).unlink(missing_ok=True)
+        driver = self._drivers.pop(slot, None)
+        if driver is None:
+            return
+        try:
+            # The browser may still hold the port, even if it does not respond
+            driver.quit()
+        except Exception as error:
+            logger.debug('Failed to quit browser: %s', error)
+
+    def check_browsers(self) -> None:
+        for slot in range(self.browsers):
+            driver = self._drivers.get(slot)
+            if driver is not None and self.is_alive(driver):
+                continue
+            if driver is not None:
+                logger.warning('Browser on port %s is closed, restarting', self.port + slot)
+                self.stop_browser(slot)
+            self.try_start_browser(slot)
+
+    @staticmethod
+    def is_alive(driver: WebDriver) -> bool:
+        try:
+            driver.current_url
+        except WebDriverException:
+            return False
+        return True
+
+    def shutdown(self) -> None:
+        for slot in list(self._drivers):
+            self.stop_browser(slot)
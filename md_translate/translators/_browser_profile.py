@@ -0,0 +1,92 @@
+import enum
+from pathlib import Path
+
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from md_translate.translators._file_lock import FileLock
+
+
+class BrowserProfile(str, enum.Enum):
+    FULL = 'full'  # page is rendered and loaded as in a regular browser
+    LEAN = 'lean'  # headless, no images, fonts, media and analytics
+
+
+LEAN_DISK_CACHE_SIZE = 32 * 1024 * 1024
+
+# Images, fonts and media are not needed to translate text
+LEAN_BLOCKED_EXTENSIONS = [
+    'png',
+    'jpg',
+    'jpeg',
+    'gif',
+    'webp',
+    'avif',
+    'ico',
+    'woff',
+    'woff2',
+    'ttf',
+    'otf',
+    'eot',
+    'mp4',
+    'webm',
+    'mp3',
+    'ogg',
+    'wav',
+]
+
+LEAN_BLOCKED_HOSTS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'mc.yandex.ru',
+    'mc.yandex.com',
+    'bat.bing.com',
+    'clarity.ms',
+    'connect.facebook.net',
+    'hotjar.com',
+    'scorecardresearch.com',
+]
+
+LEAN_BLOCKED_URLS = [
+    *(f'*.{extension}' for extension in LEAN_BLOCKED_EXTENSIONS),
+    *(f'*.{extension}?*' for extension in LEAN_BLOCKED_EXTENSIONS),
+    *(f'*{host}*' for host in LEAN_BLOCKED_HOSTS),
+]
+
+
+def apply_lean_options(options: Options) -> None:
+    options.add_argument('--headless=new')
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_argument(f'--disk-cache-size={LEAN_DISK_CACHE_SIZE}')
+    options.add_argument('--mute-audio')
+    options.add_experimental_option(
+        'prefs',
+        {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.media_stream': 2,
+        },
+    )
+
+
+def block_lean_urls(driver: WebDriver) -> None:
+    # Blocking is set up with DevTools per tab, so it has to be called for every new tab
+    driver.execute_cdp_cmd('Network.enable', {})  # type: ignore[attr-defined]
+    driver.execute_cdp_cmd(  # type: ignore[attr-defined]
+        'Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS}
+    )
+
+
+def acquire_user_data_dir(base_dir: Path, key: str) -> tuple[Path, FileLock]:
+    """Finds a free profile slot of the provider and locks it for the lifetime of a browser.
+
+    Concurrent browsers of the same provider get different slots, so they never share a profile.
+    """
+    slot = 0
+    while True:
+        user_data_dir = base_dir / key / f'slot-{slot}'
+        lock = FileLock(user_data_dir.with_name(f'{user_data_dir.name}.lock'))
+        if lock.acquire(blocking=False):
+            user_data_dir.mkdir(parents=True, exist_ok=True)
+            return user_data_dir, lock
+        slot += 1
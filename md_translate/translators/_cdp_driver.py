@@ -0,0 +1,468 @@
+import itertools
+import json
+import logging
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import requests
+import websocket
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    TimeoutException,
+    WebDriverException,
+)
+
+logger = logging.getLogger(__name__)
+
+CHROME_BINARY_NAMES = [
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser',
+    'chrome',
+]
+CHROME_BINARY_PATHS = [
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    'C:/Program Files/Google/Chrome/Application/chrome.exe',
+    'C:/Program Files (x86)/Google/Chrome/Application/chrome.exe',
+]
+
+# Elements found by the driver are registered in page, scripts get them back by id. The page is
+# kept between blocks, so a node keeps its id, and nodes are held weakly and dropped once removed.
+_ELEMENT_KEY = '__mdTranslateElement'
+_PAGE_HELPERS = '''
+const registry = window.__mdTranslateElements = window.__mdTranslateElements || {
+    ids: new WeakMap(), elements: new Map(), next: 0,
+};
+const revive = (value) => {
+    if (Array.isArray(value)) {
+        return value.map(revive);
+    }
+    if (value && typeof value === 'object') {
+        if ('__mdTranslateElement' in value) {
+            const reference = registry.elements.get(value.__mdTranslateElement);
+            const element = reference && reference.deref();
+            if (!element || !element.isConnected) {
+                throw new Error('stale element reference');
+            }
+            return element;
+        }
+        return Object.fromEntries(Object.entries(value).map(([k, v]) => [k, revive(v)]));
+    }
+    return value;
+};
+'''
+_FIND_ELEMENTS = '''
+const [by, value, root] = arguments;
+const scope = root || document;
+let found = [];
+if (by === 'xpath') {
+    const result = document.evaluate(
+        value, scope, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    for (let i = 0; i < result.snapshotLength; i++) {
+        found.push(result.snapshotItem(i));
+    }
+} else if (by === 'id') {
+    found = scope.querySelectorAll(`#${CSS.escape(value)}`);
+} else if (by === 'name') {
+    found = scope.querySelectorAll(`[name="${CSS.escape(value)}"]`);
+} else if (by === 'tag name') {
+    found = scope.getElementsByTagName(value);
+} else if (by === 'class name') {
+    found = scope.getElementsByClassName(value);
+} else {
+    found = scope.querySelectorAll(value);
+}
+for (const [id, reference] of registry.elements) {
+    const element = reference.deref();
+    if (!element || !element.isConnected) {
+        registry.elements.delete(id);
+    }
+}
+return Array.from(found).map((element) => {
+    let id = registry.ids.get(element);
+    if (id === undefined) {
+        id = registry.next++;
+        registry.ids.set(element, id);
+    }
+    registry.elements.set(id, new WeakRef(element));
+    return id;
+});
+'''
+
+
+def find_chrome_binary() -> str:
+    for name in CHROME_BINARY_NAMES:
+        binary = shutil.which(name)
+        if binary:
+            return binary
+    for path in CHROME_BINARY_PATHS:
+        if Path(path).exists():
+            return path
+    raise WebDriverException('Chrome binary is not found')
+
+
+class CdpConnection:
+    """Synchronous client of Chrome DevTools protocol over the browser websocket.
+
+    Tabs are attached in flat mode, so commands to all of them go through one connection.
+    Events are dropped, except the ones which are awaited with `wait_for_event`.
+    """
+
+    def __init__(self, websocket_url: str, timeout: float = 30) -> None:
+        self.timeout = timeout
+        self._socket = websocket.create_connection(
+            websocket_url, timeout=timeout, suppress_origin=True
+        )
+        self._ids = itertools.count(1)
+        self._awaited_events: set[str] = set()
+        self._events: list[dict[str, Any]] = []
+
+    def send(
+        self,
+        method: str,
+        params: Optional[dict[str, Any]] = None,
+        *,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> dict[str, Any]:
+        message_id = next(self._ids)
+        message: dict[str, Any] = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        self._socket.send(json.dumps(message))
+        response = self._receive(lambda data: data.get('id') == message_id, timeout)
+        if 'error' in response:
+            raise WebDriverException(f'{method}: {response["error"].get("message")}')
+        return response.get('result', {})
+
+    def expect_event(self, method: str) -> None:
+        self._awaited_events.add(method)
+        self._events = [event for event in self._events if event['method'] != method]
+
+    def wait_for_event(
+        self, method: str, *, session_id: Optional[str] = None, timeout: Optional[float] = None
+    ) -> dict[str, Any]:
+        def is_awaited(data: dict[str, Any]) -> bool:
+            return data.get('method') == method and data.get('sessionId') == session_id
+
+        try:
+            for event in self._events:
+                if is_awaited(event):
+                    self._events.remove(event)
+                    return event
+            return self._receive(is_awaited, timeout)
+        finally:
+            self._awaited_events.discard(method)
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def _receive(self, is_expected: Any, timeout: Optional[float]) -> dict[str, Any]:
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while True:
+            data = self._read_message(deadline - time.monotonic())
+            if is_expected(data):
+                return data
+            if data.get('method') in self._awaited_events:
+                self._events.append(data)
+
+    def _read_message(self, timeout: float) -> dict[str, Any]:
+        if timeout <= 0:
+            raise TimeoutException('DevTools response is not received in time')
+        self._socket.settimeout(timeout)
+        try:
+            return json.loads(self._socket.recv())
+        except websocket.WebSocketTimeoutException:
+            raise TimeoutException('DevTools response is not received in time')
+        except (websocket.WebSocketException, OSError) as error:
+            raise WebDriverException(f'DevTools connection is closed: {error}')
+
+
+class CdpElement:
+    def __init__(self, driver: 'CdpDriver', ref: int) -> None:
+        self._driver = driver
+        self.ref = ref
+
+    def to_json(self) -> dict[str, int]:
+        return {_ELEMENT_KEY: self.ref}
+
+    def find_element(self, by: str, value: str) -> 'CdpElement':
+        return self._driver.find_element(by, value, root=self)
+
+    def find_elements(self, by: str, value: str) -> list['CdpElement']:
+        return self._driver.find_elements(by, value, root=self)
+
+    def click(self) -> None:
+        self._driver.execute_script(
+            'arguments[0].scrollIntoView({block: "center"}); arguments[0].click();', self
+        )
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self._driver.execute_script(
+            'const value = arguments[0][arguments[1]];'
+            'return value === undefined || value === null '
+            '? arguments[0].getAttribute(arguments[1]) : String(value);',
+            self,
+            name,
+        )
+
+    def is_displayed(self) -> bool:
+        return self._driver.execute_script(
+            'const element = arguments[0];'
+            'return !!(element.offsetWidth || element.offsetHeight '
+            '|| element.getClientRects().length);',
+            self,
+        )
+
+    @property
+    def text(self) -> str:
+        return self._driver.execute_script('return arguments[0].innerText;', self)
+
+
+class _SwitchTo:
+    def __init__(self, driver: 'CdpDriver') -> None:
+        self._driver = driver
+
+    def window(self, handle: str) -> None:
+        if handle not in self._driver.sessions:
+            raise NoSuchWindowException(f'No window {handle}')
+        self._driver.current_window_handle = handle
+
+    def new_window(self, type_hint: Optional[str] = None) -> None:
+        self._driver.current_window_handle = self._driver.open_tab()
+
+
+class CdpDriver:
+    """Browser driver talking to Chrome over DevTools protocol, without chromedriver.
+
+    Implements the part of WebDriver API used by translators, so providers work with both
+    backends. Each call is a single websocket message instead of an HTTP request to chromedriver
+    which is translated to one or more DevTools messages.
+    """
+
+    LAUNCH_TIMEOUT = 30
+    QUIT_TIMEOUT = 10
+    PAGE_LOAD_TIMEOUT = 30
+
+    def __init__(
+        self,
+        connection: CdpConnection,
+        *,
+        process: Optional[subprocess.Popen] = None,
+        temp_dir: Optional[Path] = None,
+    ) -> None:
+        self.connection = connection
+        self.process = process
+        self._temp_dir = temp_dir
+        self.sessions: dict[str, str] = {}
+        self.switch_to = _SwitchTo(self)
+        self._implicit_wait: float = 0
+        self._script_timeout: float = 30
+        self.current_window_handle = self._attach_first_tab()
+
+    @classmethod
+    def launch(
+        cls,
+        arguments: list[str],
+        *,
+        binary: Optional[str] = None,
+        user_data_dir: Optional[Path] = None,
+    ) -> 'CdpDriver':
+        temp_dir = None
+        if user_data_dir is None:
+            temp_dir = user_data_dir = Path(tempfile.mkdtemp(prefix='md_translate_chrome_'))
+        port_file = user_data_dir / 'DevToolsActivePort'
+        port_file.unlink(missing_ok=True)
+        process = subprocess.Popen(
+            cls.make_command(binary or find_chrome_binary(), arguments, user_data_dir),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + cls.LAUNCH_TIMEOUT
+        # Chrome writes the chosen port and browser websocket path once DevTools are ready
+        while not port_file.exists() or len(port_file.read_text().splitlines()) < 2:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise WebDriverException('Chrome is not started')
+            time.sleep(0.05)
+        port, path = port_file.read_text().splitlines()[:2]
+        connection = CdpConnection(f'ws://127.0.0.1:{port}{path}')
+        return cls(connection, process=process, temp_dir=temp_dir)
+
+    @staticmethod
+    def make_command(binary: str, arguments: list[str], user_data_dir: Path) -> list[str]:
+        # chromedriver adds the prefix to options, Chrome itself opens arguments without it as URLs
+        switches = [
+            argument if argument.startswith('--') else f'--{argument}' for argument in arguments
+        ]
+        return [
+            binary,
+            '--remote-debugging-port=0',
+            f'--user-data-dir={user_data_dir}',
+            '--no-first-run',
+            '--no-default-browser-check',
+            *switches,
+            'about:blank',
+        ]
+
+    @classmethod
+    def connect(cls, debugger_address: str) -> 'CdpDriver':
+        version = requests.get(f'http://{debugger_address}/json/version', timeout=5).json()
+        return cls(CdpConnection(version['webSocketDebuggerUrl']))
+
+    @property
+    def window_handles(self) -> list[str]:
+        return list(self.sessions)
+
+    @property
+    def current_url(self) -> str:
+        return self.execute_script('return window.location.href;')
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict[str, Any]) -> dict[str, Any]:
+        return self.connection.send(cmd, cmd_args, session_id=self._session_id)
+
+    def implicitly_wait(self, time_to_wait: float) -> None:
+        self._implicit_wait = time_to_wait
+
+    def set_script_timeout(self, time_to_wait: float) -> None:
+        self._script_timeout = time_to_wait
+
+    def get(self, url: str) -> None:
+        self.connection.expect_event('Page.loadEventFired')
+        result = self.execute_cdp_cmd('Page.navigate', {'url': url})
+        if result.get('errorText'):
+            raise WebDriverException(f'Failed to load {url}: {result["errorText"]}')
+        self.connection.wait_for_event(
+            'Page.loadEventFired', session_id=self._session_id, timeout=self.PAGE_LOAD_TIMEOUT
+        )
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        expression = (
+            '(() => {'
+            + _PAGE_HELPERS
+            + f'const args = revive({self._dump_args(args)});'
+            + f'return (function () {{\n{script}\n}}).apply(window, args);'
+            + '})()'
+        )
+        return self._evaluate(expression, await_promise=False)
+
+    def execute_async_script(self, script: str, *args: Any) -> Any:
+        timeout_ms = int(self._script_timeout * 1000)
+        expression = (
+            'new Promise((resolve, reject) => {'
+            + _PAGE_HELPERS
+            + f'const args = revive({self._dump_args(args)});'
+            + 'args.push(resolve);'
+            + f'setTimeout(() => reject(new Error("script timeout")), {timeout_ms});'
+            + f'(function () {{\n{script}\n}}).apply(window, args);'
+            + '})'
+        )
+        return self._evaluate(expression, await_promise=True)
+
+    def find_element(
+        self, by: str, value: str, *, root: Optional[CdpElement] = None
+    ) -> CdpElement:
+        elements = self.find_elements(by, value, root=root)
+        if not elements:
+            raise NoSuchElementException(f'Unable to locate element: {by}={value}')
+        return elements[0]
+
+    def find_elements(
+        self, by: str, value: str, *, root: Optional[CdpElement] = None
+    ) -> list[CdpElement]:
+        deadline = time.monotonic() + self._implicit_wait
+        while True:
+            refs = self.execute_script(_FIND_ELEMENTS, by, value, root)
+            if refs or time.monotonic() >= deadline:
+                return [CdpElement(self, ref) for ref in refs]
+            time.sleep(0.05)
+
+    def open_tab(self) -> str:
+        target_id = self.connection.send('Target.createTarget', {'url': 'about:blank'})['targetId']
+        self._attach(target_id)
+        return target_id
+
+    def close(self) -> None:
+        handle = self.current_window_handle
+        self.connection.send('Target.closeTarget', {'targetId': handle})
+        self.sessions.pop(handle, None)
+
+    def quit(self) -> None:
+        try:
+            if self.process is None:
+                # Browser is owned by someone else, only tabs of the driver are closed
+                for handle in list(self.sessions):
+                    self.connection.send('Target.closeTarget', {'targetId': handle})
+            else:
+                self.connection.send('Browser.close')
+        except WebDriverException:
+            logger.debug('Browser is already closed')
+        finally:
+            self.sessions.clear()
+            self.connection.close()
+            self._stop_process()
+
+    @property
+    def _session_id(self) -> str:
+        try:
+            return self.sessions[self.current_window_handle]
+        except KeyError:
+            raise NoSuchWindowException('Current window is closed')
+
+    def _attach_first_tab(self) -> str:
+        if self.process is not None:
+            targets = self.connection.send('Target.getTargets')['targetInfos']
+            pages = [target for target in targets if target['type'] == 'page']
+            if pages:
+                self._attach(pages[0]['targetId'])
+                return pages[0]['targetId']
+        # Tabs of a shared browser are not touched, the driver works in its own one
+        return self.open_tab()
+
+    def _attach(self, target_id: str) -> None:
+        session_id = self.connection.send(
+            'Target.attachToTarget', {'targetId': target_id, 'flatten': True}
+        )['sessionId']
+        self.sessions[target_id] = session_id
+        self.connection.send('Page.enable', session_id=session_id)
+
+    def _evaluate(self, expression: str, *, await_promise: bool) -> Any:
+        result = self.connection.send(
+            'Runtime.evaluate',
+            {'expression': expression, 'returnByValue': True, 'awaitPromise': await_promise},
+            session_id=self._session_id,
+            timeout=self._script_timeout + self.connection.timeout,
+        )
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            message = details.get('exception', {}).get('description') or details.get('text')
+            if 'script timeout' in str(message):
+                raise TimeoutException('Script is not completed in time')
+            raise JavascriptException(message)
+        return result['result'].get('value')
+
+    @staticmethod
+    def _dump_args(args: tuple[Any, ...]) -> str:
+        def default(value: Any) -> Any:
+            if isinstance(value, CdpElement):
+                return value.to_json()
+            raise TypeError(f'Object of type {type(value).__name__} can not be passed to page')
+
+        return json.dumps(list(args), default=default)
+
+    def _stop_process(self) -> None:
+        if self.process is not None:
+            try:
+                self.process.wait(self.QUIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
@@ -0,0 +1,87 @@
+import json
+import logging
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Type
+
+from md_translate.translators._file_lock import FileLock
+
+if TYPE_CHECKING:
+    from md_translate.settings import Settings
+    from md_translate.translators import BaseTranslator
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Pauses a provider for a cool-down once it starts blocking requests.
+
+    State is shared by all processes through a file guarded by a file lock, so one antispam
+    page pauses the provider for every worker. The cool-down doubles with each trip in a row,
+    up to `max_cooldown`, and is reset once a file is translated.
+    """
+
+    DEFAULT_DIR = Path('~/.cache/md_translate/circuit_breakers').expanduser()
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        cooldown: float,
+        max_cooldown: float,
+        state_dir: Path = DEFAULT_DIR,
+    ) -> None:
+        self.name = name
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state_path = state_dir / f'{name}.json'
+        self.lock_path = state_dir / f'{name}.lock'
+
+    @classmethod
+    def from_settings(
+        cls, settings: 'Settings', provider: Type['BaseTranslator'], *, max_cooldown: float
+    ) -> Optional['CircuitBreaker']:
+        from md_translate.translators import Translator
+
+        if not settings.antispam_cooldown:
+            return None
+        return cls(
+            Translator(provider).name,
+            cooldown=settings.antispam_cooldown,
+            max_cooldown=max_cooldown,
+        )
+
+    def retry_after(self) -> float:
+        with FileLock(self.lock_path):
+            state = self._read_state()
+        return max(state['open_until'] - time.time(), 0)
+
+    def trip(self) -> float:
+        """Opens the circuit and returns seconds until the provider can be retried."""
+        with FileLock(self.lock_path):
+            state = self._read_state()
+            now = time.time()
+            # Workers which hit the same antispam page do not extend the cool-down
+            if state['open_until'] <= now:
+                cooldown = min(self.cooldown * 2 ** state['failures'], self.max_cooldown)
+                state['failures'] += 1
+                state['open_until'] = now + cooldown
+                self._write_state(state)
+                logger.warning('Antispam detected, pausing %s for %.0f s', self.name, cooldown)
+            return state['open_until'] - now
+
+    def reset(self) -> None:
+        with FileLock(self.lock_path):
+            state = self._read_state()
+            if state['failures']:
+                logger.info('%s is not blocked anymore', self.name)
+                self._write_state({'failures': 0, 'open_until': 0})
+
+    def _read_state(self) -> dict[str, Any]:
+        try:
+            return json.loads(self.state_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'failures': 0, 'open_until': 0}
+
+    def _write_state(self, state: dict[str, Any]) -> None:
+        self.state_path.write_text(json.dumps(state))
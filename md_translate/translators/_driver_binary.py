@@ -0,0 +1,52 @@
+import functools
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = Path('~/.cache/md_translate/chromedriver.json').expanduser()
+
+
+def get_chrome_version() -> Optional[str]:
+    return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_chromedriver_path(
+    chromedriver_path: Optional[Path] = None, manifest_path: Path = MANIFEST_PATH
+) -> str:
+    """Returns path to chromedriver, resolving it at most once per process.
+
+    An explicitly configured chromedriver is used as is. Otherwise the path is looked up in the
+    local manifest by installed Chrome version, and webdriver_manager is called only on a miss.
+    """
+    if chromedriver_path:
+        return str(chromedriver_path)
+    chrome_version = get_chrome_version()
+    manifest = _read_manifest(manifest_path)
+    cached_path = manifest.get(chrome_version) if chrome_version else None
+    if cached_path and Path(cached_path).exists():
+        logger.debug('Using cached chromedriver for Chrome %s: %s', chrome_version, cached_path)
+        return cached_path
+    driver_path = ChromeDriverManager().install()
+    if chrome_version:
+        manifest[chrome_version] = driver_path
+        _write_manifest(manifest_path, manifest)
+    return driver_path
+
+
+def _read_manifest(manifest_path: Path) -> dict[str, str]:
+    try:
+        return json.loads(manifest_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(manifest_path: Path, manifest: dict[str, str]) -> None:
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=4))
@@ -0,0 +1,110 @@
+import logging
+import multiprocessing.util
+import os
+from typing import Callable, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from md_translate.translators._process_memory import format_memory, get_own_rss
+
+logger = logging.getLogger(__name__)
+
+DriverFactory = Callable[[], WebDriver]
+
+
+class DriverPool:
+    """Keeps warm browsers for the lifetime of a process.
+
+    Drivers are grouped by key, so providers with different browser options never share them.
+    A released driver is reset to a blank page and handed to the next file. All drivers are quit
+    when the process (or pool worker) exits.
+    """
+
+    BLANK_PAGE = 'about:blank'
+
+    def __init__(self) -> None:
+        self._idle: dict[str, list[WebDriver]] = {}
+        self._cleanups: dict[int, Callable[[], None]] = {}
+        self._uses: dict[int, int] = {}
+        self._pid: Optional[int] = None
+
+    def acquire(self, key: str, factory: DriverFactory) -> WebDriver:
+        self._ensure_process()
+        idle_drivers = self._idle.setdefault(key, [])
+        while idle_drivers:
+            driver = idle_drivers.pop()
+            if self._is_alive(driver):
+                logger.debug('Reusing browser for %s', key)
+                return driver
+            self.discard(driver)
+        logger.debug('Starting new browser for %s', key)
+        return factory()
+
+    def release(self, key: str, driver: WebDriver) -> None:
+        try:
+            self._reset(driver)
+        except WebDriverException:
+            self.discard(driver)
+            return
+        self._idle.setdefault(key, []).append(driver)
+
+    def add_cleanup(self, driver: WebDriver, cleanup: Callable[[], None]) -> None:
+        self._cleanups[id(driver)] = cleanup
+
+    def add_uses(self, driver: WebDriver, count: int = 1) -> None:
+        self._uses[id(driver)] = self.get_uses(driver) + count
+
+    def get_uses(self, driver: WebDriver) -> int:
+        return self._uses.get(id(driver), 0)
+
+    def discard(self, driver: WebDriver) -> None:
+        try:
+            driver.quit()
+        except WebDriverException:  # pragma: no cover
+            logger.debug('Browser is already closed')
+        self._uses.pop(id(driver), None)
+        cleanup = self._cleanups.pop(id(driver), None)
+        if cleanup:
+            cleanup()
+
+    def shutdown(self) -> None:
+        if any(self._idle.values()):
+            logger.info(
+                'Shutting down browsers of process %s (process RSS %s)',
+                os.getpid(),
+                format_memory(get_own_rss()),
+            )
+        for drivers in self._idle.values():
+            for driver in drivers:
+                self.discard(driver)
+        self._idle.clear()
+
+    def _ensure_process(self) -> None:
+        # Drivers can't be shared with forked workers, each process starts with an empty pool
+        if self._pid == os.getpid():
+            return
+        self._idle = {}
+        self._cleanups = {}
+        self._uses = {}
+        self._pid = os.getpid()
+        multiprocessing.util.Finalize(self, self.shutdown, exitpriority=10)
+
+    def _reset(self, driver: WebDriver) -> None:
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get(self.BLANK_PAGE)
+
+    @staticmethod
+    def _is_alive(driver: WebDriver) -> bool:
+        try:
+            driver.current_url
+        except WebDriverException:
+            return False
+        return True
+
+
+driver_pool = DriverPool()
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+from typing import IO, Any, Optional
+
+if sys.platform == 'win32':  # pragma: no cover
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """Exclusive lock on a file, shared between processes.
+
+    The lock is released by the OS if the process dies, so stale lock files are harmless.
+    An instance must not be shared between threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: Optional[IO[str]] = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *args: Any, **kwargs: Any) -> None:
+        self.release()
+
+    @property
+    def locked(self) -> bool:
+        return self._file is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = self.path.open('a')
+        try:
+            self._lock(lock_file, blocking)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        self._unlock(self._file)
+        self._file.close()
+        self._file = None
+
+    @staticmethod
+    def _lock(lock_file: IO[str], blocking: bool) -> None:
+        if sys.platform == 'win32':  # pragma: no cover
+            mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), mode, 1)
+        else:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            fcntl.flock(lock_file.fileno(), flags)
+
+    @staticmethod
+    def _unlock(lock_file: IO[str]) -> None:
+        if sys.platform == 'win32':  # pragma: no cover
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,168 @@
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Type
+
+if TYPE_CHECKING:
+    from md_translate.settings import Settings
+    from md_translate.translators import BaseTranslator
+
+
+class LatencyFit(NamedTuple):
+    base: float  # seconds
+    per_char: float  # seconds
+    std: float  # seconds, of residuals
+    samples: int
+
+    def predict(self, chars: int) -> float:
+        return self.base + self.per_char * chars
+
+    def __str__(self) -> str:
+        return (
+            f'{self.base:.2f} s + {self.per_char * 1000:.2f} ms/char, '
+            f'std {self.std:.2f} s ({self.samples} timings)'
+        )
+
+
+class LatencyModel:
+    """Latency of a provider as a linear function of input characters.
+
+    The model is fitted with weighted least squares on observed timings. Its sums are kept in the
+    translation memory database, so the model is shared between files, runs and worker processes.
+    Weights of older timings decay, so the model follows changes of the provider.
+    """
+
+    TRANSLATION = 'translation'
+    PAGE_LOAD = 'page_load'
+
+    DECAY = 0.98
+    MIN_SAMPLES = 10
+    # Deadline is the predicted latency plus a few deviations, times the margin
+    SAFETY_STDS = 3
+    SAFETY_MARGIN = 1.5
+    MIN_TIMEOUT = 2.0
+    MAX_TIMEOUT = 120.0
+
+    BUSY_TIMEOUT = 30
+
+    def __init__(self, path: Path, *, service: str) -> None:
+        self.path = path
+        self.service = service
+        self._connection: Optional[sqlite3.Connection] = None
+        # Hedged requests use the provider from another thread
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'LatencyModel':
+        return self
+
+    def __exit__(self, *args: Any, **kwargs: Any) -> None:
+        self.close()
+
+    @classmethod
+    def from_settings(
+        cls, settings: 'Settings', provider: Type['BaseTranslator']
+    ) -> Optional['LatencyModel']:
+        from md_translate.translators import Translator
+
+        if not settings.adaptive_timeouts:
+            return None
+        return cls(settings.translation_memory_path, service=Translator(provider).name)
+
+    def observe(self, kind: str, chars: int, seconds: float) -> None:
+        with self._lock:
+            self._get_connection().execute(
+                'INSERT INTO latency_models '
+                '(service, kind, weight, sum_x, sum_y, sum_xx, sum_xy, sum_yy, samples) '
+                'VALUES (:service, :kind, 1, :x, :y, :x * :x, :x * :y, :y * :y, 1) '
+                'ON CONFLICT (service, kind) DO UPDATE SET '
+                'weight = weight * :decay + 1, '
+                'sum_x = sum_x * :decay + :x, '
+                'sum_y = sum_y * :decay + :y, '
+                'sum_xx = sum_xx * :decay + :x * :x, '
+                'sum_xy = sum_xy * :decay + :x * :y, '
+                'sum_yy = sum_yy * :decay + :y * :y, '
+                'samples = samples + 1',
+                {
+                    'service': self.service,
+                    'kind': kind,
+                    'x': chars,
+                    'y': seconds,
+                    'decay': self.DECAY,
+                },
+            )
+
+    def get_fit(self, kind: str) -> Optional[LatencyFit]:
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    'SELECT weight, sum_x, sum_y, sum_xx, sum_xy, sum_yy, samples '
+                    'FROM latency_models WHERE service = ? AND kind = ?',
+                    (self.service, kind),
+                )
+                .fetchone()
+            )
+        if row is None or row[-1] < self.MIN_SAMPLES:
+            return None
+        return self.fit(*row)
+
+    def get_timeout(self, kind: str, chars: int, default: float) -> float:
+        """Returns deadline of a request, or `default` while there are not enough timings."""
+        fit = self.get_fit(kind)
+        if fit is None:
+            return default
+        timeout = (fit.predict(chars) + self.SAFETY_STDS * fit.std) * self.SAFETY_MARGIN
+        return min(max(timeout, self.MIN_TIMEOUT), self.MAX_TIMEOUT)
+
+    @staticmethod
+    def fit(
+        weight: float,
+        sum_x: float,
+        sum_y: float,
+        sum_xx: float,
+        sum_xy: float,
+        sum_yy: float,
+        samples: int,
+    ) -> LatencyFit:
+        mean_x = sum_x / weight
+        mean_y = sum_y / weight
+        variance_x = sum_xx / weight - mean_x**2
+        variance_y = sum_yy / weight - mean_y**2
+        covariance = sum_xy / weight - mean_x * mean_y
+        # Latency does not fall with length, a negative slope is noise of similar lengths
+        per_char = max(covariance / variance_x, 0) if variance_x > 1e-9 else 0
+        base = max(mean_y - per_char * mean_x, 0)
+        residual_variance = variance_y - per_char * covariance
+        return LatencyFit(base, per_char, math.sqrt(max(residual_variance, 0)), samples)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                str(self.path),
+                timeout=self.BUSY_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS latency_models ('
+                'service TEXT NOT NULL, '
+                'kind TEXT NOT NULL, '
+                'weight REAL NOT NULL, '
+                'sum_x REAL NOT NULL, '
+                'sum_y REAL NOT NULL, '
+                'sum_xx REAL NOT NULL, '
+                'sum_xy REAL NOT NULL, '
+                'sum_yy REAL NOT NULL, '
+                'samples INTEGER NOT NULL, '
+                'PRIMARY KEY (service, kind))'
+            )
+        return self._connection
@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+PROC_DIR = Path('/proc')
+
+
+def get_process_tree_rss(pid: int, proc_dir: Path = PROC_DIR) -> Optional[int]:
+    """Returns resident memory of the process and all its descendants in bytes.
+
+    Browsers run renderers in child processes, so memory of the whole tree is summed up. Memory
+    is read from procfs, `None` is returned where it is not available.
+    """
+    if not (proc_dir / str(pid)).exists():
+        return None
+    children: dict[int, list[int]] = {}
+    for stat_file in proc_dir.glob('[0-9]*/stat'):
+        try:
+            stat = stat_file.read_text()
+        except OSError:
+            continue  # process has exited
+        # Process name may contain spaces and parentheses, so fields are taken after the last one
+        parent_pid = int(stat.rsplit(')', 1)[1].split()[1])
+        children.setdefault(parent_pid, []).append(int(stat_file.parent.name))
+    rss = 0
+    pids = [pid]
+    while pids:
+        current_pid = pids.pop()
+        rss += _read_rss(proc_dir / str(current_pid))
+        pids.extend(children.get(current_pid, []))
+    return rss
+
+
+def get_own_rss(proc_dir: Path = PROC_DIR) -> Optional[int]:
+    if not (proc_dir / str(os.getpid())).exists():
+        return None
+    return _read_rss(proc_dir / str(os.getpid()))
+
+
+def format_memory(rss: Optional[int]) -> str:
+    if rss is None:
+        return 'n/a'
+    return f'{rss / 1024 / 1024:.0f} MB'
+
+
+def _read_rss(process_dir: Path) -> int:
+    try:
+        status = (process_dir / 'status').read_text()
+    except OSError:
+        return 0
+    for line in status.splitlines():
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) * 1024
+    return 0
@@ -0,0 +1,134 @@
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Type
+
+from pydantic import BaseModel
+
+from md_translate.translators._file_lock import FileLock
+
+if TYPE_CHECKING:
+    from md_translate.settings import Settings
+    from md_translate.translators import BaseTranslator
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimit(BaseModel):
+    requests_per_second: float
+    burst: int = 1
+    # Characters sent to provider and not yet translated, 0 means unlimited
+    max_in_flight_chars: int = 0
+
+
+class RateLimiter:
+    """Token bucket shared by all processes which translate with the same provider.
+
+    Bucket state is kept in a JSON file guarded by a file lock, so pool workers (and separate
+    runs) draw from one budget. Each request takes a token, tokens are refilled with the
+    configured rate up to the burst size. Characters of requests in flight are limited as well.
+    """
+
+    DEFAULT_DIR = Path('~/.cache/md_translate/rate_limits').expanduser()
+
+    MAX_WAIT_STEP = 1.0
+
+    def __init__(self, name: str, limit: RateLimit, state_dir: Path = DEFAULT_DIR) -> None:
+        self.name = name
+        self.limit = limit
+        self.state_path = state_dir / f'{name}.json'
+        self.lock_path = state_dir / f'{name}.lock'
+
+    @classmethod
+    def from_settings(
+        cls, settings: 'Settings', provider: Type['BaseTranslator']
+    ) -> Optional['RateLimiter']:
+        from md_translate.translators import Translator
+
+        name = Translator(provider).name
+        limit = settings.rate_limits.get(name)
+        if limit is None:
+            return None
+        return cls(name, limit)
+
+    @contextlib.contextmanager
+    def acquire(self, *, requests: int = 1, chars: int = 0) -> Iterator[None]:
+        started_at = time.monotonic()
+        while True:
+            lease, wait_time = self._try_acquire(requests, chars)
+            if lease is not None:
+                break
+            time.sleep(min(wait_time, self.MAX_WAIT_STEP))
+        waited = time.monotonic() - started_at
+        if waited > 0.01:
+            logger.debug('Waited %.2f s for %s rate limit', waited, self.name)
+        try:
+            yield
+        finally:
+            self._release(lease)
+
+    def _try_acquire(self, requests: int, chars: int) -> tuple[Optional[str], float]:
+        # Lock is not shared between threads, each of them waits for it on its own
+        with FileLock(self.lock_path):
+            state = self._read_state()
+            in_flight_chars = sum(chars for _, chars in state['in_flight'].values())
+            # A single request bigger than the limit is sent once nothing else is in flight
+            chars_exceeded = (
+                self.limit.max_in_flight_chars
+                and in_flight_chars
+                and in_flight_chars + chars > self.limit.max_in_flight_chars
+            )
+            # Requests of a batch bigger than the burst are borrowed from future tokens
+            required_tokens = min(requests, self.limit.burst)
+            if state['tokens'] < required_tokens or chars_exceeded:
+                missing_tokens = max(required_tokens - state['tokens'], 0)
+                self._write_state(state)
+                return None, max(missing_tokens / self.limit.requests_per_second, 0.05)
+            lease = f'{os.getpid()}-{uuid.uuid4().hex}'
+            state['tokens'] -= requests
+            state['in_flight'][lease] = [os.getpid(), chars]
+            self._write_state(state)
+            return lease, 0
+
+    def _release(self, lease: str) -> None:
+        with FileLock(self.lock_path):
+            state = self._read_state()
+            state['in_flight'].pop(lease, None)
+            self._write_state(state)
+
+    def _read_state(self) -> dict[str, Any]:
+        now = time.time()
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = {'tokens': self.limit.burst, 'updated_at': now, 'in_flight': {}}
+        elapsed = max(now - state['updated_at'], 0)
+        state['tokens'] = min(
+            state['tokens'] + elapsed * self.limit.requests_per_second, self.limit.burst
+        )
+        state['updated_at'] = now
+        # Requests of crashed processes would block the budget forever
+        state['in_flight'] = {
+            lease: value for lease, value in state['in_flight'].items() if _is_alive(value[0])
+        }
+        return state
+
+    def _write_state(self, state: dict[str, Any]) -> None:
+        self.state_path.write_text(json.dumps(state))
+
+
+def _is_alive(pid: int) -> bool:
+    if sys.platform == 'win32':  # pragma: no cover
+        return True  # signal 0 terminates the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # pragma: no cover
+        return True
+    return True
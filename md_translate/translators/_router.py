@@ -0,0 +1,311 @@
+import collections
+import concurrent.futures
+import contextlib
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Optional, Type, cast
+
+from md_translate.exceptions import ProviderBlocked
+from md_translate.translators._base_translator import BaseTranslator
+
+if TYPE_CHECKING:
+    from md_translate.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderStats:
+    """Rolling latency and error rate of a provider, as exponential moving averages."""
+
+    SMOOTHING = 0.3
+    # Even a provider which fails most of the time is tried once the others are worse
+    MAX_ERROR_RATE = 0.9
+    # Latencies kept for percentiles, and the number needed before they are trusted
+    WINDOW = 50
+    MIN_SAMPLES = 5
+
+    def __init__(self) -> None:
+        self.latency_per_text: Optional[float] = None
+        self.error_rate = 0.0
+        self.blocked_until = 0.0
+        self.latencies: collections.deque[float] = collections.deque(maxlen=self.WINDOW)
+
+    def add_success(self, elapsed: float, texts: int) -> None:
+        latency = elapsed / max(texts, 1)
+        self.latencies.append(latency)
+        if self.latency_per_text is None:
+            self.latency_per_text = latency
+        else:
+            self.latency_per_text += self.SMOOTHING * (latency - self.latency_per_text)
+        self.error_rate -= self.SMOOTHING * self.error_rate
+
+    def add_error(self) -> None:
+        self.error_rate += self.SMOOTHING * (1 - self.error_rate)
+
+    def block(self, retry_after: float) -> None:
+        self.blocked_until = time.monotonic() + retry_after
+
+    @property
+    def is_blocked(self) -> bool:
+        return self.blocked_until > time.monotonic()
+
+    def expected_time(
+        self, weight: float, default_latency: Optional[float] = None
+    ) -> Optional[float]:
+        """Expected seconds per text, failed attempts included.
+
+        `default_latency` is used if the latency is not measured yet, `None` is returned without it.
+        """
+        latency = self.latency_per_text if self.latency_per_text is not None else default_latency
+        if latency is None:
+            return None
+        error_rate = min(self.error_rate, self.MAX_ERROR_RATE)
+        return latency / weight / (1 - error_rate)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Latency per text below which the given percent of recent requests finished."""
+        if len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[min(int(len(latencies) * percentile / 100), len(latencies) - 1)]
+
+
+class HedgeBudget:
+    """Limits extra requests of hedging to a share of all requests."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def add_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self, share: float) -> bool:
+        with self._lock:
+            if self.hedges + 1 > share * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+
+# Stats outlive a file, so each worker process keeps learning through the whole run
+routing_stats: dict[str, ProviderStats] = {}
+hedge_budget = HedgeBudget()
+
+
+class ProviderRouter(BaseTranslator):
+    """Sends each batch to the provider with the best expected completion time.
+
+    Providers which were not used yet are expected to be as fast as the measured ones on average,
+    scaled by their weights. So the main service is used first, and a fallback service is
+    started when it has a higher weight or the measured ones get slower or fail. If a provider
+    raises or is blocked by antispam, the batch fails over to the next one.
+
+    With hedging, a batch which takes longer than the given percentile of the provider latency is
+    sent to the next provider as well (or to a second session of the same one), and the first
+    translation wins.
+    """
+
+    HEDGE_SESSION_SUFFIX = '#hedge'
+
+    def __init__(self, settings: 'Settings') -> None:
+        from md_translate.translators import Translator
+
+        self._settings = settings
+        self._provider_types = {
+            Translator(provider).name: provider for provider in settings.service_providers
+        }
+        self._weights = {
+            name: settings.service_weights.get(name, 1.0) for name in self._provider_types
+        }
+        self._providers: dict[str, BaseTranslator] = {}
+        # A provider instance is used by one thread at a time, a hedged loser may still run
+        self._provider_locks: collections.defaultdict[str, threading.Lock] = (
+            collections.defaultdict(threading.Lock)
+        )
+        self._lock = threading.Lock()
+        self._exit_stack = contextlib.ExitStack()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._translated_by: dict[str, str] = {}
+
+    @property
+    def batch_size(self) -> int:
+        return next(iter(self._provider_types.values())).get_batch_size(self._settings)
+
+    @property
+    def max_chars(self) -> int:
+        # Text is routed to any of the services, so it should fit into each of them
+        limits = [
+            provider.get_max_chars(self._settings) for provider in self._provider_types.values()
+        ]
+        return min([limit for limit in limits if limit], default=0)
+
+    @property
+    def max_text_chars(self) -> int:
+        limits = [
+            provider.get_max_text_chars(self._settings)
+            for provider in self._provider_types.values()
+        ]
+        return min([limit for limit in limits if limit], default=0)
+
+    def __enter__(self) -> 'ProviderRouter':
+        return self
+
+    def __exit__(self, *args: Any, **kwargs: Any) -> None:
+        if self._executor is not None:
+            # Abandoned requests finish before their providers are closed
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        # Providers see the error of the file, so they don't reset their antispam cooldown
+        self._exit_stack.__exit__(*args)
+        self._providers.clear()
+
+    def translate(self, *, text: str) -> str:
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        blocked: list[ProviderBlocked] = []
+        error: Optional[Exception] = None
+        ranked_providers = self.rank_providers()
+        for name, next_name in zip(ranked_providers, [*ranked_providers[1:], None]):
+            # Next service hedges the batch, or a second session of the same one if it is the last
+            hedge_session = next_name or name + self.HEDGE_SESSION_SUFFIX
+            try:
+                translated_by, translations = self._translate_hedged(name, hedge_session, texts)
+            except ProviderBlocked as e:
+                blocked.append(e)
+                logger.warning('%s. Failing over to next service', e)
+                continue
+            except Exception as e:
+                error = e
+                logger.warning('%s failed: %r. Failing over to next service', name, e)
+                continue
+            self._translated_by.update(dict.fromkeys(texts, translated_by))
+            return translations
+        raise self._get_unavailable_error(blocked, error)
+
+    def _translate_hedged(
+        self, name: str, hedge_session: str, texts: list[str]
+    ) -> tuple[str, list[str]]:
+        """Returns name of the service which translated the batch first, and the translations."""
+        threshold = self._get_hedge_threshold(name, texts)
+        if threshold is None:
+            return name, self._request(name, texts)
+        executor = self._get_executor()
+        future = executor.submit(self._request, name, texts)
+        try:
+            return name, future.result(timeout=threshold)
+        except concurrent.futures.TimeoutError:
+            pass
+        if not hedge_budget.try_spend(self._settings.hedge_budget):
+            return name, future.result()
+        logger.info('%s is slower than %.1f s, hedging with %s', name, threshold, hedge_session)
+        hedge = executor.submit(self._request, hedge_session, texts)
+        return self._get_first_result({future: name, hedge: hedge_session})
+
+    def _get_first_result(
+        self, futures: dict[concurrent.futures.Future[list[str]], str]
+    ) -> tuple[str, list[str]]:
+        errors = {}
+        for completed in concurrent.futures.as_completed(futures):
+            try:
+                translations = completed.result()
+            except Exception as e:
+                logger.debug('%s failed while hedging: %r', futures[completed], e)
+                errors[futures[completed]] = e
+                continue
+            # Loser can't be interrupted in the middle of request, its result is dropped
+            for pending in futures:
+                pending.cancel()
+            return futures[completed].removesuffix(self.HEDGE_SESSION_SUFFIX), translations
+        # Error of the hedged service is the one to fail over from
+        raise errors[next(iter(futures.values()))]
+
+    def _get_hedge_threshold(self, name: str, texts: list[str]) -> Optional[float]:
+        if not self._settings.hedge_percentile:
+            return None
+        hedge_budget.add_request()
+        stats = routing_stats.setdefault(name, ProviderStats())
+        latency = stats.percentile(self._settings.hedge_percentile)
+        if latency is None:
+            return None
+        return latency * len(texts)
+
+    def _request(self, session: str, texts: list[str]) -> list[str]:
+        stats = routing_stats.setdefault(
+            session.removesuffix(self.HEDGE_SESSION_SUFFIX), ProviderStats()
+        )
+        with self._provider_locks[session]:
+            started_at = time.monotonic()
+            try:
+                translations = self._get_provider(session).translate_batch(texts)
+            except ProviderBlocked as e:
+                stats.add_error()
+                stats.block(e.retry_after)
+                raise
+            except Exception:
+                stats.add_error()
+                raise
+        stats.add_success(time.monotonic() - started_at, len(texts))
+        return translations
+
+    def _get_unavailable_error(
+        self, blocked: list[ProviderBlocked], error: Optional[Exception]
+    ) -> Exception:
+        # A blocked service may recover, so the file is requeued instead of failed
+        if blocked:
+            return ProviderBlocked('All services', min(e.retry_after for e in blocked))
+        if error is not None:
+            return error
+        # Every service is cooling down, so the file is requeued until the first one is ready
+        blocked_until = min(routing_stats[name].blocked_until for name in self._provider_types)
+        return ProviderBlocked('All services', max(blocked_until - time.monotonic(), 0))
+
+    def translated_by(self, text: str) -> Optional[str]:
+        return self._translated_by.get(text)
+
+    def rank_providers(self) -> list[str]:
+        """Returns names of providers which are not blocked, best first.
+
+        On a tie a measured provider goes first, otherwise the configured order is kept.
+        """
+        names = [
+            name
+            for name in self._provider_types
+            if not routing_stats.setdefault(name, ProviderStats()).is_blocked
+        ]
+        latencies = [
+            latency
+            for name in names
+            if (latency := routing_stats[name].latency_per_text) is not None
+        ]
+        default_latency = sum(latencies) / len(latencies) if latencies else 0.0
+
+        def get_expected_time(name: str) -> tuple[float, bool]:
+            stats = routing_stats[name]
+            expected_time = stats.expected_time(self._weights[name], default_latency)
+            return cast(float, expected_time), stats.latency_per_text is None
+
+        return sorted(names, key=get_expected_time)
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix='md-translate-hedge'
+            )
+        return self._executor
+
+    def _get_provider(self, session: str) -> BaseTranslator:
+        """Returns provider of the session, the caller holds the session lock."""
+        # Browsers of fallback services are started only if a batch is routed to them
+        if session not in self._providers:
+            name = session.removesuffix(self.HEDGE_SESSION_SUFFIX)
+            provider_type: Type[BaseTranslator] = self._provider_types[name]
+            provider = provider_type(self._settings).__enter__()
+            with self._lock:
+                self._exit_stack.push(provider)
+                self._providers[session] = provider
+        return self._providers[session]
@@ -0,0 +1,254 @@
+# JavaScript snippets executed in translator pages.
+
+import json
+
+# Finds the editable element inside of the input element of translator page.
+_FIND_EDITABLE = '''
+const findEditable = (element) => {
+    if (element.matches('textarea, input, [contenteditable="true"]')) {
+        return element;
+    }
+    return element.querySelector('textarea, input, [contenteditable="true"]') || element;
+};
+'''
+
+SET_INPUT_VALUE = (
+    _FIND_EDITABLE
+    + '''
+const target = findEditable(arguments[0]);
+const text = arguments[1];
+target.focus();
+if (target.isContentEditable) {
+    document.execCommand('selectAll', false);
+    document.execCommand('insertText', false, text);
+    return;
+}
+// Native setter is used, so frameworks tracking the value (React, Vue) notice the change
+const prototype = Object.getPrototypeOf(target);
+Object.getOwnPropertyDescriptor(prototype, 'value').set.call(target, text);
+target.dispatchEvent(new Event('input', {bubbles: true}));
+target.dispatchEvent(new Event('change', {bubbles: true}));
+'''
+)
+
+SELECT_INPUT = (
+    _FIND_EDITABLE
+    + '''
+const target = findEditable(arguments[0]);
+target.focus();
+if (target.isContentEditable) {
+    document.execCommand('selectAll', false);
+} else {
+    target.select();
+}
+'''
+)
+
+# Helpers available to page state scripts of providers. Scripts get source and target languages
+# as arguments and return an object with `antispam`, `translated` and `output` fields.
+_PAGE_STATE_HELPERS = '''
+const [fromLang, toLang] = arguments;
+const isVisible = (element) => !!(
+    element && (element.offsetWidth || element.offsetHeight || element.getClientRects().length)
+);
+const findByXPath = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const readValue = (element) => {
+    if (!element) {
+        return '';
+    }
+    return typeof element.value === 'string' ? element.value : element.innerText;
+};
+'''
+
+
+def make_page_state_script(body: str) -> str:
+    return _PAGE_STATE_HELPERS + body
+
+
+def _make_watch_translation_function(page_state_script: str) -> str:
+    # Watch is kept in page, so the quiet period runs while other tabs are collected
+    return (
+        '''
+const watchTranslation = (fromLang, toLang, previousOutput) => {
+    if (window.__mdTranslateWatch) {
+        window.__mdTranslateWatch.stop();
+    }
+    const readState = function () {
+'''
+        + page_state_script
+        + '''
+    };
+    const watch = {state: null, candidate: null, changedAt: 0, listeners: []};
+    const update = () => {
+        const state = readState(fromLang, toLang);
+        const translated = state.translated && state.output !== previousOutput;
+        const candidate = translated ? state.output : null;
+        if (candidate !== watch.candidate) {
+            watch.candidate = candidate;
+            watch.changedAt = Date.now();
+        }
+        watch.state = state;
+        watch.listeners.forEach((listener) => listener());
+    };
+    const observer = new MutationObserver(update);
+    observer.observe(document.body, {
+        subtree: true, childList: true, characterData: true, attributes: true,
+    });
+    // Value of textarea set by a script is not reflected in DOM, it is checked in page instead
+    const poller = setInterval(update, 250);
+    watch.update = update;
+    watch.stop = () => {
+        observer.disconnect();
+        clearInterval(poller);
+        if (window.__mdTranslateWatch === watch) {
+            delete window.__mdTranslateWatch;
+        }
+    };
+    window.__mdTranslateWatch = watch;
+    update();
+    return watch;
+};
+'''
+    )
+
+
+def make_watch_translation_script(page_state_script: str) -> str:
+    """Script, which starts watching the page for translation before text is entered.
+
+    Changes of the output are recorded in page with their time, so a wait for translation in one
+    tab does not delay the quiet period of other tabs.
+    """
+    return (
+        _make_watch_translation_function(page_state_script)
+        + '''
+const [fromLang, toLang, previousOutput] = arguments;
+watchTranslation(fromLang, toLang, previousOutput);
+'''
+    )
+
+
+def make_wait_for_translation_script(page_state_script: str) -> str:
+    """Async script, which resolves with page state once translation is complete.
+
+    Page is watched with MutationObserver instead of polling, starting from
+    `make_watch_translation_script` if it was run. Translation is complete, when the output
+    differs from the previous one and has not changed during the quiet period. Resolves
+    immediately on antispam, and with `null` on timeout.
+    """
+    return (
+        _make_watch_translation_function(page_state_script)
+        + '''
+const [fromLang, toLang, previousOutput, quietPeriod, timeout] = arguments;
+const done = arguments[arguments.length - 1];
+const watch = window.__mdTranslateWatch || watchTranslation(fromLang, toLang, previousOutput);
+let quietTimer = null;
+let deadline = null;
+const finish = (state) => {
+    watch.listeners = watch.listeners.filter((listener) => listener !== check);
+    watch.stop();
+    clearTimeout(quietTimer);
+    clearTimeout(deadline);
+    done(state);
+};
+const check = () => {
+    clearTimeout(quietTimer);
+    if (watch.state.antispam) {
+        finish(watch.state);
+        return;
+    }
+    if (watch.candidate === null) {
+        return;
+    }
+    const remaining = quietPeriod - (Date.now() - watch.changedAt);
+    if (remaining <= 0) {
+        finish(watch.state);
+        return;
+    }
+    // State is read again when the quiet period ends
+    quietTimer = setTimeout(watch.update, remaining);
+};
+watch.listeners.push(check);
+deadline = setTimeout(() => finish(null), timeout);
+check();
+'''
+    )
+
+
+def make_capture_responses_script(url_pattern: str) -> str:
+    """Script installed before page scripts run, which records bodies of translation responses.
+
+    `fetch` and `XMLHttpRequest` are wrapped, so responses of requests with URL matching the
+    pattern are kept in `window.__mdTranslateCapture` and reported to its listeners.
+    """
+    return (
+        '''
+(() => {
+if (window.__mdTranslateCapture) {
+    return;
+}
+const pattern = new RegExp('''
+        + json.dumps(url_pattern)
+        + ''');
+const capture = {responses: [], listeners: []};
+window.__mdTranslateCapture = capture;
+const record = (url, body) => {
+    if (!pattern.test(url)) {
+        return;
+    }
+    capture.responses.push(body);
+    capture.listeners.forEach((listener) => listener());
+};
+const originalFetch = window.fetch;
+window.fetch = function (...args) {
+    return originalFetch.apply(this, args).then((response) => {
+        response.clone().text().then((body) => record(response.url, body), () => {});
+        return response;
+    });
+};
+const originalSend = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.send = function (...args) {
+    this.addEventListener('load', () => {
+        if (this.responseType === '' || this.responseType === 'text') {
+            record(this.responseURL, this.responseText);
+        }
+    });
+    return originalSend.apply(this, args);
+};
+})();
+'''
+    )
+
+
+# Async script, which resolves with responses captured after the given index once any arrives.
+# Resolves with `installed: false` if capture is not installed in page, and with `null` on timeout.
+WAIT_FOR_CAPTURED_RESPONSES = '''
+const [consumed, timeout] = arguments;
+const done = arguments[arguments.length - 1];
+const capture = window.__mdTranslateCapture;
+if (!capture) {
+    done({installed: false, responses: [], total: 0});
+    return;
+}
+// Responses are dropped when the page navigates by itself
+const since = capture.responses.length < consumed ? 0 : consumed;
+let deadline = null;
+const finish = (result) => {
+    capture.listeners = capture.listeners.filter((listener) => listener !== check);
+    clearTimeout(deadline);
+    done(result);
+};
+const check = () => {
+    if (capture.responses.length > since) {
+        finish({
+            installed: true,
+            responses: capture.responses.slice(since),
+            total: capture.responses.length,
+        });
+    }
+};
+capture.listeners.push(check);
+deadline = setTimeout(() => finish(null), timeout);
+check();
+'''
@@ -1,21 +1,41 @@
 import abc
+import contextlib
+import dataclasses
+import enum
 import logging
 import pathlib
 import time
 import urllib.parse
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, ContextManager, Iterator, NamedTuple, Optional, cast
 
 import requests
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver import ActionChains
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.wait import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
 
+from md_translate.exceptions import ProviderBlocked
+from md_translate.translators import _scripts as scripts
 from md_translate.translators._base_translator import BaseTranslator
+from md_translate.translators._browser_daemon import acquire_endpoint
+from md_translate.translators._browser_profile import (
+    BrowserProfile,
+    acquire_user_data_dir,
+    apply_lean_options,
+    block_lean_urls,
+)
+from md_translate.translators._cdp_driver import CdpDriver
+from md_translate.translators._circuit_breaker import CircuitBreaker
+from md_translate.translators._driver_binary import resolve_chromedriver_path
+from md_translate.translators._driver_pool import driver_pool
+from md_translate.translators._latency_model import LatencyModel
+from md_translate.translators._process_memory import format_memory, get_process_tree_rss
+from md_translate.translators._rate_limiter import RateLimiter
 from md_translate.translators.randomizer.randomizer import Randomizer
 
 if TYPE_CHECKING:
@@ -29,6 +49,39 @@ class AntiSpamException(Exception):
     pass
 
 
+class PageState(NamedTuple):
+    antispam: bool
+    translated: bool
+    output: str
+
+
+@dataclasses.dataclass
+class Tab:
+    handle: str
+    page_loaded: bool = False
+    last_output: Optional[str] = None
+    captured_responses: int = 0
+    # Deadline and start of the current translation
+    translation_timeout: float = 0
+    started_at: float = 0
+
+
+class InputMethod(str, enum.Enum):
+    KEYS = 'keys'  # real key events, slow for long texts
+    SCRIPT = 'script'  # value setter with dispatched input event
+    INSERT_TEXT = 'insert_text'  # CDP Input.insertText
+
+
+class CaptureMode(str, enum.Enum):
+    DOM = 'dom'  # output element of translator page
+    NETWORK = 'network'  # translation response of translator page
+
+
+class BrowserBackend(str, enum.Enum):
+    WEBDRIVER = 'webdriver'  # chromedriver
+    CDP = 'cdp'  # DevTools protocol websocket of Chrome, see `_cdp_driver.CdpDriver`
+
+
 class SeleniumBaseTranslator(BaseTranslator):
     HEADLESS = False
 
@@ -42,114 +95,508 @@ class SeleniumBaseTranslator(BaseTranslator):
     ANTISPAM_TIMEOUT = 60 * 60  # 1 hour
     PAGE_LOAD_TIMEOUT = 10
     TRANSLATION_TIMEOUT = 10
+    TRANSLATION_QUIET_PERIOD = 0.3
+    SCRIPT_TIMEOUT_MARGIN = 5
     IMPLICIT_WAIT = 3
 
+    INPUT_METHOD = InputMethod.SCRIPT
+
+    # URLs of requests made by translator page to translate text, used by network capture mode.
+    # Providers without it always read translation from the page.
+    CAPTURE_URL_PATTERN: Optional[str] = None
+
+    # Checks antispam, translation readiness and reads output in a single round trip,
+    # see `_scripts.make_page_state_script`
+    PAGE_STATE_SCRIPT: str
+
     def __init__(self, settings: 'Settings') -> None:
         self._settings = settings
         self._session = requests.Session()
         self.from_language = settings.from_lang
         self.to_language = settings.to_lang
         self.randomizer = Randomizer()
+        self.rate_limiter = RateLimiter.from_settings(settings, type(self))
+        self.circuit_breaker = CircuitBreaker.from_settings(
+            settings, type(self), max_cooldown=self.ANTISPAM_TIMEOUT
+        )
+        self.latency_model = LatencyModel.from_settings(settings, type(self))
+        self._failed = False
 
     def __enter__(self) -> 'BaseTranslator':
-        options = self.randomizer.make_options()
-        self._driver = webdriver.Chrome(  # type: ignore
-            service=ChromeService(ChromeDriverManager().install()), options=options
-        )
-        self._driver.implicitly_wait(self.IMPLICIT_WAIT)
+        if self.circuit_breaker is not None:
+            retry_after = self.circuit_breaker.retry_after()
+            if retry_after:
+                raise ProviderBlocked(self.circuit_breaker.name, retry_after)
+        self._failed = False
+        self.open_driver()
         return self
 
-    def __exit__(self, *args: Any, **kwargs: Any) -> None:
-        self._driver.quit()
+    def __exit__(self, exc_type: Optional[type], *args: Any, **kwargs: Any) -> None:
+        if exc_type is None:
+            driver_pool.release(self.driver_pool_key, self._driver)
+        else:
+            driver_pool.discard(self._driver)
+        if exc_type is None and self.circuit_breaker is not None and not self._failed:
+            self.circuit_breaker.reset()
+        if self.latency_model is not None:
+            self.latency_model.close()
+
+    @property
+    def driver_pool_key(self) -> str:
+        return self.__class__.__name__
+
+    @classmethod
+    def get_batch_size(cls, settings: 'Settings') -> int:
+        # Each tab translates a text of the batch
+        return settings.tabs
+
+    @property
+    def batch_size(self) -> int:
+        return self.get_batch_size(self._settings)
+
+    @property
+    def max_chars(self) -> int:
+        return self.get_max_chars(self._settings)
+
+    @property
+    def max_text_chars(self) -> int:
+        return self.get_max_text_chars(self._settings)
+
+    def open_driver(self) -> None:
+        self._driver = cast(
+            webdriver.Chrome, driver_pool.acquire(self.driver_pool_key, self.connect_driver)
+        )
+        self.tab = Tab(self._driver.current_window_handle)
+        self.tabs = [self.tab]
+        self.setup_tab()
+
+    def recycle_driver_if_needed(self) -> None:
+        max_translations = self._settings.browser_max_translations
+        max_memory = self._settings.browser_max_memory * 1024 * 1024
+        if not max_translations and not max_memory:
+            return
+        translations = driver_pool.get_uses(self._driver)
+        # Process tree is read from /proc, so memory is measured only when it is limited
+        rss = self.get_driver_rss() if max_memory else None
+        translations_exceeded = bool(max_translations) and translations >= max_translations
+        memory_exceeded = rss is not None and rss >= max_memory
+        if not translations_exceeded and not memory_exceeded:
+            return
+        if rss is None:
+            rss = self.get_driver_rss()
+        logger.info(
+            'Recycling browser after %s translations, browser RSS %s',
+            translations,
+            format_memory(rss),
+        )
+        driver_pool.discard(self._driver)
+        self.open_driver()
+
+    def get_driver_rss(self) -> Optional[int]:
+        # Chrome and its renderers are started by chromedriver, so its process tree is measured
+        process = getattr(self._driver, 'process', None) or getattr(
+            getattr(self._driver, 'service', None), 'process', None
+        )
+        if process is None:
+            return None
+        return get_process_tree_rss(process.pid)
+
+    def connect_driver(self) -> WebDriver:
+        return self.attach_to_daemon() or self.make_driver()
+
+    def attach_to_daemon(self) -> Optional[WebDriver]:
+        endpoint = acquire_endpoint(self.driver_pool_key)
+        if endpoint is None:
+            return None
+        debugger_address, endpoint_lock = endpoint
+        options = webdriver.ChromeOptions()
+        options.add_experimental_option('debuggerAddress', debugger_address)
+        try:
+            if self.browser_backend == BrowserBackend.CDP:
+                driver = cast(WebDriver, CdpDriver.connect(debugger_address))
+            else:
+                driver = webdriver.Chrome(  # type: ignore
+                    service=ChromeService(
+                        resolve_chromedriver_path(self._settings.chromedriver_path)
+                    ),
+                    options=options,
+                )
+        except (WebDriverException, requests.RequestException) as error:
+            logger.warning('Failed to attach to browser daemon: %s', error)
+            endpoint_lock.release()
+            return None
+        logger.info('Attached to browser daemon at %s', debugger_address)
+        # Quitting an attached driver leaves the daemon browser running
+        driver_pool.add_cleanup(driver, endpoint_lock.release)
+        driver.implicitly_wait(self.IMPLICIT_WAIT)
+        return driver
+
+    def make_driver(self, remote_debugging_port: Optional[int] = None) -> WebDriver:
+        options = self.make_options()
+        if remote_debugging_port:
+            options.add_argument(f'--remote-debugging-port={remote_debugging_port}')
+        user_data_dir, user_data_dir_lock = None, None
+        if self._settings.browser_user_data_dir:
+            user_data_dir, user_data_dir_lock = acquire_user_data_dir(
+                self._settings.browser_user_data_dir, self.driver_pool_key
+            )
+            logger.info('Using browser profile: %s', user_data_dir)
+        if self.browser_backend == BrowserBackend.CDP:
+            driver = cast(
+                WebDriver,
+                CdpDriver.launch(
+                    options.arguments,
+                    binary=options.binary_location or None,
+                    user_data_dir=user_data_dir,
+                ),
+            )
+        else:
+            if user_data_dir:
+                options.add_argument(f'--user-data-dir={user_data_dir}')
+            driver = webdriver.Chrome(  # type: ignore
+                service=ChromeService(resolve_chromedriver_path(self._settings.chromedriver_path)),
+                options=options,
+            )
+        if user_data_dir_lock:
+            driver_pool.add_cleanup(driver, user_data_dir_lock.release)
+        driver.implicitly_wait(self.IMPLICIT_WAIT)
+        return driver
+
+    @property
+    def browser_backend(self) -> BrowserBackend:
+        return BrowserBackend(self._settings.browser_backend)
+
+    @property
+    def browser_profile(self) -> BrowserProfile:
+        return BrowserProfile(self._settings.browser_profile)
+
+    @property
+    def capture_network(self) -> bool:
+        capture_mode = CaptureMode(self._settings.capture_mode)
+        return capture_mode == CaptureMode.NETWORK and self.CAPTURE_URL_PATTERN is not None
+
+    def make_options(self) -> webdriver.ChromeOptions:
+        options = self.randomizer.make_options()
+        if self.browser_profile == BrowserProfile.LEAN:
+            apply_lean_options(options)
+        elif self.HEADLESS:
+            options.add_argument('--headless=new')
+        if self._settings.tabs > 1:
+            # Background tabs should translate as fast as the active one
+            options.add_argument('--disable-background-timer-throttling')
+            options.add_argument('--disable-backgrounding-occluded-windows')
+            options.add_argument('--disable-renderer-backgrounding')
+        return options
 
     def translate(self, *, text: str) -> str:
-        time.sleep(self.randomizer.get_random_sleep_time())
-        self.load_page()
+        self.recycle_driver_if_needed()
+        with self.track_failures(), self.pace([text]):
+            return self.translate_in_tab(self.tab, text)
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        translations = []
+        for start in range(0, len(texts), self.batch_size):
+            end = start + self.batch_size
+            self.recycle_driver_if_needed()
+            with self.track_failures(), self.pace(texts[start:end]):
+                translations.extend(self.translate_in_tabs(texts[start:end]))
+        return translations
+
+    @contextlib.contextmanager
+    def track_failures(self) -> Iterator[None]:
+        # A router fails over to another service, so the file may succeed without this one
+        try:
+            yield
+        except Exception:
+            self._failed = True
+            raise
+
+    def pace(self, texts: list[str]) -> ContextManager[None]:
+        if self.rate_limiter is None:
+            time.sleep(self.randomizer.get_random_sleep_time())
+            return contextlib.nullcontext()
+        return self.rate_limiter.acquire(
+            requests=len(texts), chars=sum(len(text) for text in texts)
+        )
+
+    def translate_in_tabs(self, texts: list[str]) -> list[str]:
+        # Translations are started in all tabs first, then collected in the same order
+        tabs = self.get_tabs(len(texts))
+        started = [self.try_start_translation(tab, text) for tab, text in zip(tabs, texts)]
+        return [
+            self.translate_in_tab(tab, text, started=is_started)
+            for tab, text, is_started in zip(tabs, texts, started)
+        ]
+
+    def try_start_translation(self, tab: Tab, text: str) -> bool:
+        self.switch_to_tab(tab)
+        try:
+            self.start_translation(text)
+        except WebDriverException as error:
+            logger.warning('Failed to start translation in tab: %s', error.msg)
+            tab.page_loaded = False
+            return False
+        return True
+
+    def translate_in_tab(self, tab: Tab, text: str, started: bool = False) -> str:
+        self.switch_to_tab(tab)
+        driver_pool.add_uses(self._driver)
+        try:
+            if not started:
+                self.start_translation(text)
+            translation = self.finish_translation()
+        except WebDriverException as error:
+            logger.warning('Translation failed, reloading page: %s', error.msg)
+            tab.page_loaded = False
+            self.start_translation(text)
+            translation = self.finish_translation()
+        self.observe_latency(LatencyModel.TRANSLATION, len(text), tab.started_at)
+        return translation
+
+    def start_translation(self, text: str) -> None:
+        if self._settings.reload_page or not self.tab.page_loaded:
+            self.load_page()
         if self.check_for_antispam():
             self.wait_for_antispam()
         input_element = self.get_input_element()
-
-        action = ActionChains(self._driver)
-        action.move_to_element(input_element)
-        action.click()
-        action.send_keys(text)
-        action.perform()
-
+        self.tab.translation_timeout = self.get_timeout(
+            LatencyModel.TRANSLATION, len(text), self.TRANSLATION_TIMEOUT
+        )
+        self.tab.started_at = time.monotonic()
+        if not self.capture_network:
+            self.watch_translation()
+        self.enter_text(input_element, text)
+
+    def get_timeout(self, kind: str, chars: int, default: float) -> float:
+        if self.latency_model is None:
+            return default
+        return self.latency_model.get_timeout(kind, chars, default)
+
+    @property
+    def page_load_timeout(self) -> float:
+        return self.get_timeout(LatencyModel.PAGE_LOAD, 0, self.PAGE_LOAD_TIMEOUT)
+
+    def observe_latency(self, kind: str, chars: int, started_at: float) -> None:
+        if self.latency_model is not None:
+            self.latency_model.observe(kind, chars, time.monotonic() - started_at)
+
+    def finish_translation(self) -> str:
+        if self.capture_network:
+            translation = self.wait_for_captured_translation()
+            if translation is not None:
+                return translation
         try:
-            self.wait_for_translation()
+            state = self.wait_for_translation()
         except AntiSpamException:
             self.wait_for_antispam()
-            self.wait_for_translation()
-        output_element = self.get_output_element()
-        if self.check_for_antispam():
-            self.wait_for_antispam()
+            state = self.wait_for_translation()
 
-        data = self.get_translated_data(output_element)
-        clean_data = self.clear(data)
+        self.tab.last_output = state.output
+        clean_data = self.clear(state.output)
         return clean_data
 
+    def get_tabs(self, count: int) -> list[Tab]:
+        while len(self.tabs) < count:
+            self._driver.switch_to.new_window('tab')
+            self.tab = Tab(self._driver.current_window_handle)
+            self.tabs.append(self.tab)
+            self.setup_tab()
+        return self.tabs[:count]
+
+    def setup_tab(self) -> None:
+        if self.browser_profile == BrowserProfile.LEAN:
+            block_lean_urls(self._driver)
+        if self.capture_network:
+            # Installed for every page loaded in the tab, before scripts of the page run
+            self._driver.execute_cdp_cmd(
+                'Page.addScriptToEvaluateOnNewDocument',
+                {'source': scripts.make_capture_responses_script(self.CAPTURE_URL_PATTERN or '')},
+            )
+
+    def switch_to_tab(self, tab: Tab) -> None:
+        if self.tab is not tab:
+            self._driver.switch_to.window(tab.handle)
+            self.tab = tab
+
     def load_page(self) -> None:
+        started_at = time.monotonic()
         url = self.get_url()
         self._driver.get(url)
         self.wait_for_page_load()
         self.accept_cookies()
         self.wait_for_page_load()
+        logger.info(
+            'Page loaded in %.2f s (%s profile)',
+            time.monotonic() - started_at,
+            self.browser_profile.value,
+        )
+        self.observe_latency(LatencyModel.PAGE_LOAD, 0, started_at)
+        self.tab.page_loaded = True
+        self.tab.last_output = None
+        self.tab.captured_responses = 0
+
+    def enter_text(self, input_element: WebElement, text: str) -> None:
+        input_method = InputMethod(self._settings.input_method or self.INPUT_METHOD)
+        if input_method != InputMethod.KEYS:
+            try:
+                self.inject_text(input_element, text, input_method)
+                return
+            except WebDriverException as error:
+                logger.warning('Text injection failed, typing it instead: %s', error.msg)
+        self.type_text(input_element, text)
+
+    def inject_text(self, input_element: WebElement, text: str, input_method: InputMethod) -> None:
+        if input_method == InputMethod.INSERT_TEXT:
+            self._driver.execute_script(scripts.SELECT_INPUT, input_element)
+            self._driver.execute_cdp_cmd('Input.insertText', {'text': text})
+        else:
+            self._driver.execute_script(scripts.SET_INPUT_VALUE, input_element, text)
+
+    def type_text(self, input_element: WebElement, text: str) -> None:
+        if isinstance(self._driver, CdpDriver):
+            # Typed characters replace the selected text
+            self._driver.execute_script(scripts.SELECT_INPUT, input_element)
+            for char in text.replace('\n', '\r'):
+                self._driver.execute_cdp_cmd(
+                    'Input.dispatchKeyEvent', {'type': 'char', 'text': char}
+                )
+            return
+        action = ActionChains(self._driver)
+        action.move_to_element(input_element)
+        action.click()
+        # The page is kept between blocks, so the previous text has to be removed first
+        action.key_down(Keys.CONTROL).send_keys('a').key_up(Keys.CONTROL)
+        action.send_keys(Keys.DELETE)
+        action.send_keys(text)
+        action.perform()
 
     @abc.abstractmethod
     def get_url(self) -> str: ...
 
-    @abc.abstractmethod
-    def check_for_antispam(self) -> bool: ...
-
     @abc.abstractmethod
     def accept_cookies(self) -> None: ...
 
     @abc.abstractmethod
     def get_input_element(self) -> WebElement: ...
 
-    @abc.abstractmethod
-    def get_output_element(self) -> WebElement: ...
+    def get_page_state(self) -> PageState:
+        return self.make_page_state(
+            self._driver.execute_script(
+                self.PAGE_STATE_SCRIPT, self.from_language, self.to_language
+            )
+        )
 
     @staticmethod
-    def get_translated_data(output_element: WebElement) -> str:
-        return output_element.text
+    def make_page_state(raw_state: dict[str, Any]) -> PageState:
+        return PageState(
+            antispam=bool(raw_state['antispam']),
+            translated=bool(raw_state['translated']),
+            output=raw_state['output'] or '',
+        )
 
-    @abc.abstractmethod
-    def check_for_translation(self) -> bool: ...
+    def check_for_antispam(self) -> bool:
+        return self.get_page_state().antispam
 
     def wait_for_page_load(self) -> None:
         def wait_for(driver: Any) -> bool:
             return driver.execute_script('return document.readyState') == 'complete'
 
-        self.WEBDRIVER_WAIT(self._driver, self.PAGE_LOAD_TIMEOUT).until(wait_for)
+        self.WEBDRIVER_WAIT(self._driver, self.page_load_timeout).until(wait_for)
 
     def click_cookies_accept(self, btn_text: str) -> None:
-        try:
-            cookies_accept_button = self._driver.find_element(
+        with self.no_implicit_wait():
+            cookies_accept_buttons = self._driver.find_elements(
                 by=self.WEBDRIVER_BY.XPATH, value=f'//*[text()="{btn_text}"]'
             )
-            if cookies_accept_button:
-                cookies_accept_button.click()
-        except NoSuchElementException:
-            return
+        if cookies_accept_buttons:
+            cookies_accept_buttons[0].click()
+
+    @contextlib.contextmanager
+    def no_implicit_wait(self) -> Iterator[None]:
+        # Lookups which are expected to fail should not wait for the element to appear
+        self._driver.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            self._driver.implicitly_wait(self.IMPLICIT_WAIT)
 
     def wait_for_antispam(self) -> None:
+        if self.circuit_breaker is not None:
+            # The file is requeued instead of keeping the worker busy until antispam is gone
+            self.tab.page_loaded = False
+            self._failed = True
+            raise ProviderBlocked(self.circuit_breaker.name, self.circuit_breaker.trip())
         logger.warning('Waiting for antispam')
-        self._driver.switch_to.window(self._driver.window_handles[0])
+        self._driver.switch_to.window(self.tab.handle)
 
         def wait_for(driver: Any) -> bool:
             return not self.check_for_antispam()
 
         if self.check_for_antispam():
             self.WEBDRIVER_WAIT(self._driver, self.ANTISPAM_TIMEOUT).until(wait_for)
+        self.tab.page_loaded = False
+        # Time spent on antispam is not a latency of translation
+        self.tab.started_at = time.monotonic()
+
+    def watch_translation(self) -> None:
+        # Output changes are timed in page, while translations are collected from other tabs
+        self._driver.execute_script(
+            scripts.make_watch_translation_script(self.PAGE_STATE_SCRIPT),
+            self.from_language,
+            self.to_language,
+            self.tab.last_output,
+        )
 
-    def wait_for_translation(self) -> None:
-        def wait_for(driver: Any) -> bool:
-            if self.check_for_antispam():
-                raise AntiSpamException('Antispam detected')
-            return self.check_for_translation()
-
-        self.WEBDRIVER_WAIT(self._driver, self.TRANSLATION_TIMEOUT).until(wait_for)
+    def wait_for_translation(self) -> PageState:
+        quiet_period = self._settings.translation_quiet_period or self.TRANSLATION_QUIET_PERIOD
+        timeout = self.tab.translation_timeout or self.TRANSLATION_TIMEOUT
+        self._driver.set_script_timeout(timeout + self.SCRIPT_TIMEOUT_MARGIN)
+        raw_state = self._driver.execute_async_script(
+            scripts.make_wait_for_translation_script(self.PAGE_STATE_SCRIPT),
+            self.from_language,
+            self.to_language,
+            self.tab.last_output,
+            int(quiet_period * 1000),
+            int(timeout * 1000),
+        )
+        if raw_state is None:
+            raise TimeoutException('Translation is not completed in time')
+        state = self.make_page_state(raw_state)
+        if state.antispam:
+            raise AntiSpamException('Antispam detected')
+        return state
+
+    def wait_for_captured_translation(self) -> Optional[str]:
+        """Waits for translation response of the page and reads translation from it.
+
+        Returns `None` if responses are not captured in the page, so the output is read from it.
+        """
+        translation_timeout = self.tab.translation_timeout or self.TRANSLATION_TIMEOUT
+        deadline = time.monotonic() + translation_timeout
+        self._driver.set_script_timeout(translation_timeout + self.SCRIPT_TIMEOUT_MARGIN)
+        while True:
+            timeout = max(deadline - time.monotonic(), 0)
+            raw_result = self._driver.execute_async_script(
+                scripts.WAIT_FOR_CAPTURED_RESPONSES,
+                self.tab.captured_responses,
+                int(timeout * 1000),
+            )
+            if raw_result is None:
+                raise TimeoutException('Translation response is not received in time')
+            if not raw_result['installed']:
+                logger.debug('Responses are not captured in page, reading translation from it')
+                return None
+            self.tab.captured_responses = raw_result['total']
+            for body in raw_result['responses']:
+                translation = self.parse_captured_response(body)
+                # Late responses to the previous block are skipped
+                if translation and translation != self.tab.last_output:
+                    self.tab.last_output = translation
+                    return translation
+
+    def parse_captured_response(self, body: str) -> Optional[str]:
+        """Returns translation from response body, or `None` if it is not a translation."""
+        return None
 
     @staticmethod
     def clear(data: str) -> str:
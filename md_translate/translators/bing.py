@@ -1,14 +1,30 @@
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.remote.webelement import WebElement
+import json
+from typing import Optional
 
-from md_translate.exceptions import safe_run
+from selenium.webdriver.remote.webelement import WebElement
 
+from . import _scripts as scripts
 from ._selenium_base import SeleniumBaseTranslator
 
 
 class BingTranslateProvider(SeleniumBaseTranslator):
     HOST = 'https://www.bing.com/translator/'
 
+    MAX_CHARS = 1_000
+
+    CAPTURE_URL_PATTERN = r'/ttranslatev3'
+
+    PAGE_STATE_SCRIPT = scripts.make_page_state_script(
+        '''
+        const container = document.getElementById('rich_tta');
+        return {
+            antispam: isVisible(document.getElementById('t_enter_captcha')),
+            translated: !!container && container.classList.contains('ttastable'),
+            output: readValue(document.getElementById('tta_output_ta')),
+        };
+        '''
+    )
+
     def get_url(self) -> str:
         params = {
             'from': self.from_language,
@@ -19,22 +35,11 @@ class BingTranslateProvider(SeleniumBaseTranslator):
     def get_input_element(self) -> WebElement:
         return self._driver.find_element(by=self.WEBDRIVER_BY.ID, value='tta_input_ta')
 
-    def get_output_element(self) -> WebElement:
-        return self._driver.find_element(by=self.WEBDRIVER_BY.ID, value='tta_output_ta')
-
-    @safe_run(NoSuchElementException, default_return_value=False)
-    def check_for_translation(self) -> bool:
-        container = self._driver.find_element(by=self.WEBDRIVER_BY.ID, value='rich_tta')
-        return 'ttastable' in container.get_attribute('class')
-
     def accept_cookies(self) -> None:
         self.click_cookies_accept('Accept')
 
-    @safe_run(NoSuchElementException, default_return_value=False)
-    def check_for_antispam(self) -> bool:
-        container = self._driver.find_element(by=self.WEBDRIVER_BY.ID, value='t_enter_captcha')
-        return container.is_displayed()
-
-    @staticmethod
-    def get_translated_data(output_element: WebElement) -> str:
-        return output_element.get_attribute('value')
+    def parse_captured_response(self, body: str) -> Optional[str]:
+        try:
+            return json.loads(body)[0]['translations'][0]['text']
+        except (ValueError, LookupError, TypeError):
+            return None
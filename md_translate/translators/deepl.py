@@ -1,16 +1,35 @@
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.remote.webelement import WebElement
+import json
+from typing import Optional
 
-from md_translate.exceptions import safe_run
+from selenium.webdriver.remote.webelement import WebElement
 
-from ._selenium_base import SeleniumBaseTranslator
+from . import _scripts as scripts
+from ._selenium_base import InputMethod, SeleniumBaseTranslator
 
 
 class DeeplTranslateProvider(SeleniumBaseTranslator):
     HOST = 'https://www.deepl.com/translator/'
 
+    MAX_CHARS = 1_500
+
     TRANSLATION_TIMEOUT = 30
 
+    INPUT_METHOD = InputMethod.INSERT_TEXT
+
+    CAPTURE_URL_PATTERN = r'/jsonrpc\?method=LMT_handle_(texts|jobs)'
+
+    PAGE_STATE_SCRIPT = scripts.make_page_state_script(
+        '''
+        const limit = findByXPath('//*[contains(text(), "reached your free usage limit")]');
+        const output = readValue(document.querySelector('d-textarea[name="target"]'));
+        return {
+            antispam: isVisible(limit),
+            translated: output !== '',
+            output: output,
+        };
+        '''
+    )
+
     def get_url(self) -> str:
         return f'{self.HOST}l/{self.from_language}/{self.to_language}/'
 
@@ -20,37 +39,28 @@ class DeeplTranslateProvider(SeleniumBaseTranslator):
             value='d-textarea[name="source"]',
         )
 
-    def get_output_element(self) -> WebElement:
-        return self._driver.find_element(
-            by=self.WEBDRIVER_BY.CSS_SELECTOR,
-            value='d-textarea[name="target"]',
-        )
-
-    @safe_run(NoSuchElementException, default_return_value=False)
-    def check_for_translation(self) -> bool:
-        element = self.get_output_element()
-        return element.text != ''
-
     def accept_cookies(self) -> None:
         self.click_cookies_accept('Accept')
 
-    @safe_run(NoSuchElementException, default_return_value=None)
-    def click_cookies_accept(self, btn_text: str) -> None:
-        cookies_accept_button = self._driver.find_element(
-            by=self.WEBDRIVER_BY.CSS_SELECTOR,
-            value='[data-testid="cookie-banner-strict-accept-all"]',
-        )
-        if cookies_accept_button:
-            cookies_accept_button.click()
-
-    @safe_run(NoSuchElementException, default_return_value=False)
-    def check_for_antispam(self) -> bool:
-        container = self._driver.find_element(
-            by=self.WEBDRIVER_BY.XPATH,
-            value='//*[text()="You’ve reached your free usage limit.*"]',
-        )
-        return container.is_displayed()
+    def parse_captured_response(self, body: str) -> Optional[str]:
+        try:
+            result = json.loads(body)['result']
+            if 'texts' in result:
+                return '\n'.join(text['text'] for text in result['texts'])
+            # Older API translates text in jobs, one per sentence
+            return ' '.join(
+                sentence['text']
+                for translation in result['translations']
+                for sentence in translation['beams'][0]['sentences']
+            )
+        except (ValueError, LookupError, TypeError):
+            return None
 
-    @staticmethod
-    def get_translated_data(output_element: WebElement) -> str:
-        return output_element.get_attribute('value')
+    def click_cookies_accept(self, btn_text: str) -> None:
+        with self.no_implicit_wait():
+            cookies_accept_buttons = self._driver.find_elements(
+                by=self.WEBDRIVER_BY.CSS_SELECTOR,
+                value='[data-testid="cookie-banner-strict-accept-all"]',
+            )
+        if cookies_accept_buttons:
+            cookies_accept_buttons[0].click()
@@ -8,14 +8,17 @@ class DeeplAPITranslateProvider(APIBaseTranslator):
 
     API_KEY_SETTINGS_PARAM = 'deepl_api_key'
 
-    def make_request(self, *, text: str) -> requests.Response:
+    BATCH_SIZE = 50
+    MAX_REQUEST_SIZE = 120 * 1024  # API limit is 128 KiB, leave room for the rest of the body
+    # Non-ASCII characters take 6 bytes as JSON escapes, so a block of any script fits a request
+    MAX_TEXT_CHARS = 20_000
+
+    def make_request(self, *, texts: list[str], timeout: float) -> requests.Response:
         headers = {
             'Authorization': f'DeepL-Auth-Key {self.api_key}',
         }
         request_body = {
-            'text': [
-                text,
-            ],
+            'text': texts,
             'source_lang': self.from_language.upper(),
             'target_lang': self.to_language.upper(),
         }
@@ -24,9 +27,10 @@ class DeeplAPITranslateProvider(APIBaseTranslator):
             url=f'{self.HOST}v2/translate',
             headers=headers,
             json=request_body,
+            timeout=timeout,
         )
         response.raise_for_status()
         return response
 
-    def get_translated_data(self, response: requests.Response) -> str:
-        return response.json()['translations'][0]['text']
+    def get_translated_data(self, response: requests.Response) -> list[str]:
+        return [translation['text'] for translation in response.json()['translations']]
@@ -1,14 +1,26 @@
-from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.remote.webelement import WebElement
 
-from md_translate.exceptions import safe_run
-
+from . import _scripts as scripts
 from ._selenium_base import SeleniumBaseTranslator
 
 
 class GoogleTranslateProvider(SeleniumBaseTranslator):
     HOST = 'https://translate.google.com/'
 
+    MAX_CHARS = 5_000
+
+    PAGE_STATE_SCRIPT = scripts.make_page_state_script(
+        '''
+        const error = findByXPath('//div[text()="Translation error"]');
+        const output = readValue(document.querySelector(`span[lang="${toLang}"]`));
+        return {
+            antispam: !!error && isVisible(error.parentElement),
+            translated: output !== '',
+            output: output,
+        };
+        '''
+    )
+
     def get_url(self) -> str:
         params = {
             'sl': self.from_language,
@@ -21,26 +33,6 @@ class GoogleTranslateProvider(SeleniumBaseTranslator):
             by=self.WEBDRIVER_BY.CSS_SELECTOR, value=f'span[lang="{self.from_language}"]'
         ).find_element(by=self.WEBDRIVER_BY.TAG_NAME, value='textarea')
 
-    def get_output_element(self) -> WebElement:
-        return self._driver.find_element(
-            by=self.WEBDRIVER_BY.CSS_SELECTOR, value=f'span[lang="{self.to_language}"]'
-        )
-
-    @safe_run(NoSuchElementException, default_return_value=False)
-    def check_for_translation(self) -> bool:
-        element = self.get_output_element()
-        return element.text != ''
-
     def accept_cookies(self) -> None:
         if 'consent.google.com' in self._driver.current_url:
             self.click_cookies_accept('Accept all')
-
-    def check_for_antispam(self) -> bool:
-        try:
-            element = self._driver.find_element(
-                by=self.WEBDRIVER_BY.XPATH, value='//div[text()="Translation error"]'
-            )
-            parent = element.find_element(by=self.WEBDRIVER_BY.XPATH, value='..')
-            return parent.is_displayed()
-        except NoSuchElementException:
-            return False
@@ -1,16 +1,30 @@
-from typing import Any
+import json
+from typing import Any, Optional
 
-from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.remote.webelement import WebElement
 
-from md_translate.exceptions import safe_run
-
+from . import _scripts as scripts
 from ._selenium_base import SeleniumBaseTranslator
 
 
 class LibreTranslateTranslateProvider(SeleniumBaseTranslator):
     HOST = 'https://libretranslate.com/'
 
+    MAX_CHARS = 2_000
+
+    CAPTURE_URL_PATTERN = r'/translate$'
+
+    PAGE_STATE_SCRIPT = scripts.make_page_state_script(
+        '''
+        const output = readValue(document.getElementById('textarea2'));
+        return {
+            antispam: isVisible(document.getElementById('t_enter_captcha')),
+            translated: output !== '',
+            output: output,
+        };
+        '''
+    )
+
     def get_url(self) -> str:
         params = {
             'source': self.from_language,
@@ -21,25 +35,14 @@ class LibreTranslateTranslateProvider(SeleniumBaseTranslator):
     def get_input_element(self) -> WebElement:
         return self._driver.find_element(by=self.WEBDRIVER_BY.ID, value='textarea1')
 
-    def get_output_element(self) -> WebElement:
-        return self._driver.find_element(by=self.WEBDRIVER_BY.ID, value='textarea2')
-
-    @safe_run(NoSuchElementException, default_return_value=False)
-    def check_for_translation(self) -> bool:
-        element = self.get_output_element()
-        return element.get_attribute('value') != ''
-
     def accept_cookies(self) -> None:
         return
 
-    @safe_run(NoSuchElementException, default_return_value=False)
-    def check_for_antispam(self) -> bool:
-        container = self._driver.find_element(by=self.WEBDRIVER_BY.ID, value='t_enter_captcha')
-        return container.is_displayed()
-
-    @staticmethod
-    def get_translated_data(output_element: WebElement) -> str:
-        return output_element.get_attribute('value')
+    def parse_captured_response(self, body: str) -> Optional[str]:
+        try:
+            return json.loads(body)['translatedText']
+        except (ValueError, LookupError, TypeError):
+            return None
 
     def wait_for_page_load(self) -> None:
         def wait_for(driver: Any) -> bool:
@@ -49,4 +52,4 @@ class LibreTranslateTranslateProvider(SeleniumBaseTranslator):
             )
             return document_ready and controls_loaded
 
-        self.WEBDRIVER_WAIT(self._driver, self.PAGE_LOAD_TIMEOUT).until(wait_for)
+        self.WEBDRIVER_WAIT(self._driver, self.page_load_timeout).until(wait_for)
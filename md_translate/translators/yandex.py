@@ -1,18 +1,40 @@
-import time
+import json
+from typing import Optional
 
-from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.remote.webelement import WebElement
 
-from md_translate.exceptions import safe_run
-
-from ._selenium_base import SeleniumBaseTranslator
+from . import _scripts as scripts
+from ._selenium_base import InputMethod, SeleniumBaseTranslator
 
 
 class YandexTranslateProvider(SeleniumBaseTranslator):
     HOST = 'https://translate.yandex.com/'
 
+    MAX_CHARS = 10_000
+
     COOKIES_ACCEPT_BTN_TEXT = 'Accept'
 
+    INPUT_METHOD = InputMethod.INSERT_TEXT
+
+    # Translation is rendered in parts
+    TRANSLATION_QUIET_PERIOD = 1
+
+    CAPTURE_URL_PATTERN = r'/api/v1/tr\.json/translate'
+
+    PAGE_STATE_SCRIPT = scripts.make_page_state_script(
+        '''
+        const robotCheck = findByXPath(
+            '//*[text()="Please confirm that you and not a robot are sending requests"]'
+        );
+        const output = readValue(document.querySelector('#dstTextField p'));
+        return {
+            antispam: !!robotCheck || window.location.href.includes('showcaptcha'),
+            translated: output !== '',
+            output: output,
+        };
+        '''
+    )
+
     def get_url(self) -> str:
         params = {
             'lang': f'{self.from_language}-{self.to_language}',
@@ -25,30 +47,11 @@ class YandexTranslateProvider(SeleniumBaseTranslator):
             value='.fakearea-container',
         )
 
-    def get_output_element(self) -> WebElement:
-        return self._driver.find_element(
-            by=self.WEBDRIVER_BY.CSS_SELECTOR, value='#dstTextField p'
-        )
-
-    @safe_run(NoSuchElementException, default_return_value=False)
-    def check_for_translation(self) -> bool:
-        element = self.get_output_element()
-        return element.text != ''
-
-    @staticmethod
-    def get_translated_data(output_element: WebElement) -> str:
-        time.sleep(1)
-        return output_element.text
-
     def accept_cookies(self) -> None:
         self.click_cookies_accept('Allow all')
 
-    def check_for_antispam(self) -> bool:
+    def parse_captured_response(self, body: str) -> Optional[str]:
         try:
-            self._driver.find_element(
-                by=self.WEBDRIVER_BY.XPATH,
-                value='//*[text()="Please confirm that you and not a robot are sending requests"]',
-            )
-            return True
-        except Exception:
-            return 'showcaptcha' in self._driver.current_url
+            return '\n'.join(json.loads(body)['text'])
+        except (ValueError, LookupError, TypeError):
+            return None
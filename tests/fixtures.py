@@ -3,7 +3,7 @@ from typing import Union, Type, Optional
 
 import pytest
 
-from md_translate.translators import BaseTranslator
+from md_translate.translators import BaseTranslator, RateLimit
 
 
 class SettingsTest:
@@ -11,10 +11,41 @@ class SettingsTest:
     from_lang: Optional[str] = None
     to_lang: Optional[str] = None
     service: Optional[Type[BaseTranslator]] = None
+    service_providers: list[Type[BaseTranslator]] = []
+    service_weights: dict[str, float] = {}
+    hedge_percentile: float = 0
+    hedge_budget: float = 0.1
+    deepl_api_key: Optional[str] = None
     processes: int = 1
+    max_tasks_per_child: Optional[int] = None
+    concurrency: Optional[int] = None
     new_file: bool = False
     ignore_cache: bool = False
     save_temp_on_complete: bool = False
+    cache_flush_every: int = 1
+    cache_flush_interval: float = 0
+    cache_compact_every: int = 500
+    translation_memory: bool = False
+    translation_memory_path: Optional[Path] = None
+    translation_memory_size: int = 0
+    refresh_memory: bool = False
+    adaptive_timeouts: bool = False
+    pack_blocks: bool = False
+    antispam_cooldown: float = 0
+    antispam_max_retries: int = 5
+    rate_limits: dict[str, RateLimit] = {}
+    max_chars: dict[str, int] = {}
+    tabs: int = 1
+    chromedriver_path: Optional[Path] = None
+    browser_backend: str = 'webdriver'
+    browser_profile: str = 'full'
+    browser_user_data_dir: Optional[Path] = None
+    browser_max_translations: int = 0
+    browser_max_memory: int = 0
+    reload_page: bool = False
+    input_method: Optional[str] = None
+    capture_mode: str = 'dom'
+    translation_quiet_period: Optional[float] = None
     overwrite: bool = False
     verbose: int = 0
     drop_original: bool = False
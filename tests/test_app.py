@@ -0,0 +1,94 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from md_translate.application import Application
+from md_translate.exceptions import ProviderBlocked
+from md_translate.file_queue import FileQueue
+from md_translate.translators import BaseTranslator
+
+
+class TestFileQueue:
+    def test_files_are_popped_in_order(self):
+        files_queue = FileQueue([Path('a.md'), Path('b.md')])
+        assert len(files_queue) == 2
+        assert files_queue.pop() == (Path('a.md'), 0)
+        assert files_queue.pop() == (Path('b.md'), 0)
+        assert not files_queue
+        assert files_queue.time_to_next_ready() is None
+
+    def test_requeued_file_waits_for_delay(self):
+        files_queue = FileQueue([Path('a.md'), Path('b.md')])
+        file, attempt = files_queue.pop()
+        files_queue.push(file, attempt=attempt + 1, delay=0.1)
+        assert files_queue.pop_ready() == (Path('b.md'), 0)
+        assert files_queue.pop_ready() is None
+        assert 0 < files_queue.time_to_next_ready() <= 0.1
+        started_at = time.monotonic()
+        assert files_queue.pop() == (Path('a.md'), 1)
+        assert time.monotonic() - started_at >= 0.05
+
+
+class BlockingProvider(BaseTranslator):
+    def __init__(self, settings):
+        self.settings = settings
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        self.settings.exit_errors.append(exc_type)
+
+    def translate(self, *, text):
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts):
+        self.settings.calls += 1
+        if self.settings.failing:
+            raise RuntimeError('Translation failed')
+        if self.settings.calls <= self.settings.blocked_calls:
+            raise ProviderBlocked('blocking', 0.01)
+        return [text.upper() for text in texts]
+
+
+@pytest.fixture
+def app_settings(test_settings, tmp_path):
+    (tmp_path / 'first.md').write_text('First block\n\nSecond block\n')
+    test_settings.path = [tmp_path]
+    test_settings.service_provider = BlockingProvider
+    test_settings.calls = 0
+    test_settings.blocked_calls = 0
+    test_settings.failing = False
+    test_settings.exit_errors = []
+    test_settings.new_file = True
+    return test_settings
+
+
+class TestApplication:
+    def test_blocked_file_is_requeued_and_resumed(self, app_settings, tmp_path):
+        app_settings.blocked_calls = 1
+        Application(app_settings).run_single_process()
+        translated = (tmp_path / 'first_translated.md').read_text()
+        assert 'FIRST BLOCK' in translated
+        assert 'SECOND BLOCK' in translated
+
+    def test_file_is_given_up_after_max_retries(self, app_settings, tmp_path):
+        app_settings.blocked_calls = 10
+        app_settings.antispam_max_retries = 2
+        Application(app_settings).run_single_process()
+        assert app_settings.calls == 3
+        assert not (tmp_path / 'first_translated.md').exists()
+        assert (tmp_path / 'first.md.tmp').exists()
+
+    def test_provider_sees_translation_error(self, app_settings, tmp_path):
+        app_settings.failing = True
+        Application(app_settings).run_single_process()
+        # Provider discards its driver after a failure
+        assert app_settings.exit_errors == [RuntimeError]
+        assert not (tmp_path / 'first_translated.md').exists()
+
+    def test_provider_exits_without_error_after_translation(self, app_settings, tmp_path):
+        Application(app_settings).run_single_process()
+        assert app_settings.exit_errors == [None]
+        assert (tmp_path / 'first_translated.md').exists()
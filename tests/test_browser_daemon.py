@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+from selenium.common.exceptions import WebDriverException
+
+from md_translate.main import main
+from md_translate.translators import _browser_daemon
+from md_translate.translators._browser_daemon import BrowserDaemon, acquire_endpoint
+
+
+class MockDriver:
+    def __init__(self, port):
+        self.port = port
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise WebDriverException('Browser is closed')
+        return 'about:blank'
+
+    def quit(self):
+        self.quit_called = True
+        if not self.alive:
+            raise WebDriverException('Browser is closed')
+
+
+class MockTranslator:
+    driver_pool_key = 'GoogleTranslateProvider'
+
+    def __init__(self):
+        self.failing_ports = set()
+
+    def make_driver(self, remote_debugging_port=None):
+        if remote_debugging_port in self.failing_ports:
+            raise WebDriverException('Chrome failed to start')
+        return MockDriver(remote_debugging_port)
+
+
+@pytest.fixture
+def reachable(monkeypatch):
+    addresses = set()
+    monkeypatch.setattr(_browser_daemon, 'is_reachable', lambda address: address in addresses)
+    return addresses
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = BrowserDaemon(MockTranslator(), browsers=2, port=9300, state_dir=tmp_path)
+    for slot in range(daemon.browsers):
+        daemon.start_browser(slot)
+    yield daemon
+    daemon.shutdown()
+
+
+class TestBrowserDaemon:
+    def test_endpoints_are_published(self, daemon, tmp_path):
+        endpoint_files = sorted((tmp_path / 'GoogleTranslateProvider').glob('*.json'))
+        assert [json.loads(file.read_text())['debugger_address'] for file in endpoint_files] == [
+            '127.0.0.1:9300',
+            '127.0.0.1:9301',
+        ]
+        assert [driver.port for driver in daemon._drivers.values()] == [9300, 9301]
+
+    def test_shutdown(self, daemon, tmp_path):
+        drivers = list(daemon._drivers.values())
+        daemon.shutdown()
+        assert all(driver.quit_called for driver in drivers)
+        assert not list((tmp_path / 'GoogleTranslateProvider').glob('*.json'))
+
+    def test_closed_browser_is_quit_and_restarted(self, daemon):
+        closed = daemon._drivers[1]
+        closed.alive = False
+        daemon.check_browsers()
+        assert closed.quit_called
+        assert daemon._drivers[1] is not closed
+        assert daemon._drivers[1].port == 9301
+
+    def test_failed_restart_is_retried(self, daemon, tmp_path):
+        healthy = daemon._drivers[0]
+        daemon._drivers[1].alive = False
+        daemon.translator.failing_ports.add(9301)
+        daemon.check_browsers()
+        assert daemon._drivers == {0: healthy}
+        assert not (tmp_path / 'GoogleTranslateProvider' / 'endpoint-1.json').exists()
+        daemon.translator.failing_ports.clear()
+        daemon.check_browsers()
+        assert daemon._drivers[0] is healthy
+        assert daemon._drivers[1].port == 9301
+
+    def test_each_browser_is_attached_once(self, daemon, reachable, tmp_path):
+        reachable.update({'127.0.0.1:9300', '127.0.0.1:9301'})
+        first_address, first_lock = acquire_endpoint('GoogleTranslateProvider', tmp_path)
+        second_address, second_lock = acquire_endpoint('GoogleTranslateProvider', tmp_path)
+        assert {first_address, second_address} == reachable
+        assert acquire_endpoint('GoogleTranslateProvider', tmp_path) is None
+        first_lock.release()
+        assert acquire_endpoint('GoogleTranslateProvider', tmp_path)[0] == first_address
+        second_lock.release()
+
+    def test_unreachable_browser_is_skipped(self, daemon, reachable, tmp_path):
+        reachable.add('127.0.0.1:9301')
+        assert acquire_endpoint('GoogleTranslateProvider', tmp_path)[0] == '127.0.0.1:9301'
+
+    def test_no_daemon(self, reachable, tmp_path):
+        assert acquire_endpoint('GoogleTranslateProvider', tmp_path) is None
+
+
+class TestCommands:
+    def test_translate_is_default_command(self):
+        result = CliRunner().invoke(main, ['--help'])
+        assert result.exit_code == 0
+        assert '--from-lang' in result.output
+        # Other commands are listed, since group help is not reachable
+        assert 'browser-daemon' in result.output
+
+    def test_browser_daemon_requires_browser_provider(self):
+        result = CliRunner().invoke(main, ['browser-daemon', '-P', 'deepl_api'])
+        assert result.exit_code != 0
+        assert 'does not use a browser' in result.output
@@ -0,0 +1,34 @@
+from md_translate.translators._browser_profile import acquire_user_data_dir
+from md_translate.translators._file_lock import FileLock
+
+
+class TestFileLock:
+    def test_lock_is_exclusive(self, tmp_path):
+        with FileLock(tmp_path / 'test.lock') as lock:
+            assert lock.locked
+            assert not FileLock(tmp_path / 'test.lock').acquire(blocking=False)
+        other_lock = FileLock(tmp_path / 'test.lock')
+        assert other_lock.acquire(blocking=False)
+        other_lock.release()
+
+
+class TestUserDataDir:
+    def test_concurrent_browsers_get_own_slots(self, tmp_path):
+        first_dir, first_lock = acquire_user_data_dir(tmp_path, 'GoogleTranslateProvider')
+        second_dir, second_lock = acquire_user_data_dir(tmp_path, 'GoogleTranslateProvider')
+        assert first_dir == tmp_path / 'GoogleTranslateProvider' / 'slot-0'
+        assert second_dir == tmp_path / 'GoogleTranslateProvider' / 'slot-1'
+        assert first_dir.is_dir() and second_dir.is_dir()
+        first_lock.release()
+        second_lock.release()
+
+    def test_released_slot_is_reused(self, tmp_path):
+        user_data_dir, lock = acquire_user_data_dir(tmp_path, 'DeeplTranslateProvider')
+        lock.release()
+        assert acquire_user_data_dir(tmp_path, 'DeeplTranslateProvider')[0] == user_data_dir
+
+    def test_providers_have_separate_profiles(self, tmp_path):
+        google_dir, _ = acquire_user_data_dir(tmp_path, 'GoogleTranslateProvider')
+        bing_dir, _ = acquire_user_data_dir(tmp_path, 'BingTranslateProvider')
+        assert google_dir.name == bing_dir.name == 'slot-0'
+        assert google_dir != bing_dir
@@ -0,0 +1,233 @@
+import json
+import pathlib
+
+import pytest
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from md_translate.translators._cdp_driver import CdpConnection, CdpDriver, CdpElement
+
+MOCK_PAGE = pathlib.Path(__file__).parents[1] / 'benchmarks' / 'assets' / 'translator_page.html'
+
+
+class MockConnection:
+    timeout = 5
+
+    def __init__(self, pages=(), evaluate_results=()):
+        self.pages = list(pages)
+        self.evaluate_results = list(evaluate_results)
+        self.sent = []
+        self.targets = 0
+        self.closed = False
+
+    def send(self, method, params=None, *, session_id=None, timeout=None):
+        self.sent.append((method, params, session_id))
+        if method == 'Target.getTargets':
+            return {'targetInfos': [{'type': 'page', 'targetId': page} for page in self.pages]}
+        if method == 'Target.createTarget':
+            self.targets += 1
+            return {'targetId': f'new-{self.targets}'}
+        if method == 'Target.attachToTarget':
+            return {'sessionId': f'session-{params["targetId"]}'}
+        if method == 'Runtime.evaluate':
+            return self.evaluate_results.pop(0)
+        if method == 'Page.navigate':
+            return {'errorText': 'net::ERR_NAME_NOT_RESOLVED'} if 'broken' in params['url'] else {}
+        return {}
+
+    def expect_event(self, method):
+        self.sent.append(('expect', method, None))
+
+    def wait_for_event(self, method, *, session_id=None, timeout=None):
+        self.sent.append(('wait', method, session_id))
+        return {'method': method}
+
+    def close(self):
+        self.closed = True
+
+    def methods(self):
+        return [method for method, _, _ in self.sent]
+
+
+def value(result):
+    return {'result': {'type': 'object', 'value': result}}
+
+
+class TestCdpDriver:
+    def test_launch_command(self, tmp_path):
+        command = CdpDriver.make_command(
+            'chrome', ['--headless=new', 'user-agent=Mozilla/5.0 (X11)'], tmp_path
+        )
+        assert command == [
+            'chrome',
+            '--remote-debugging-port=0',
+            f'--user-data-dir={tmp_path}',
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--headless=new',
+            '--user-agent=Mozilla/5.0 (X11)',
+            'about:blank',
+        ]
+
+    def test_launched_browser_tab_is_used(self):
+        driver = CdpDriver(MockConnection(pages=['first']), process=None)
+        # A browser which is not owned by the driver gets a new tab
+        assert driver.current_window_handle == 'new-1'
+        connection = MockConnection(pages=['first'])
+        driver = CdpDriver(connection, process=object())  # type: ignore
+        assert driver.current_window_handle == 'first'
+        assert connection.sent[-1] == ('Page.enable', None, 'session-first')
+
+    def test_tabs(self):
+        connection = MockConnection()
+        driver = CdpDriver(connection)
+        driver.switch_to.new_window('tab')
+        assert driver.window_handles == ['new-1', 'new-2']
+        assert driver.current_window_handle == 'new-2'
+        driver.execute_cdp_cmd('Network.enable', {})
+        assert connection.sent[-1] == ('Network.enable', {}, 'session-new-2')
+        driver.close()
+        assert driver.window_handles == ['new-1']
+        with pytest.raises(NoSuchWindowException):
+            driver.execute_cdp_cmd('Network.enable', {})
+        driver.switch_to.window('new-1')
+        with pytest.raises(NoSuchWindowException):
+            driver.switch_to.window('new-2')
+
+    def test_get_waits_for_load(self):
+        connection = MockConnection()
+        driver = CdpDriver(connection)
+        driver.get('https://example.com/')
+        assert connection.methods()[-3:] == ['expect', 'Page.navigate', 'wait']
+        with pytest.raises(WebDriverException):
+            driver.get('https://broken/')
+
+    def test_execute_script(self):
+        connection = MockConnection(evaluate_results=[value(42)])
+        driver = CdpDriver(connection)
+        assert driver.execute_script('return arguments[0];', CdpElement(driver, 3), 'text') == 42
+        expression = connection.sent[-1][1]['expression']
+        assert 'revive([{"__mdTranslateElement": 3}, "text"])' in expression
+        assert 'return arguments[0];' in expression
+
+    def test_script_errors(self):
+        driver = CdpDriver(
+            MockConnection(
+                evaluate_results=[
+                    {'exceptionDetails': {'text': 'Uncaught', 'exception': {'description': 'x'}}},
+                    {'exceptionDetails': {'exception': {'description': 'Error: script timeout'}}},
+                ]
+            )
+        )
+        with pytest.raises(JavascriptException):
+            driver.execute_script('throw new Error("x")')
+        with pytest.raises(TimeoutException):
+            driver.execute_async_script('')
+        with pytest.raises(TypeError):
+            driver.execute_script('', object())
+
+    def test_find_elements(self):
+        connection = MockConnection(evaluate_results=[value([0, 1]), value([])])
+        driver = CdpDriver(connection)
+        elements = driver.find_elements(by='css selector', value='textarea')
+        assert [element.ref for element in elements] == [0, 1]
+        with pytest.raises(NoSuchElementException):
+            elements[0].find_element('tag name', 'span')
+        assert '[{"__mdTranslateElement": 0}' not in connection.sent[-2][1]['expression']
+        assert '"tag name", "span", {"__mdTranslateElement": 0}' in connection.sent[-1][1][
+            'expression'
+        ]
+
+    def test_quit_shared_browser_closes_own_tabs_only(self):
+        connection = MockConnection()
+        driver = CdpDriver(connection)
+        driver.quit()
+        assert connection.sent[-1] == ('Target.closeTarget', {'targetId': 'new-1'}, None)
+        assert connection.closed
+
+
+class MockSocket:
+    def __init__(self, messages):
+        self.messages = [json.dumps(message) for message in messages]
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self):
+        return self.messages.pop(0)
+
+
+class TestCdpConnection:
+    @pytest.fixture
+    def make_connection(self, monkeypatch):
+        def make_connection(messages):
+            socket = MockSocket(messages)
+            monkeypatch.setattr(
+                'md_translate.translators._cdp_driver.websocket.create_connection',
+                lambda *args, **kwargs: socket,
+            )
+            return CdpConnection('ws://localhost/devtools/browser/id')
+
+        return make_connection
+
+    def test_send(self, make_connection):
+        connection = make_connection(
+            [
+                {'method': 'Network.requestWillBeSent', 'params': {}},
+                {'id': 1, 'result': {'targetId': 'id'}},
+                {'id': 2, 'error': {'message': 'No target with given id found'}},
+            ]
+        )
+        assert connection.send('Target.createTarget', {'url': 'about:blank'}) == {
+            'targetId': 'id'
+        }
+        assert connection._socket.sent[0]['method'] == 'Target.createTarget'
+        with pytest.raises(WebDriverException, match='No target'):
+            connection.send('Target.closeTarget', {'targetId': 'id'}, session_id='session')
+        assert connection._socket.sent[1]['sessionId'] == 'session'
+
+    def test_awaited_event_is_kept(self, make_connection):
+        connection = make_connection(
+            [
+                {'method': 'Page.loadEventFired', 'sessionId': 'other', 'params': {}},
+                {'method': 'Page.loadEventFired', 'sessionId': 'session', 'params': {}},
+                {'id': 1, 'result': {}},
+            ]
+        )
+        connection.expect_event('Page.loadEventFired')
+        connection.send('Page.navigate', {'url': 'https://example.com/'}, session_id='session')
+        event = connection.wait_for_event('Page.loadEventFired', session_id='session')
+        assert event['sessionId'] == 'session'
+        assert connection._awaited_events == set()
+
+
+@pytest.mark.web  # needs Chrome, run it with `pytest -m web`
+class TestPageElements:
+    @pytest.fixture
+    def driver(self):
+        driver = CdpDriver.launch(['--headless=new'])
+        driver.get(MOCK_PAGE.as_uri())
+        yield driver
+        driver.quit()
+
+    def test_found_element_keeps_its_id(self, driver):
+        refs = {driver.find_element('id', 'source').ref for _ in range(10)}
+        assert len(refs) == 1
+        assert driver.execute_script('return window.__mdTranslateElements.elements.size') == 1
+
+    def test_removed_elements_are_dropped(self, driver):
+        source, target = driver.find_elements('tag name', 'textarea')
+        driver.execute_script('arguments[0].remove()', target)
+        assert driver.find_elements('tag name', 'textarea')[0].ref == source.ref
+        assert driver.execute_script('return window.__mdTranslateElements.elements.size') == 1
+        with pytest.raises(WebDriverException):
+            driver.execute_script('return arguments[0].value', target)
@@ -0,0 +1,85 @@
+import contextlib
+
+import pytest
+
+from md_translate.translators import GoogleTranslateProvider
+from md_translate.translators import _selenium_base
+from md_translate.translators._circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def breaker(tmp_path):
+    return CircuitBreaker('google', cooldown=10, max_cooldown=30, state_dir=tmp_path)
+
+
+class TestCircuitBreaker:
+    def test_from_settings(self, test_settings):
+        assert (
+            CircuitBreaker.from_settings(test_settings, GoogleTranslateProvider, max_cooldown=60)
+            is None
+        )
+        test_settings.antispam_cooldown = 10
+        breaker = CircuitBreaker.from_settings(
+            test_settings, GoogleTranslateProvider, max_cooldown=60
+        )
+        assert breaker.name == 'google'
+        assert breaker.cooldown == 10
+
+    def test_closed_by_default(self, breaker):
+        assert breaker.retry_after() == 0
+
+    def test_trip_is_not_extended_while_open(self, breaker):
+        assert breaker.trip() == pytest.approx(10, abs=1)
+        assert breaker.trip() == pytest.approx(10, abs=1)
+        assert breaker.retry_after() == pytest.approx(10, abs=1)
+
+    def test_cooldown_doubles_up_to_max(self, breaker):
+        cooldowns = []
+        for _ in range(3):
+            cooldowns.append(breaker.trip())
+            breaker._write_state({**breaker._read_state(), 'open_until': 0})
+        assert cooldowns == pytest.approx([10, 20, 30], abs=1)
+
+    def test_state_is_shared(self, breaker, tmp_path):
+        breaker.trip()
+        other = CircuitBreaker('google', cooldown=10, max_cooldown=30, state_dir=tmp_path)
+        assert other.retry_after() > 0
+
+    def test_reset(self, breaker):
+        breaker.trip()
+        breaker.reset()
+        assert breaker.retry_after() == 0
+        assert breaker.trip() == pytest.approx(10, abs=1)
+
+
+class TestProviderBreaker:
+    @pytest.fixture
+    def translator(self, breaker, test_settings, monkeypatch):
+        translator = GoogleTranslateProvider(test_settings)
+        translator.circuit_breaker = breaker
+        translator._driver = None
+        monkeypatch.setattr(translator, 'recycle_driver_if_needed', lambda: None)
+        monkeypatch.setattr(translator, 'pace', lambda texts: contextlib.nullcontext())
+        monkeypatch.setattr(_selenium_base.driver_pool, 'release', lambda *args: None)
+        monkeypatch.setattr(_selenium_base.driver_pool, 'discard', lambda *args: None)
+        # Antispam was hit before, its cooldown is over
+        breaker.trip()
+        breaker._write_state({**breaker._read_state(), 'open_until': 0})
+        return translator
+
+    def test_reset_after_translated_file(self, translator, breaker, monkeypatch):
+        monkeypatch.setattr(translator, 'translate_in_tabs', lambda texts: texts)
+        translator.translate_batch(['text'])
+        translator.__exit__(None, None, None)
+        assert breaker.trip() == pytest.approx(10, abs=1)
+
+    def test_not_reset_after_failure(self, translator, breaker, monkeypatch):
+        def fail(texts):
+            raise RuntimeError('Translation failed')
+
+        monkeypatch.setattr(translator, 'translate_in_tabs', fail)
+        with pytest.raises(RuntimeError):
+            translator.translate_batch(['text'])
+        # Router fails over to another service, so the file succeeds without this one
+        translator.__exit__(None, None, None)
+        assert breaker.trip() == pytest.approx(20, abs=1)
@@ -1,13 +1,22 @@
+import asyncio
 import json
+import os
+import threading
 from contextlib import nullcontext as does_not_raise
 from pathlib import Path
 
 import pytest
 
 from md_translate.document.document import MarkdownDocument
+from md_translate.translation_memory import TranslationMemory
+from md_translate.translators import (
+    BaseTranslator,
+    BingTranslateProvider,
+    GoogleTranslateProvider,
+)
 
 
-class MockTranslator:
+class MockTranslator(BaseTranslator):
     def __init__(self, *args, **kwargs):
         pass
 
@@ -231,3 +240,316 @@ class TestMarkdownDocument:
         new_file = test_document.parent / f'{test_document.stem}_translated{test_document.suffix}'
         assert new_file.exists()
         assert new_file.read_text() == TEST_DOCUMENT_TRANSLATED
+
+    def test_translate_journals_translated_blocks(self, test_document, test_settings):
+        document = MarkdownDocument.from_file(test_document, settings=test_settings)
+        journal_file = test_document.parent / f'{test_document.name}.tmp.journal'
+        journal_sizes = []
+
+        class JournalCheckingTranslator(MockTranslator):
+            def translate(self, text):
+                journal_sizes.append(len(journal_file.read_text().splitlines()))
+                return super().translate(text)
+
+        document.translate(JournalCheckingTranslator())
+        assert journal_sizes == [0, 1]
+        assert not journal_file.exists() or journal_file.read_text() == ''
+
+    def test_restore_replays_journal(self, test_document_with_cache, test_settings):
+        journal_file = test_document_with_cache.parent / f'{test_document_with_cache.name}.tmp.journal'
+        journal_file.write_text(
+            json.dumps(
+                {
+                    'index': 0,
+                    'block': {
+                        'block_type': 'HeadingBlock',
+                        'children': [{'block_type': 'TextBlock', 'text': 'Test document'}],
+                        'level': 1,
+                        'translated_data': '# Translated',
+                    },
+                }
+            )
+            + '\n{"index": 1, "blo'
+        )
+        document = MarkdownDocument.restore(test_document_with_cache, settings=test_settings)
+        assert document.blocks[0].translated_data == '# Translated'
+        assert document.blocks[1].translated_data is None
+        journal_file.unlink()
+
+    def test_journal_compaction(self, test_document, test_settings):
+        test_settings.cache_compact_every = 1
+        test_settings.save_temp_on_complete = True
+        document = MarkdownDocument.from_file(test_document, settings=test_settings)
+        document.translate(MockTranslator())
+        restored = MarkdownDocument.restore(test_document, settings=test_settings)
+        assert [block.translated_data for block in restored.blocks] == [
+            '# Test document. translated',
+            'This is a test document.. translated',
+            None,
+        ]
+
+    def test_translate_uses_translation_memory(self, test_document, test_settings, tmp_path):
+        test_settings.translation_memory_path = tmp_path / 'translation_memory.sqlite3'
+        test_settings.translation_memory = True
+        test_settings.translation_memory_size = 100
+        test_settings.service_providers = [GoogleTranslateProvider]
+        test_settings.from_lang = 'en'
+        test_settings.to_lang = 'ru'
+        MarkdownDocument.from_file(test_document, settings=test_settings).translate(
+            MockTranslator()
+        )
+
+        class FailingTranslator(MockTranslator):
+            def translate(self, text):
+                raise AssertionError('Translation memory was not used')
+
+        test_settings.ignore_cache = True
+        document = MarkdownDocument.from_file(test_document, settings=test_settings)
+        document.translate(FailingTranslator())
+        assert document.blocks[0].translated_data == '# Test document. translated'
+
+        class FixedTranslator(MockTranslator):
+            def translate(self, text):
+                return f'{text}. fixed'
+
+        test_settings.refresh_memory = True
+        MarkdownDocument.from_file(test_document, settings=test_settings).translate(
+            FixedTranslator()
+        )
+        test_settings.refresh_memory = False
+        document = MarkdownDocument.from_file(test_document, settings=test_settings)
+        document.translate(FailingTranslator())
+        assert document.blocks[0].translated_data == '# Test document. fixed'
+
+    def test_journal_syncs_translated_blocks_only(
+        self, test_document, test_settings, tmp_path, monkeypatch
+    ):
+        from md_translate.document import journal
+
+        syncs = []
+        monkeypatch.setattr(journal.os, 'fsync', syncs.append)
+        test_settings.translation_memory_path = tmp_path / 'translation_memory.sqlite3'
+        test_settings.translation_memory = True
+        test_settings.translation_memory_size = 100
+        test_settings.service_providers = [GoogleTranslateProvider]
+        test_settings.from_lang = 'en'
+        test_settings.to_lang = 'ru'
+        test_settings.save_temp_on_complete = True
+        test_document.write_text('Remembered\n\nSame\n\nSame\n\nNew\n')
+        with TranslationMemory.from_settings(test_settings) as memory:
+            memory.set('Remembered', 'Translated')
+        MarkdownDocument.from_file(test_document, settings=test_settings).translate(
+            MockTranslator()
+        )
+        # One sync per translated text and one on close, identical blocks are synced together
+        assert len(syncs) == 3
+        restored = MarkdownDocument.restore(test_document, settings=test_settings)
+        assert [block.translated_data for block in restored.blocks] == [
+            'Translated',
+            'Same. translated',
+            'Same. translated',
+            'New. translated',
+        ]
+
+    def test_translation_memory_keyed_by_service(self, test_document, test_settings, tmp_path):
+        class RoutingTranslator(MockTranslator):
+            def translated_by(self, text):
+                return 'bing' if text.startswith('#') else None
+
+        test_settings.translation_memory_path = tmp_path / 'translation_memory.sqlite3'
+        test_settings.translation_memory = True
+        test_settings.translation_memory_size = 100
+        test_settings.service_providers = [GoogleTranslateProvider, BingTranslateProvider]
+        test_settings.from_lang = 'en'
+        test_settings.to_lang = 'ru'
+        MarkdownDocument.from_file(test_document, settings=test_settings).translate(
+            RoutingTranslator()
+        )
+        with TranslationMemory(
+            test_settings.translation_memory_path,
+            services=['bing'],
+            from_lang='en',
+            to_lang='ru',
+            max_entries=100,
+        ) as memory:
+            assert memory.get('# Test document') == '# Test document. translated'
+            assert memory.get('This is a test document.') is None
+
+    def test_translate_deduplicates_identical_blocks(self, test_settings):
+        class CountingTranslator(MockTranslator):
+            calls = []
+
+            def translate(self, text):
+                self.calls.append(text)
+                return super().translate(text)
+
+        document = MarkdownDocument.from_string(
+            'Note: see below.\n\n# Heading\n\nNote: see below.\n', settings=test_settings
+        )
+        translator = CountingTranslator()
+        document.translate(translator)
+        assert translator.calls == ['Note: see below.', '# Heading']
+        assert [block.translated_data for block in document.blocks] == [
+            'Note: see below.. translated',
+            '# Heading. translated',
+            'Note: see below.. translated',
+        ]
+
+    def test_translate_in_batches(self, test_settings):
+        class BatchTranslator(MockTranslator):
+            BATCH_SIZE = 2
+            batches = []
+
+            def translate_batch(self, texts):
+                self.batches.append(texts)
+                return super().translate_batch(texts)
+
+        document = MarkdownDocument.from_string(
+            '# One\n\nTwo\n\n# Three\n\nOne\n\n# One\n', settings=test_settings
+        )
+        translator = BatchTranslator()
+        document.translate(translator)
+        assert translator.batches == [['# One', 'Two'], ['# Three', 'One']]
+        assert document.blocks[4].translated_data == '# One. translated'
+
+    def test_translate_records_service(self, test_document, test_settings):
+        class RoutingTranslator(MockTranslator):
+            def translated_by(self, text):
+                return 'bing' if text.startswith('#') else None
+
+        test_settings.save_temp_on_complete = True
+        document = MarkdownDocument.from_file(test_document, settings=test_settings)
+        document.translate(RoutingTranslator())
+        restored = MarkdownDocument.restore(test_document, settings=test_settings)
+        assert [block.translated_by for block in restored.blocks] == ['bing', None, None]
+        assert 'translated_by' not in restored.blocks[1].dump()
+
+    def test_translate_packed(self, test_settings):
+        class PackingTranslator(MockTranslator):
+            MAX_CHARS = 30
+            calls = []
+
+            def translate(self, text):
+                self.calls.append(text)
+                return text.upper()
+
+        test_settings.pack_blocks = True
+        document = MarkdownDocument.from_string(
+            '# One\n\nTwo\n\n# Three\n\nA paragraph near the limit\n',
+            settings=test_settings,
+        )
+        translator = PackingTranslator()
+        document.translate(translator)
+        assert translator.calls == [
+            '# One\n\n|||\n\nTwo\n\n|||\n\n# Three',
+            'A paragraph near the limit',
+        ]
+        assert [block.translated_data for block in document.blocks] == [
+            '# ONE',
+            'TWO',
+            '# THREE',
+            'A PARAGRAPH NEAR THE LIMIT',
+        ]
+
+    def test_translate_packed_falls_back_to_blocks(self, test_settings):
+        class MergingTranslator(MockTranslator):
+            MAX_CHARS = 100
+            calls = []
+
+            def translate(self, text):
+                self.calls.append(text)
+                return text.replace('|||', '').upper()
+
+        test_settings.pack_blocks = True
+        document = MarkdownDocument.from_string('# One\n\nTwo\n', settings=test_settings)
+        translator = MergingTranslator()
+        document.translate(translator)
+        assert translator.calls == ['# One\n\n|||\n\nTwo', '# One', 'Two']
+        assert [block.translated_data for block in document.blocks] == ['# ONE', 'TWO']
+
+    def test_translate_split(self, test_settings):
+        class LimitedTranslator(MockTranslator):
+            MAX_CHARS = 30
+            calls = []
+
+            def translate(self, text):
+                assert len(text) <= self.MAX_CHARS
+                self.calls.append(text)
+                return text.upper()
+
+        document = MarkdownDocument.from_string(
+            'Short one\n\nFirst sentence is here. Second one is here. Short one.\n',
+            settings=test_settings,
+        )
+        translator = LimitedTranslator()
+        document.translate(translator)
+        # Sentences are merged while they fit, pieces are translated before short texts
+        assert translator.calls == [
+            'First sentence is here.',
+            'Second one is here. Short one.',
+            'Short one',
+        ]
+        assert [block.translated_data for block in document.blocks] == [
+            'SHORT ONE',
+            'FIRST SENTENCE IS HERE. SECOND ONE IS HERE. SHORT ONE.',
+        ]
+
+    def test_translate_split_without_packing(self, test_settings):
+        class APITranslator(MockTranslator):
+            MAX_TEXT_CHARS = 20
+            calls = []
+
+            def translate(self, text):
+                self.calls.append(text)
+                return text.upper()
+
+        test_settings.pack_blocks = True
+        document = MarkdownDocument.from_string(
+            'One\n\nTwo\n\nFirst sentence. Second one.\n', settings=test_settings
+        )
+        translator = APITranslator()
+        document.translate(translator)
+        assert translator.calls == ['First sentence.', 'Second one.', 'One', 'Two']
+        assert document.blocks[2].translated_data == 'FIRST SENTENCE. SECOND ONE.'
+
+    def test_translate_async_out_of_order(self, test_document, test_settings):
+        class AsyncTranslator(MockTranslator):
+            concurrency = 3
+            completed = []
+
+            async def translate_batch_async(self, texts):
+                await asyncio.sleep(0 if 'second' in texts[0] else 0.05)
+                self.completed.append(texts[0])
+                return self.translate_batch(texts)
+
+        test_document.write_text('# First\n\nThe second one\n\nThird\n')
+        document = MarkdownDocument.from_file(test_document, settings=test_settings)
+        translator = AsyncTranslator()
+        document.translate(translator)
+        assert translator.completed[0] == 'The second one'
+        assert [block.translated_data for block in document.blocks] == [
+            '# First. translated',
+            'The second one. translated',
+            'Third. translated',
+        ]
+        restored = MarkdownDocument.restore(test_document, settings=test_settings)
+        assert restored.blocks == document.blocks
+
+    def test_translate_async_in_threads(self, test_document, test_settings):
+        class ThreadedTranslator(MockTranslator):
+            # More than threads of the default executor
+            concurrency = min(32, (os.cpu_count() or 1) + 4) + 1
+            # Every request waits until all of them are in flight
+            barrier = threading.Barrier(concurrency, timeout=5)
+
+            async def translate_batch_async(self, texts):
+                await asyncio.to_thread(self.barrier.wait)
+                return self.translate_batch(texts)
+
+        blocks = [f'Block {i}' for i in range(ThreadedTranslator.concurrency)]
+        test_document.write_text('\n\n'.join(blocks) + '\n')
+        document = MarkdownDocument.from_file(test_document, settings=test_settings)
+        document.translate(ThreadedTranslator())
+        assert [block.translated_data for block in document.blocks] == [
+            f'{block}. translated' for block in blocks
+        ]
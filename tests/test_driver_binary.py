@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from md_translate.translators import _driver_binary
+from md_translate.translators._driver_binary import resolve_chromedriver_path
+
+
+class MockChromeDriverManager:
+    installs = 0
+
+    def __init__(self, driver_path):
+        self.driver_path = driver_path
+
+    def install(self):
+        MockChromeDriverManager.installs += 1
+        return str(self.driver_path)
+
+
+@pytest.fixture
+def driver_path(tmp_path):
+    driver_path = tmp_path / 'chromedriver'
+    driver_path.touch()
+    return driver_path
+
+
+@pytest.fixture(autouse=True)
+def mock_webdriver_manager(monkeypatch, driver_path):
+    MockChromeDriverManager.installs = 0
+    monkeypatch.setattr(_driver_binary, 'get_chrome_version', lambda: '120.0.6099')
+    monkeypatch.setattr(
+        _driver_binary, 'ChromeDriverManager', lambda: MockChromeDriverManager(driver_path)
+    )
+    resolve_chromedriver_path.cache_clear()
+    yield
+    resolve_chromedriver_path.cache_clear()
+
+
+def test_explicit_path_skips_webdriver_manager(tmp_path, driver_path):
+    assert resolve_chromedriver_path(driver_path, tmp_path / 'manifest.json') == str(driver_path)
+    assert MockChromeDriverManager.installs == 0
+
+
+def test_path_is_stored_in_manifest(tmp_path, driver_path):
+    manifest_path = tmp_path / 'manifest.json'
+    assert resolve_chromedriver_path(None, manifest_path) == str(driver_path)
+    assert json.loads(manifest_path.read_text()) == {'120.0.6099': str(driver_path)}
+
+    resolve_chromedriver_path.cache_clear()
+    assert resolve_chromedriver_path(None, manifest_path) == str(driver_path)
+    assert MockChromeDriverManager.installs == 1
+
+
+def test_missing_cached_driver_is_reinstalled(tmp_path, driver_path):
+    manifest_path = tmp_path / 'manifest.json'
+    manifest_path.write_text(json.dumps({'120.0.6099': str(tmp_path / 'removed')}))
+    assert resolve_chromedriver_path(None, manifest_path) == str(driver_path)
+    assert MockChromeDriverManager.installs == 1
@@ -0,0 +1,91 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from md_translate.translators._driver_pool import DriverPool
+
+
+class MockSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_handle = handle
+
+
+class MockDriver:
+    def __init__(self):
+        self.window_handles = ['main']
+        self.current_handle = 'main'
+        self.switch_to = MockSwitchTo(self)
+        self.url = 'https://example.com/'
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise WebDriverException('Browser is closed')
+        return self.url
+
+    def get(self, url):
+        if not self.alive:
+            raise WebDriverException('Browser is closed')
+        self.url = url
+
+    def close(self):
+        self.window_handles.remove(self.current_handle)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool():
+    pool = DriverPool()
+    yield pool
+    pool.shutdown()
+
+
+class TestDriverPool:
+    def test_reuse(self, pool):
+        driver = pool.acquire('google', MockDriver)
+        driver.window_handles.append('second tab')
+        pool.release('google', driver)
+        assert pool.acquire('google', MockDriver) is driver
+        assert driver.window_handles == ['main']
+        assert driver.url == DriverPool.BLANK_PAGE
+
+    def test_drivers_are_grouped_by_key(self, pool):
+        driver = pool.acquire('google', MockDriver)
+        pool.release('google', driver)
+        assert pool.acquire('bing', MockDriver) is not driver
+
+    def test_dead_driver_is_replaced(self, pool):
+        driver = pool.acquire('google', MockDriver)
+        pool.release('google', driver)
+        driver.alive = False
+        assert pool.acquire('google', MockDriver) is not driver
+        assert driver.quit_called
+
+    def test_shutdown(self, pool):
+        driver = pool.acquire('google', MockDriver)
+        pool.release('google', driver)
+        pool.shutdown()
+        assert driver.quit_called
+
+    def test_cleanup_on_discard(self, pool):
+        cleaned = []
+        driver = pool.acquire('google', MockDriver)
+        pool.add_cleanup(driver, lambda: cleaned.append(driver))
+        pool.release('google', driver)
+        assert not cleaned
+        pool.shutdown()
+        assert cleaned == [driver]
+
+    def test_uses_are_reset_on_discard(self, pool):
+        driver = pool.acquire('google', MockDriver)
+        pool.add_uses(driver, 3)
+        pool.add_uses(driver)
+        assert pool.get_uses(driver) == 4
+        pool.discard(driver)
+        assert pool.get_uses(driver) == 0
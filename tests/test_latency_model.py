@@ -0,0 +1,71 @@
+import pytest
+
+from md_translate.translators import GoogleTranslateProvider, LatencyModel
+
+
+@pytest.fixture
+def model(tmp_path):
+    with LatencyModel(tmp_path / 'translation_memory.sqlite3', service='google') as model:
+        yield model
+
+
+def observe_linear(model, count=20, base=0.5, per_char=0.002):
+    for i in range(count):
+        chars = 100 * (i % 10)
+        model.observe(LatencyModel.TRANSLATION, chars, base + per_char * chars)
+
+
+class TestLatencyModel:
+    def test_from_settings(self, test_settings, tmp_path):
+        test_settings.translation_memory_path = tmp_path / 'translation_memory.sqlite3'
+        assert LatencyModel.from_settings(test_settings, GoogleTranslateProvider) is None
+        test_settings.adaptive_timeouts = True
+        model = LatencyModel.from_settings(test_settings, GoogleTranslateProvider)
+        assert model.service == 'google'
+        model.close()
+
+    def test_default_until_enough_timings(self, model):
+        observe_linear(model, count=LatencyModel.MIN_SAMPLES - 1)
+        assert model.get_fit(LatencyModel.TRANSLATION) is None
+        assert model.get_timeout(LatencyModel.TRANSLATION, 100, default=10) == 10
+
+    def test_fit(self, model):
+        observe_linear(model)
+        fit = model.get_fit(LatencyModel.TRANSLATION)
+        assert fit.base == pytest.approx(0.5)
+        assert fit.per_char == pytest.approx(0.002)
+        assert fit.std == pytest.approx(0, abs=1e-3)
+        assert fit.samples == 20
+        assert str(fit) == '0.50 s + 2.00 ms/char, std 0.00 s (20 timings)'
+        assert model.get_fit(LatencyModel.PAGE_LOAD) is None
+
+    def test_timeout_scales_with_length(self, model):
+        observe_linear(model)
+        short_timeout = model.get_timeout(LatencyModel.TRANSLATION, 10, default=10)
+        long_timeout = model.get_timeout(LatencyModel.TRANSLATION, 20_000, default=10)
+        assert short_timeout == LatencyModel.MIN_TIMEOUT
+        assert long_timeout == pytest.approx((0.5 + 0.002 * 20_000) * LatencyModel.SAFETY_MARGIN)
+        assert long_timeout > 10
+
+    def test_timeout_is_limited(self, model):
+        observe_linear(model, per_char=1)
+        assert model.get_timeout(LatencyModel.TRANSLATION, 10_000, 10) == LatencyModel.MAX_TIMEOUT
+
+    def test_older_timings_decay(self, model):
+        observe_linear(model, count=20, base=5)
+        observe_linear(model, count=200, base=1)
+        fit = model.get_fit(LatencyModel.TRANSLATION)
+        assert fit.base == pytest.approx(1, abs=0.1)
+
+    def test_model_is_shared(self, model):
+        observe_linear(model)
+        with LatencyModel(model.path, service='google') as other:
+            assert other.get_fit(LatencyModel.TRANSLATION) is not None
+        with LatencyModel(model.path, service='bing') as other:
+            assert other.get_fit(LatencyModel.TRANSLATION) is None
+
+    def test_fit_of_same_lengths(self):
+        fit = LatencyModel.fit(2, 200, 3, 20_000, 300, 5, 2)
+        assert fit.per_char == 0
+        assert fit.base == 1.5
+        assert fit.std == pytest.approx(0.5)
@@ -0,0 +1,34 @@
+from md_translate.document.packing import BlockPacker
+
+
+class TestBlockPacker:
+    def test_pack_up_to_limit(self):
+        packer = BlockPacker(max_chars=20)
+        assert packer.pack(['One', 'Two', 'Three', 'A long text for one']) == [
+            ['One', 'Two'],
+            ['Three'],
+            ['A long text for one'],
+        ]
+        assert all(len(packer.join(group)) <= 20 for group in packer.pack(['a'] * 50))
+
+    def test_text_with_separator_is_not_packed(self):
+        packer = BlockPacker(max_chars=100)
+        assert packer.pack(['One', 'a ||| b', 'Two', 'Three']) == [
+            ['One'],
+            ['a ||| b'],
+            ['Two', 'Three'],
+        ]
+
+    def test_join_and_split(self):
+        packer = BlockPacker(max_chars=100)
+        payload = packer.join(['One', 'Two'])
+        assert payload == 'One\n\n|||\n\nTwo'
+        assert packer.split(payload, 2) == ['One', 'Two']
+        # Translators may drop blank lines or move the separator to the text
+        assert packer.split('Один\n|||\nДва', 2) == ['Один', 'Два']
+        assert packer.split('Один ||| Два', 2) == ['Один', 'Два']
+
+    def test_split_mismatch(self):
+        packer = BlockPacker(max_chars=100)
+        assert packer.split('Один Два', 2) is None
+        assert packer.split('Один\n|||\n\n|||\nДва', 2) is None
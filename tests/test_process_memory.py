@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from md_translate.translators._process_memory import (
+    format_memory,
+    get_own_rss,
+    get_process_tree_rss,
+)
+
+MB = 1024 * 1024
+
+
+def make_process(proc_dir, pid, parent_pid, rss_kb, name='chrome'):
+    process_dir = proc_dir / str(pid)
+    process_dir.mkdir()
+    (process_dir / 'stat').write_text(f'{pid} ({name}) S {parent_pid} 1 1 0 -1')
+    (process_dir / 'status').write_text(f'Name:\t{name}\nVmRSS:\t{rss_kb} kB\n')
+
+
+class TestProcessMemory:
+    def test_process_tree(self, tmp_path):
+        make_process(tmp_path, 10, 1, 1024, name='chromedriver')
+        make_process(tmp_path, 11, 10, 100 * 1024)
+        make_process(tmp_path, 12, 11, 50 * 1024, name='chrome (renderer)')
+        make_process(tmp_path, 20, 1, 999 * 1024, name='other')
+        assert get_process_tree_rss(10, tmp_path) == 151 * MB
+        assert get_process_tree_rss(12, tmp_path) == 50 * MB
+
+    def test_no_process(self, tmp_path):
+        assert get_process_tree_rss(10, tmp_path) is None
+
+    @pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason='procfs is required')
+    def test_own_process(self):
+        assert get_own_rss() > 0
+        assert get_process_tree_rss(os.getpid()) >= get_own_rss()
+
+    def test_format_memory(self):
+        assert format_memory(150 * MB) == '150 MB'
+        assert format_memory(None) == 'n/a'
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+
+import pytest
+
+from md_translate.translators import GoogleTranslateProvider, RateLimit, RateLimiter
+
+
+@pytest.fixture
+def make_limiter(tmp_path):
+    def make_limiter(**limit):
+        return RateLimiter('google', RateLimit(**limit), state_dir=tmp_path)
+
+    return make_limiter
+
+
+class TestRateLimiter:
+    def test_from_settings(self, test_settings):
+        assert RateLimiter.from_settings(test_settings, GoogleTranslateProvider) is None
+        test_settings.rate_limits = {'google': RateLimit(requests_per_second=1)}
+        limiter = RateLimiter.from_settings(test_settings, GoogleTranslateProvider)
+        assert limiter.name == 'google'
+        assert limiter.limit.requests_per_second == 1
+
+    def test_burst_then_rate(self, make_limiter):
+        limiter = make_limiter(requests_per_second=20, burst=2)
+        started_at = time.monotonic()
+        for _ in range(4):
+            with limiter.acquire():
+                pass
+        # Two requests are sent at once, the next two wait for 1 / 20 s each
+        assert 0.08 <= time.monotonic() - started_at < 0.5
+
+    def test_bucket_is_shared(self, make_limiter):
+        first = make_limiter(requests_per_second=0.1, burst=1)
+        second = make_limiter(requests_per_second=0.1, burst=1)
+        assert first._try_acquire(1, 0)[0] is not None
+        lease, wait_time = second._try_acquire(1, 0)
+        assert lease is None
+        assert wait_time > 5
+
+    def test_batch_borrows_tokens(self, make_limiter):
+        limiter = make_limiter(requests_per_second=0.1, burst=2)
+        assert limiter._try_acquire(4, 0)[0] is not None
+        assert limiter._read_state()['tokens'] == pytest.approx(-2, abs=0.01)
+
+    def test_in_flight_chars(self, make_limiter):
+        limiter = make_limiter(requests_per_second=1000, burst=10, max_in_flight_chars=100)
+        lease, _ = limiter._try_acquire(1, 60)
+        assert limiter._try_acquire(1, 60)[0] is None
+        assert limiter._try_acquire(1, 40)[0] is not None
+        limiter._release(lease)
+        assert limiter._try_acquire(1, 60)[0] is not None
+
+    def test_request_bigger_than_limit_is_sent_alone(self, make_limiter):
+        limiter = make_limiter(requests_per_second=1000, burst=10, max_in_flight_chars=100)
+        assert limiter._try_acquire(1, 500)[0] is not None
+
+    def test_in_flight_of_dead_process_is_dropped(self, make_limiter, tmp_path):
+        limiter = make_limiter(requests_per_second=1000, burst=10, max_in_flight_chars=100)
+        dead_pid = 2**22 + 1
+        (tmp_path / 'google.json').write_text(
+            json.dumps(
+                {
+                    'tokens': 10,
+                    'updated_at': time.time(),
+                    'in_flight': {'dead': [dead_pid, 100]},
+                }
+            )
+        )
+        assert limiter._try_acquire(1, 100)[0] is not None
+
+    def test_threads(self, make_limiter):
+        limiter = make_limiter(requests_per_second=1000, burst=5, max_in_flight_chars=10)
+        in_flight = []
+        max_in_flight = []
+
+        def request():
+            with limiter.acquire(chars=5):
+                in_flight.append(1)
+                max_in_flight.append(len(in_flight))
+                time.sleep(0.01)
+                in_flight.pop()
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max(max_in_flight) <= 2
+        assert limiter._read_state()['in_flight'] == {}
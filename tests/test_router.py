@@ -0,0 +1,248 @@
+import time
+
+import pytest
+
+from md_translate.exceptions import ProviderBlocked
+from md_translate.translators import (
+    BaseTranslator,
+    DeeplAPITranslateProvider,
+    GoogleTranslateProvider,
+    ProviderRouter,
+    _router,
+)
+
+
+def make_provider(name, calls, error=None, delays=()):
+    delays = list(delays)
+
+    class MockProvider(BaseTranslator):
+        def __init__(self, settings):
+            # Each instance (session) sleeps for the next delay on each request
+            self.delay = delays.pop(0) if delays else 0
+
+        def __enter__(self):
+            calls.append((name, 'enter'))
+            return self
+
+        def __exit__(self, *args):
+            calls.append((name, 'exit'))
+
+        def translate(self, *, text):
+            calls.append((name, text))
+            time.sleep(self.delay)
+            if error is not None:
+                raise error
+            return f'{text} ({name})'
+
+    return MockProvider
+
+
+@pytest.fixture(autouse=True)
+def routing_stats(monkeypatch):
+    stats = {}
+    monkeypatch.setattr(_router, 'routing_stats', stats)
+    monkeypatch.setattr(_router, 'hedge_budget', _router.HedgeBudget())
+    return stats
+
+
+@pytest.fixture
+def make_router(test_settings):
+    def make_router(settings=None, **providers):
+        router = ProviderRouter(settings or test_settings)
+        router._provider_types = providers
+        router._weights = {name: 1.0 for name in providers}
+        return router
+
+    return make_router
+
+
+class TestProviderRouter:
+    def test_fallback_is_not_started_while_main_works(self, make_router):
+        calls = []
+        router = make_router(
+            google=make_provider('google', calls), bing=make_provider('bing', calls)
+        )
+        with router:
+            assert router.translate_batch(['One', 'Two']) == ['One (google)', 'Two (google)']
+        assert calls == [
+            ('google', 'enter'),
+            ('google', 'One'),
+            ('google', 'Two'),
+            ('google', 'exit'),
+        ]
+        assert router.translated_by('One') == 'google'
+
+    def test_failover_on_error(self, make_router, routing_stats):
+        calls = []
+        router = make_router(
+            google=make_provider('google', calls, error=ValueError('Broken')),
+            bing=make_provider('bing', calls),
+        )
+        with router:
+            assert router.translate(text='One') == 'One (bing)'
+        assert router.translated_by('One') == 'bing'
+        assert routing_stats['google'].error_rate > 0
+        assert routing_stats['bing'].latency_per_text is not None
+        # Measured service is preferred over the failed one which was never measured
+        assert router.rank_providers() == ['bing', 'google']
+
+    def test_failover_on_antispam(self, make_router):
+        calls = []
+        router = make_router(
+            google=make_provider('google', calls, error=ProviderBlocked('google', 60)),
+            bing=make_provider('bing', calls),
+        )
+        with router:
+            assert router.translate(text='One') == 'One (bing)'
+        # Blocked service is skipped until its cool-down is over
+        assert router.rank_providers() == ['bing']
+
+    def test_all_blocked(self, make_router):
+        calls = []
+        router = make_router(
+            google=make_provider('google', calls, error=ProviderBlocked('google', 60)),
+            bing=make_provider('bing', calls, error=ProviderBlocked('bing', 30)),
+        )
+        with router, pytest.raises(ProviderBlocked) as error:
+            router.translate(text='One')
+        assert error.value.retry_after == 30
+        with router, pytest.raises(ProviderBlocked) as error:
+            router.translate(text='One')
+        assert 0 < error.value.retry_after <= 30
+
+    def test_all_failed(self, make_router):
+        calls = []
+        router = make_router(
+            google=make_provider('google', calls, error=ValueError('Broken')),
+        )
+        with router, pytest.raises(ValueError):
+            router.translate(text='One')
+
+    def test_best_expected_time_first(self, make_router, routing_stats):
+        router = make_router(google=None, bing=None, yandex=None)
+        routing_stats['google'] = _router.ProviderStats()
+        routing_stats['google'].add_success(2.0, 1)
+        routing_stats['bing'] = _router.ProviderStats()
+        routing_stats['bing'].add_success(1.0, 1)
+        # Service which was not used yet is expected to take the average 1.5 s
+        assert router.rank_providers() == ['bing', 'yandex', 'google']
+        routing_stats['bing'].add_error()
+        routing_stats['bing'].add_error()
+        routing_stats['bing'].add_error()
+        assert router.rank_providers() == ['yandex', 'google', 'bing']
+        router._weights['bing'] = 4.0
+        assert router.rank_providers() == ['bing', 'yandex', 'google']
+
+    def test_weighted_fallback_is_started(self, make_router):
+        calls = []
+        router = make_router(
+            google=make_provider('google', calls), bing=make_provider('bing', calls)
+        )
+        router._weights['bing'] = 2.0
+        with router:
+            assert router.translate(text='One') == 'One (google)'
+            # Fallback is expected to be twice faster than the main service with its weight
+            assert router.translate(text='Two') == 'Two (bing)'
+
+    def test_batch_size_of_main_service(self, make_router, test_settings):
+        test_settings.tabs = 4
+        router = make_router(google=GoogleTranslateProvider)
+        # Browser services translate a text in each tab
+        assert router.batch_size == 4
+        router = make_router(deepl_api=DeeplAPITranslateProvider)
+        assert router.batch_size == DeeplAPITranslateProvider.BATCH_SIZE
+
+
+class TestHedging:
+    @pytest.fixture
+    def settings(self, routing_stats, test_settings):
+        test_settings.hedge_percentile = 95
+        test_settings.hedge_budget = 1
+        routing_stats['google'] = _router.ProviderStats()
+        for _ in range(5):
+            routing_stats['google'].add_success(0.05, 1)
+        return test_settings
+
+    def test_slow_request_is_hedged_with_next_service(self, make_router, settings):
+        calls = []
+        router = make_router(
+            settings,
+            google=make_provider('google', calls, delays=[1]),
+            bing=make_provider('bing', calls),
+        )
+        started_at = time.monotonic()
+        with router:
+            assert router.translate(text='One') == 'One (bing)'
+            assert time.monotonic() - started_at < 0.5
+        assert router.translated_by('One') == 'bing'
+        assert ('google', 'One') in calls
+
+    def test_slow_request_is_hedged_with_second_session(self, make_router, settings):
+        calls = []
+        router = make_router(settings, google=make_provider('google', calls, delays=[1, 0]))
+        started_at = time.monotonic()
+        with router:
+            assert router.translate(text='One') == 'One (google)'
+            assert time.monotonic() - started_at < 0.5
+        assert calls.count(('google', 'enter')) == 2
+        assert calls.count(('google', 'exit')) == 2
+
+    def test_fast_request_is_not_hedged(self, make_router, settings):
+        calls = []
+        router = make_router(
+            settings, google=make_provider('google', calls), bing=make_provider('bing', calls)
+        )
+        with router:
+            assert router.translate(text='One') == 'One (google)'
+        assert not [call for call in calls if call[0] == 'bing']
+
+    def test_hedges_are_limited_by_budget(self, make_router, settings):
+        settings.hedge_budget = 0
+        calls = []
+        router = make_router(
+            settings,
+            google=make_provider('google', calls, delays=[0.2]),
+            bing=make_provider('bing', calls),
+        )
+        with router:
+            assert router.translate(text='One') == 'One (google)'
+        assert not [call for call in calls if call[0] == 'bing']
+
+    def test_failed_hedge_waits_for_main_service(self, make_router, settings):
+        calls = []
+        router = make_router(
+            settings,
+            google=make_provider('google', calls, delays=[0.2]),
+            bing=make_provider('bing', calls, error=ValueError('Broken')),
+        )
+        with router:
+            assert router.translate(text='One') == 'One (google)'
+
+
+class TestProviderStats:
+    def test_rolling_latency(self):
+        stats = _router.ProviderStats()
+        assert stats.expected_time(1.0) is None
+        assert stats.expected_time(2.0, default_latency=3.0) == 1.5
+        stats.add_success(4.0, 2)
+        assert stats.expected_time(1.0) == 2.0
+        stats.add_success(1.0, 1)
+        assert stats.expected_time(1.0) == pytest.approx(1.7)
+        assert stats.expected_time(2.0) == pytest.approx(0.85)
+
+    def test_error_rate_recovers(self):
+        stats = _router.ProviderStats()
+        stats.add_error()
+        assert stats.error_rate == pytest.approx(0.3)
+        stats.add_success(1.0, 1)
+        assert stats.error_rate == pytest.approx(0.21)
+
+    def test_percentile(self):
+        stats = _router.ProviderStats()
+        for latency in range(1, 5):
+            stats.add_success(latency, 1)
+        assert stats.percentile(95) is None
+        for latency in range(5, 21):
+            stats.add_success(latency, 1)
+        assert stats.percentile(95) == 20
+        assert stats.percentile(50) == 11
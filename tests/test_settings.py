@@ -11,7 +11,15 @@ from md_translate.settings._settings_to_cli import (
     build_cli_options_from_settings,
     wrap_command_with_options,
 )
-from md_translate.translators import GoogleTranslateProvider, Translator
+from md_translate.translation_memory import TranslationMemory
+from md_translate.translators import (
+    BingTranslateProvider,
+    DeeplAPITranslateProvider,
+    DeeplTranslateProvider,
+    GoogleTranslateProvider,
+    ProviderRouter,
+    Translator,
+)
 
 
 class TestSettings(BaseModel):
@@ -175,12 +183,140 @@ def test_dump_settings(capsys):
     settings.dump_settings()
     captured = capsys.readouterr()
     assert json.loads(captured.out) == {
+        "fallback_services": [],
+        "hedge_percentile": 0,
+        "hedge_budget": 0.1,
         "processes": 1,
+        "max_tasks_per_child": None,
+        "concurrency": None,
         "new_file": False,
         "ignore_cache": False,
         "save_temp_on_complete": False,
+        "cache_flush_every": 20,
+        "cache_flush_interval": 5,
+        "cache_compact_every": 500,
+        "translation_memory": False,
+        "translation_memory_path": str(TranslationMemory.DEFAULT_PATH),
+        "translation_memory_size": 100_000,
+        "refresh_memory": False,
+        "pack_blocks": False,
+        "antispam_cooldown": 0,
+        "antispam_max_retries": 5,
         "overwrite": False,
         "verbose": 0,
         "drop_original": False,
+        "tabs": 1,
+        "browser_backend": "webdriver",
+        "browser_profile": "full",
+        "browser_user_data_dir": None,
+        "browser_max_translations": 0,
+        "browser_max_memory": 0,
+        "reload_page": False,
+        "input_method": None,
+        "capture_mode": "dom",
+        "translation_quiet_period": None,
+        "adaptive_timeouts": False,
+        "chromedriver_path": None,
         "deepl_api_key": None,
+        "rate_limits": {},
+        "service_weights": {},
+        "max_chars": {},
     }
+
+
+@pytest.mark.parametrize(
+    "rate_limits, raises",
+    [
+        ({"google": {"requests_per_second": 0.5, "burst": 2}}, does_not_raise()),
+        ({"unknown": {"requests_per_second": 0.5}}, pytest.raises(ValueError)),
+        ({"google": {"burst": 2}}, pytest.raises(ValueError)),
+    ],
+)
+def test_settings_rate_limits_from_config_file(rate_limits, raises, tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"rate_limits": rate_limits}))
+
+    with raises:
+        settings = Settings.initiate(
+            click_params={
+                "path": ".",
+                "from_lang": "en",
+                "to_lang": "ru",
+                "service": Translator.google,
+            },
+            config_file_path=config_file,
+        )
+        assert settings.rate_limits["google"].requests_per_second == 0.5
+        assert settings.rate_limits["google"].max_in_flight_chars == 0
+
+
+@pytest.mark.parametrize(
+    "config_data, raises",
+    [
+        ({"fallback_services": ["bing"], "service_weights": {"bing": 2}}, does_not_raise()),
+        ({"fallback_services": ["unknown"]}, pytest.raises(ValueError)),
+        (
+            {"fallback_services": ["bing"], "service_weights": {"bing": 0}},
+            pytest.raises(ValueError),
+        ),
+    ],
+)
+def test_settings_routing_from_config_file(config_data, raises, tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(config_data))
+
+    with raises:
+        settings = Settings.initiate(
+            click_params={
+                "path": ".",
+                "from_lang": "en",
+                "to_lang": "ru",
+                "service": Translator.google,
+            },
+            config_file_path=config_file,
+        )
+        assert settings.service_provider == ProviderRouter
+        assert settings.service_providers == [GoogleTranslateProvider, BingTranslateProvider]
+
+
+def test_settings_hedging_uses_router():
+    settings = Settings(
+        path=Path('.'),
+        from_lang='en',
+        to_lang='ru',
+        service=Translator.google,
+        hedge_percentile=95,
+    )
+    assert settings.service_provider == ProviderRouter
+    assert settings.service_providers == [GoogleTranslateProvider]
+
+
+@pytest.mark.parametrize(
+    "max_chars, raises",
+    [
+        ({"google": 1000, "bing": 0}, does_not_raise()),
+        ({"unknown": 1000}, pytest.raises(ValueError)),
+        ({"google": -1}, pytest.raises(ValueError)),
+    ],
+)
+def test_settings_max_chars_from_config_file(max_chars, raises, tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"max_chars": max_chars}))
+
+    with raises:
+        settings = Settings.initiate(
+            click_params={
+                "path": ".",
+                "from_lang": "en",
+                "to_lang": "ru",
+                "service": Translator.google,
+            },
+            config_file_path=config_file,
+        )
+        assert GoogleTranslateProvider.get_max_chars(settings) == 1000
+        assert BingTranslateProvider.get_max_chars(settings) == 0
+        assert DeeplTranslateProvider.get_max_chars(settings) == 1_500
+        assert GoogleTranslateProvider.get_max_text_chars(settings) == 1000
+        # API has a split limit only, so blocks are not packed for it
+        assert DeeplAPITranslateProvider.get_max_chars(settings) == 0
+        assert DeeplAPITranslateProvider.get_max_text_chars(settings) == 20_000
@@ -0,0 +1,41 @@
+from md_translate.document.splitting import TextSplitter
+
+
+class TestTextSplitter:
+    def test_short_text_is_not_split(self):
+        split = TextSplitter(max_chars=20).split('Short text')
+        assert split.pieces == ['Short text']
+        assert split.join(['Короткий текст']) == 'Короткий текст'
+
+    def test_split_at_lines(self):
+        text = '- First item\n- Second item\n- Third item'
+        split = TextSplitter(max_chars=30).split(text)
+        assert split.pieces == ['- First item\n- Second item', '- Third item']
+        assert split.join(split.pieces) == text
+
+    def test_split_at_sentences(self):
+        text = 'First sentence is here.  Second one! Third one? Yes.'
+        split = TextSplitter(max_chars=30).split(text)
+        assert split.pieces == ['First sentence is here.', 'Second one! Third one? Yes.']
+        # Original whitespace between pieces is kept
+        assert split.separators == ['  ', '']
+        assert split.join(['Первое.', 'Второе!']) == 'Первое.  Второе!'
+
+    def test_split_at_words(self):
+        text = 'A sentence without any end which is longer than the limit'
+        split = TextSplitter(max_chars=20).split(text)
+        assert all(len(piece) <= 20 for piece in split.pieces)
+        assert split.join(split.pieces) == text
+
+    def test_long_word_is_cut(self):
+        text = 'See https://example.com/' + 'a' * 30
+        split = TextSplitter(max_chars=20).split(text)
+        assert split.pieces == ['See', 'https://example.com/', 'a' * 20, 'a' * 10]
+        assert split.join(split.pieces) == text
+
+    def test_leading_whitespace_is_kept(self):
+        text = '\n\n  First sentence is here. Second one is here.'
+        split = TextSplitter(max_chars=30).split(text)
+        assert split.prefix == '\n\n  '
+        assert split.pieces == ['First sentence is here.', 'Second one is here.']
+        assert split.join(split.pieces) == text
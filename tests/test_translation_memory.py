@@ -0,0 +1,78 @@
+import pytest
+
+from md_translate.translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def memory_path(tmp_path):
+    return tmp_path / 'memory' / 'translation_memory.sqlite3'
+
+
+def make_memory(path, **kwargs):
+    params = {'services': ['google'], 'from_lang': 'en', 'to_lang': 'ru', 'max_entries': 100}
+    params.update(kwargs)
+    return TranslationMemory(path, **params)
+
+
+class TestTranslationMemory:
+    def test_get_and_set(self, memory_path):
+        with make_memory(memory_path) as memory:
+            assert memory.get('Hello world') is None
+            memory.set('Hello world', 'Привет, мир')
+            assert memory.get('Hello world') == 'Привет, мир'
+            assert (memory.hits, memory.misses) == (1, 1)
+
+    def test_persistence(self, memory_path):
+        with make_memory(memory_path) as memory:
+            memory.set('Hello world', 'Привет, мир')
+        with make_memory(memory_path) as memory:
+            assert memory.get('Hello world') == 'Привет, мир'
+
+    def test_normalized_text(self, memory_path):
+        with make_memory(memory_path) as memory:
+            memory.set('Hello world  \n', 'Привет, мир')
+            assert memory.get('  Hello world') == 'Привет, мир'
+
+    @pytest.mark.parametrize(
+        'params',
+        [
+            {'services': ['bing']},
+            {'from_lang': 'de'},
+            {'to_lang': 'fr'},
+        ],
+    )
+    def test_keyed_by_service_and_languages(self, memory_path, params):
+        with make_memory(memory_path) as memory:
+            memory.set('Hello world', 'Привет, мир')
+        with make_memory(memory_path, **params) as memory:
+            assert memory.get('Hello world') is None
+
+    def test_lookup_in_all_services(self, memory_path):
+        with make_memory(memory_path) as memory:
+            memory.set('Hello world', 'Привет, мир')
+        with make_memory(memory_path, services=['bing', 'google']) as memory:
+            assert memory.get('Hello world') == 'Привет, мир'
+            memory.set('Hello world', 'Всем привет', 'bing')
+            # Translation of the main service is preferred
+            assert memory.get('Hello world') == 'Всем привет'
+            memory.set('Goodbye', 'До свидания', 'bing')
+        with make_memory(memory_path) as memory:
+            assert memory.get('Hello world') == 'Привет, мир'
+            assert memory.get('Goodbye') is None
+
+    def test_lru_eviction(self, memory_path):
+        with make_memory(memory_path, max_entries=2) as memory:
+            memory.set('one', '1')
+            memory.set('two', '2')
+            memory.get('one')
+            memory.set('three', '3')
+            memory.evict()
+            assert memory.get('one') == '1'
+            assert memory.get('two') is None
+            assert memory.get('three') == '3'
+
+    def test_disabled_by_default(self, test_settings, memory_path):
+        test_settings.translation_memory_path = memory_path
+        test_settings.translation_memory_size = 100
+        assert TranslationMemory.from_settings(test_settings) is None
+        assert not memory_path.parent.exists()
@@ -1,3 +1,7 @@
+import asyncio
+import contextlib
+import pathlib
+import time
 from os import environ
 
 import pytest
@@ -10,11 +14,16 @@ from md_translate.translators import (
     LibreTranslateTranslateProvider,
     DeeplAPITranslateProvider,
 )
+from md_translate.translators import _scripts as scripts
 
+MOCK_PAGE = pathlib.Path(__file__).parents[1] / 'benchmarks' / 'assets' / 'translator_page.html'
 
-class MockSettings:
-    from_lang = 'en'
-    to_lang = 'ru'
+
+@pytest.fixture
+def settings(test_settings):
+    test_settings.from_lang = 'en'
+    test_settings.to_lang = 'ru'
+    return test_settings
 
 
 @pytest.mark.web  # run it with `pytest -m web`
@@ -30,9 +39,235 @@ class TestTranslator:
             (DeeplAPITranslateProvider, 'Hello world', 'Здравствуй мир'),
         ],
     )
-    def test_translate(self, translator, source_text, expected):
-        settings = MockSettings()
+    def test_translate(self, translator, source_text, expected, settings):
         settings.deepl_api_key = environ.get('DEEPL_API_KEY')
         translator = translator(settings)  # type: ignore
         with translator as translator_:
             assert translator_.translate(text=source_text) == expected
+
+
+class MockResponse:
+    def __init__(self, texts):
+        self.texts = texts
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'translations': [{'text': f'{text} translated'} for text in self.texts]}
+
+
+class MockSession:
+    def __init__(self):
+        self.requests = []
+        self.timeouts = []
+
+    def close(self):
+        pass
+
+    def post(self, url, headers, json, timeout):
+        self.requests.append(json['text'])
+        self.timeouts.append(timeout)
+        return MockResponse(json['text'])
+
+
+class TestDeeplAPIBatching:
+    @pytest.fixture
+    def translator(self, settings):
+        settings.deepl_api_key = 'key'
+        translator = DeeplAPITranslateProvider(settings)  # type: ignore
+        session = MockSession()
+        translator.make_session = lambda: session
+        with translator:
+            yield translator
+
+    def test_translate_batch(self, translator):
+        texts = [f'text {i}' for i in range(120)]
+        assert translator.translate_batch(texts) == [f'{text} translated' for text in texts]
+        assert [len(request) for request in translator.make_session().requests] == [50, 50, 20]
+
+    def test_translate_batch_respects_request_size(self, translator):
+        translator.MAX_REQUEST_SIZE = 1000
+        texts = ['a' * 400, 'b' * 400, 'c' * 400]
+        translator.translate_batch(texts)
+        assert translator.make_session().requests == [texts[:2], texts[2:]]
+
+    def test_translate(self, translator):
+        assert translator.translate(text='Hello') == 'Hello translated'
+        assert translator.make_session().timeouts == [translator.REQUEST_TIMEOUT]
+
+    def test_translate_batch_async(self, translator):
+        texts = ['one', 'two']
+        translations = asyncio.run(translator.translate_batch_async(texts))
+        assert translations == ['one translated', 'two translated']
+
+
+class TestCapturedResponses:
+    @pytest.mark.parametrize(
+        'translator, body, expected',
+        [
+            (
+                BingTranslateProvider,
+                '[{"translations": [{"text": "Привет\\nмир", "to": "ru"}]}]',
+                'Привет\nмир',
+            ),
+            (
+                DeeplTranslateProvider,
+                '{"result": {"texts": [{"text": "Привет"}, {"text": "мир"}]}}',
+                'Привет\nмир',
+            ),
+            (
+                DeeplTranslateProvider,
+                '{"result": {"translations": [{"beams": [{"sentences": [{"text": "Привет."}]}]},'
+                ' {"beams": [{"sentences": [{"text": "Мир."}]}]}]}}',
+                'Привет. Мир.',
+            ),
+            (YandexTranslateProvider, '{"code": 200, "text": ["Привет", "мир"]}', 'Привет\nмир'),
+            (LibreTranslateTranslateProvider, '{"translatedText": "Привет мир"}', 'Привет мир'),
+        ],
+    )
+    def test_parse(self, translator, body, expected, settings):
+        assert translator(settings).parse_captured_response(body) == expected
+
+    @pytest.mark.parametrize(
+        'translator',
+        [BingTranslateProvider, DeeplTranslateProvider, YandexTranslateProvider],
+    )
+    def test_not_a_translation(self, translator, settings):
+        translator = translator(settings)
+        assert translator.parse_captured_response('{"statusCode": 400}') is None
+        assert translator.parse_captured_response('not json') is None
+
+    def test_capture_mode(self, settings):
+        assert not BingTranslateProvider(settings).capture_network
+        settings.capture_mode = 'network'
+        assert BingTranslateProvider(settings).capture_network
+        # Google page responses are not parsed, its output is read from the page
+        assert not GoogleTranslateProvider(settings).capture_network
+
+
+class TestBrowserRecycling:
+    @pytest.fixture
+    def translator(self, settings, monkeypatch):
+        from md_translate.translators._selenium_base import driver_pool
+
+        translator = BingTranslateProvider(settings)  # type: ignore
+        opened = []
+        discarded = []
+
+        def open_driver():
+            translator._driver = object()
+            opened.append(translator._driver)
+
+        monkeypatch.setattr(translator, 'open_driver', open_driver)
+        monkeypatch.setattr(driver_pool, 'discard', discarded.append)
+        translator.open_driver()
+        translator.opened = opened
+        translator.discarded = discarded
+        yield translator
+
+    def test_disabled(self, translator):
+        translator.recycle_driver_if_needed()
+        assert len(translator.opened) == 1
+
+    def test_max_translations(self, translator):
+        from md_translate.translators._selenium_base import driver_pool
+
+        translator._settings.browser_max_translations = 2
+        driver_pool.add_uses(translator._driver)
+        translator.recycle_driver_if_needed()
+        assert len(translator.opened) == 1
+        driver_pool.add_uses(translator._driver)
+        translator.recycle_driver_if_needed()
+        assert translator.discarded == translator.opened[:1]
+        assert len(translator.opened) == 2
+
+    def test_memory_is_not_measured_without_limit(self, translator, monkeypatch):
+        measured = []
+        monkeypatch.setattr(translator, 'get_driver_rss', lambda: measured.append(1))
+        translator._settings.browser_max_translations = 10
+        translator.recycle_driver_if_needed()
+        assert measured == []
+
+    def test_max_memory(self, translator, monkeypatch):
+        translator._settings.browser_max_memory = 100
+        monkeypatch.setattr(translator, 'get_driver_rss', lambda: 99 * 1024 * 1024)
+        translator.recycle_driver_if_needed()
+        assert len(translator.opened) == 1
+        monkeypatch.setattr(translator, 'get_driver_rss', lambda: 101 * 1024 * 1024)
+        translator.recycle_driver_if_needed()
+        assert len(translator.opened) == 2
+
+
+class TestAdaptiveTimeouts:
+    def test_disabled(self, settings):
+        translator = DeeplTranslateProvider(settings)  # type: ignore
+        assert translator.latency_model is None
+        assert translator.get_timeout('translation', 100, translator.TRANSLATION_TIMEOUT) == 30
+        assert translator.page_load_timeout == translator.PAGE_LOAD_TIMEOUT
+
+    def test_learned(self, settings, tmp_path):
+        settings.adaptive_timeouts = True
+        settings.translation_memory_path = tmp_path / 'translation_memory.sqlite3'
+        translator = DeeplTranslateProvider(settings)  # type: ignore
+        for _ in range(translator.latency_model.MIN_SAMPLES):
+            translator.observe_latency('page_load', 0, time.monotonic() - 3)
+        # Page loads in 3 s, with the safety margin it is still shorter than the default
+        assert translator.page_load_timeout == pytest.approx(4.5, abs=0.1)
+        translator.latency_model.close()
+
+    def test_learned_for_api(self, settings, tmp_path):
+        settings.adaptive_timeouts = True
+        settings.translation_memory_path = tmp_path / 'translation_memory.sqlite3'
+        settings.deepl_api_key = 'key'
+        translator = DeeplAPITranslateProvider(settings)  # type: ignore
+        session = MockSession()
+        translator.make_session = lambda: session
+        with translator:
+            for _ in range(translator.latency_model.MIN_SAMPLES + 1):
+                translator.translate(text='Hello')
+        # Requests are timed, and fast ones get the shortest timeout once there are enough
+        assert session.timeouts[0] == translator.REQUEST_TIMEOUT
+        assert session.timeouts[-1] == translator.latency_model.MIN_TIMEOUT
+
+
+MOCK_PAGE_STATE_SCRIPT = scripts.make_page_state_script(
+    '''
+    return {
+        antispam: false,
+        translated: document.getElementById('container').classList.contains('ready'),
+        output: readValue(document.getElementById('target')),
+    };
+    '''
+)
+
+
+@pytest.mark.web  # needs Chrome, run it with `pytest -m web`
+class TestTabs:
+    @pytest.fixture
+    def translator(self, settings, monkeypatch):
+        settings.browser_backend = 'cdp'
+        settings.browser_profile = 'lean'
+        settings.tabs = 3
+        settings.translation_quiet_period = 1
+        translator = BingTranslateProvider(settings)  # type: ignore
+        # Bing is pointed to a local page which mimics a translator page
+        translator.PAGE_STATE_SCRIPT = MOCK_PAGE_STATE_SCRIPT
+        translator.get_url = lambda: f'{MOCK_PAGE.as_uri()}?delay=100'
+        translator.accept_cookies = lambda: None
+        translator.get_input_element = lambda: translator._driver.find_element(
+            by=translator.WEBDRIVER_BY.ID, value='source'
+        )
+        # Random pause between batches is not a part of the measured time
+        monkeypatch.setattr(translator, 'pace', lambda texts: contextlib.nullcontext())
+        with translator:
+            # Pages are loaded in all tabs beforehand
+            translator.translate_batch(['Warm up', 'Warm up', 'Warm up'])
+            yield translator
+
+    def test_quiet_periods_of_tabs_overlap(self, translator):
+        texts = ['One', 'Two', 'Three']
+        started_at = time.monotonic()
+        assert translator.translate_batch(texts) == [f'[ru] {text}' for text in texts]
+        # Tabs settle together, instead of waiting for a quiet period one after another
+        assert time.monotonic() - started_at < 2 * translator._settings.translation_quiet_period